@@ -0,0 +1,71 @@
+"""
+Compare the asyncio client against the threaded path of HttpSdk.
+
+Every request waits on a local stand-in server that simulates upstream latency, so the benchmark measures how many
+requests each client keeps in flight.
+
+Usage: python -m benchmarks.bench_async [requests] [concurrency] [delay_seconds]
+"""
+import asyncio
+import sys
+import time
+from multiprocessing.pool import ThreadPool
+
+from sdklib.http import HttpSdk
+from sdklib.http.aio import AsyncHttpSdk
+
+from benchmarks.stand_in_server import StandInServer
+
+
+def bench_threaded(url, requests, concurrency):
+    sdk = HttpSdk(host=url)
+    sdk.pool_maxsize = concurrency
+    pool = ThreadPool(concurrency)
+    start = time.time()
+    responses = pool.map(lambda _: sdk.get("/items/"), range(requests))
+    elapsed = time.time() - start
+    pool.close()
+    assert all(r.status == 200 for r in responses)
+    return elapsed
+
+
+def bench_async(url, requests, concurrency):
+    sdk = AsyncHttpSdk(host=url)
+    sdk.pool_maxsize = concurrency
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def get():
+        async with semaphore:
+            return await sdk.get("/items/")
+
+    async def run():
+        return await asyncio.gather(*[get() for _ in range(requests)])
+
+    start = time.time()
+    responses = loop.run_until_complete(run())
+    elapsed = time.time() - start
+    AsyncHttpSdk.close_async_pools()
+    loop.close()
+    assert all(r.status == 200 for r in responses)
+    return elapsed
+
+
+def main(argv):
+    requests = int(argv[1]) if len(argv) > 1 else 2000
+    concurrency = int(argv[2]) if len(argv) > 2 else 200
+    delay = float(argv[3]) if len(argv) > 3 else 0.05
+
+    server = StandInServer(delay=delay).start()
+    try:
+        for name, bench in (("threaded", bench_threaded), ("asyncio", bench_async)):
+            elapsed = bench(server.url, requests, concurrency)
+            print("%-10s %6d requests, concurrency %4d: %7.3fs (%8.1f req/s)" % (
+                name, requests, concurrency, elapsed, requests / elapsed))
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,48 @@
+"""
+Bytes and time saved by compressing a bulk JSON POST body (BodyCompression).
+
+The loopback stand-in server has no bandwidth limit, so the wall time of each request is reported along with the
+transfer time the body would take on a link of the given bandwidth.
+
+Usage: python -m benchmarks.bench_compression [iterations] [bandwidth_mbps]
+"""
+import sys
+import time
+
+from sdklib.http import HttpSdk, HttpRequestContext, BodyCompression
+from sdklib.http.base import prepare_request_from_context
+
+from benchmarks.stand_in_server import StandInServer
+
+
+def bulk_body(n=5000):
+    return {"items": [{"id": i, "name": "item %s" % i, "tags": ["a", "b", "c"], "active": i % 2 == 0}
+                      for i in range(n)]}
+
+
+def main(argv):
+    iterations = int(argv[1]) if len(argv) > 1 else 20
+    bandwidth = float(argv[2]) if len(argv) > 2 else 10.0  # Mbit/s
+    body_params = bulk_body()
+    server = StandInServer().start()
+    try:
+        for name, compression in (("uncompressed", None), ("gzip", BodyCompression()),
+                                  ("gzip level 1", BodyCompression(level=1)), ("deflate", BodyCompression("deflate"))):
+            context = HttpRequestContext(method="POST", url_path="/items/", body_params=body_params,
+                                         compression=compression)
+            size = len(prepare_request_from_context(context)[2])
+            sdk = HttpSdk(host=server.url)
+            sdk.compression = compression
+            start = time.time()
+            for _ in range(iterations):
+                sdk.post("/items/", body_params=body_params)
+            elapsed = (time.time() - start) / iterations
+            transfer = size * 8 / (bandwidth * 1e6)
+            print("%-14s %9d bytes   loopback: %7.2f ms   + transfer at %g Mbit/s: %8.2f ms" % (
+                name, size, elapsed * 1e3, bandwidth, (elapsed + transfer) * 1e3))
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,36 @@
+"""
+Cost of building request contexts: construction, per-request views (copy) and derived contexts (replace), e.g. when
+replaying HAR logs.
+
+Usage: python -m benchmarks.bench_context [iterations]
+"""
+import sys
+import timeit
+
+from sdklib.http import HttpRequestContext
+
+
+def typical_kwargs():
+    return dict(
+        host="http://localhost:8080", method="GET", url_path="/items/{item_id}/", url_path_params={"item_id": 1},
+        headers={"Accept": "*/*", "User-Agent": "sdklib"}, query_params={"page": 1, "size": 20}
+    )
+
+
+def main(argv):
+    iterations = int(argv[1]) if len(argv) > 1 else 100000
+    kwargs = typical_kwargs()
+    context = HttpRequestContext(**kwargs)
+    cases = (
+        ("empty context", HttpRequestContext),
+        ("typical context", lambda: HttpRequestContext(**kwargs)),
+        ("copy", context.copy),
+        ("replace", lambda: context.replace(url_path="/items/", query_params={"page": 2})),
+    )
+    for name, func in cases:
+        elapsed = timeit.timeit(func, number=iterations) / iterations
+        print("%-16s %7.2f us" % (name, elapsed * 1e6))
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,58 @@
+"""
+Per-request overhead of building the request from a context: deep copy of the context (before) against the
+per-request view returned by HttpRequestContext.copy() (after).
+
+Usage: python -m benchmarks.bench_context_copy [iterations]
+"""
+import copy
+import sys
+import timeit
+
+from sdklib.http import HttpRequestContext
+from sdklib.http.base import prepare_request_from_context
+from sdklib.http.renderers import CustomRenderer
+
+
+def small_get_context():
+    return HttpRequestContext(
+        host="http://localhost:8080", method="GET", url_path="/items/{item_id}/", url_path_params={"item_id": 1},
+        headers={"Accept": "*/*", "User-Agent": "sdklib"}, query_params={"page": 1, "size": 20}
+    )
+
+
+def large_post_context(size=4 * 1024 * 1024):
+    return HttpRequestContext(
+        host="http://localhost:8080", method="POST", url_path="/files/",
+        headers={"Accept": "*/*", "User-Agent": "sdklib"},
+        body_params={"items": [{"id": i, "name": "item %s" % i} for i in range(size // 32)]},
+    )
+
+
+def upload_context(size=4 * 1024 * 1024):
+    return HttpRequestContext(
+        host="http://localhost:8080", method="POST", url_path="/files/",
+        body_params=b"x" * size, renderer=CustomRenderer("application/octet-stream"),
+    )
+
+
+def deepcopy_prepare(context):
+    # previous behaviour: the context was deep copied before building the request
+    return prepare_request_from_context(copy.deepcopy(context))
+
+
+def main(argv):
+    iterations = int(argv[1]) if len(argv) > 1 else 10
+    cases = (
+        ("small GET", small_get_context(), iterations * 1000),
+        ("4 MB JSON POST", large_post_context(), iterations),
+        ("4 MB raw POST", upload_context(), iterations * 10),
+    )
+    for name, context, number in cases:
+        before = timeit.timeit(lambda: deepcopy_prepare(context), number=number) / number
+        after = timeit.timeit(lambda: prepare_request_from_context(context), number=number) / number
+        print("%-16s before: %10.1f us   after: %10.1f us   (x%.1f)" % (
+            name, before * 1e6, after * 1e6, before / after))
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,64 @@
+"""
+Rendering (JSONRenderer) and parsing (JsonCodec.loads, used by response.json) of JSON bodies from 1 KB to 10 MB with
+every JSON codec installed, against the previous implementation (to_key_val_dict, json.dumps and str round trips).
+
+Usage: python -m benchmarks.bench_json [iterations]
+"""
+import json
+import sys
+import timeit
+
+from sdklib.compat import convert_bytes_to_str, str
+from sdklib.http.jsoncodec import JSON_CODECS
+from sdklib.http.renderers import JSONRenderer
+from sdklib.util.structures import to_key_val_dict
+
+SIZES = (1024, 64 * 1024, 1024 * 1024, 10 * 1024 * 1024)
+
+
+def payload(size):
+    item = {"id": 1, "name": "item name", "price": 12.5, "tags": ["a", "b"], "active": True, "parent": None}
+    n = max(1, size // len(json.dumps(item)))
+    return {"items": [dict(item, id=i) for i in range(n)]}
+
+
+def previous_dumps(data):
+    return str(json.dumps(to_key_val_dict(data))).encode()
+
+
+def previous_loads(body):
+    return json.loads(convert_bytes_to_str(body))
+
+
+def installed_codecs():
+    codecs = []
+    for codec_class in JSON_CODECS.values():
+        try:
+            codecs.append(codec_class())
+        except ImportError:
+            pass
+    return codecs
+
+
+def main(argv):
+    iterations = int(argv[1]) if len(argv) > 1 else 5
+    codecs = installed_codecs()
+    for size in SIZES:
+        data = payload(size)
+        body = previous_dumps(data)
+        number = max(1, iterations * 1024 * 1024 // size)
+        print("%.1f KB" % (len(body) / 1024.0))
+        cases = [("previous", lambda: previous_dumps(data), lambda: previous_loads(body))]
+        for codec in codecs:
+            renderer = JSONRenderer(codec=codec)
+            cases.append((codec.name, lambda r=renderer: r.encode_params(data),
+                          lambda c=codec: c.loads(body)))
+        for name, dumps, loads in cases:
+            render = timeit.timeit(dumps, number=number) / number
+            parse = timeit.timeit(loads, number=number) / number
+            print("  %-10s render: %9.3f ms (%7.1f MB/s)   parse: %9.3f ms (%7.1f MB/s)" % (
+                name, render * 1e3, len(body) / render / 1e6, parse * 1e3, len(body) / parse / 1e6))
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,65 @@
+"""
+Peak memory and time of reading every item of a large JSON array response: response.json (whole document) against
+response.iter_json_items on a streamed response.
+
+Usage: python -m benchmarks.bench_json_stream [items]
+"""
+import json
+import multiprocessing
+import sys
+import time
+import tracemalloc
+
+from sdklib.http import HttpSdk
+
+from benchmarks.stand_in_server import StandInServer
+
+
+def document(n):
+    return json.dumps({"data": {"items": [
+        {"id": i, "name": "item %s" % i, "price": 12.5, "tags": ["a", "b"], "active": True} for i in range(n)
+    ]}}).encode()
+
+
+def measure(func):
+    tracemalloc.start()
+    start = time.time()
+    count = func()
+    elapsed = time.time() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return count, elapsed, peak
+
+
+def serve(body, connection):
+    server = StandInServer(body=body).start()
+    connection.send(server.url)
+    connection.recv()
+    server.stop()
+
+
+def main(argv):
+    n = int(argv[1]) if len(argv) > 1 else 200000
+    body = document(n)
+    # the server runs in another process, so its copies of the body are not traced
+    connection, child_connection = multiprocessing.Pipe()
+    process = multiprocessing.Process(target=serve, args=(body, child_connection))
+    process.start()
+    try:
+        sdk = HttpSdk(host=connection.recv())
+        cases = (
+            ("response.json", lambda: sum(1 for _ in sdk.get("/items/").json["data"]["items"])),
+            ("iter_json_items", lambda: sum(1 for _ in sdk.get("/items/", stream=True).iter_json_items("data.items"))),
+        )
+        print("%d items, %.1f MB" % (n, len(body) / 1e6))
+        for name, func in cases:
+            count, elapsed, peak = measure(func)
+            assert count == n
+            print("%-16s %8.1f ms   peak memory: %8.1f MB" % (name, elapsed * 1e3, peak / 1e6))
+    finally:
+        connection.send(None)
+        process.join()
+
+
+if __name__ == "__main__":
+    main(sys.argv)
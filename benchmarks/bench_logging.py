@@ -0,0 +1,42 @@
+"""
+Per-request cost of the request/response debug logs when the debug level is disabled: eager formatting (before)
+against the lazy log messages (after).
+
+Usage: python -m benchmarks.bench_logging [iterations]
+"""
+import json
+import logging
+import sys
+import timeit
+
+import sdklib.http  # noqa: F401 (sdklib.util.logger is imported by sdklib.http)
+from sdklib.util import logger as sdk_logger
+from sdklib.util.logger import log_print_request, log_print_response
+
+
+HEADERS = {"Accept": "*/*", "Content-Type": "application/json", "User-Agent": "sdklib"}
+BODY = json.dumps({"items": [{"id": i, "name": "item %s" % i} for i in range(1000)]}).encode("utf-8")
+
+
+def eager_log():
+    # previous behaviour: messages were built (and bodies pretty printed) before calling logger.debug
+    sdk_logger.logger.debug(str(sdk_logger._RequestLogMessage("POST", "http://localhost/items/", None, HEADERS, BODY)))
+    sdk_logger.logger.debug(str(sdk_logger._ResponseLogMessage(200, BODY, HEADERS)))
+
+
+def lazy_log():
+    log_print_request("POST", "http://localhost/items/", None, HEADERS, BODY)
+    log_print_response(200, BODY, HEADERS)
+
+
+def main(argv):
+    number = int(argv[1]) if len(argv) > 1 else 1000
+    sdk_logger.logger.setLevel(logging.INFO)
+    before = timeit.timeit(eager_log, number=number) / number
+    after = timeit.timeit(lazy_log, number=number) / number
+    print("debug disabled   before: %10.1f us   after: %10.1f us   (x%.1f)" % (
+        before * 1e6, after * 1e6, before / after))
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,52 @@
+"""
+Per-call overhead of prepared requests (HttpSdk.prepare) compared with regular sdk calls and raw urllib3.
+
+Rounds of each client are interleaved and the best round is reported, to keep the noise of the loopback server out.
+
+Usage: python -m benchmarks.bench_prepared [iterations] [rounds]
+"""
+import sys
+import time
+
+import urllib3
+
+from sdklib.http import HttpSdk
+
+from benchmarks.stand_in_server import StandInServer
+
+
+def timed(func, iterations):
+    start = time.time()
+    for i in range(iterations):
+        func(i)
+    return (time.time() - start) / iterations
+
+
+def main(argv):
+    iterations = int(argv[1]) if len(argv) > 1 else 1000
+    rounds = int(argv[2]) if len(argv) > 2 else 5
+    server = StandInServer().start()
+    try:
+        pm = urllib3.PoolManager()
+        sdk = HttpSdk(host=server.url)
+        prepared = sdk.prepare("GET", "/items/{item_id}/", query_params={"fields": "id,name"})
+        clients = [
+            ("raw urllib3", lambda i: pm.urlopen("GET", "%s/items/%s/?fields=id%%2Cname" % (server.url, i))),
+            ("sdk.get", lambda i: sdk.get("/items/%s/" % i, query_params={"fields": "id,name"})),
+            ("prepared.send", lambda i: prepared.send(item_id=i)),
+        ]
+        best = dict((name, float("inf")) for name, _ in clients)
+        for _ in range(rounds):
+            for name, func in clients:
+                best[name] = min(best[name], timed(func, iterations))
+        results = [(name, best[name]) for name, _ in clients]
+        baseline = results[0][1]
+        for name, elapsed in results:
+            print("%-14s %8.1f us/call   overhead vs urllib3: %+7.1f us" % (
+                name, elapsed * 1e6, (elapsed - baseline) * 1e6))
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,53 @@
+"""
+Peak memory and time of downloading a large response body to a file: response.body written to the file (whole body
+in memory) against a body spooled to disk (HttpSdk.spool_threshold) and moved with response.save_to.
+
+Usage: python -m benchmarks.bench_spool [megabytes]
+"""
+import multiprocessing
+import os
+import sys
+import tempfile
+
+from sdklib.http import HttpSdk
+
+from benchmarks.bench_json_stream import measure, serve
+
+
+def write_body(sdk, path):
+    with open(path, "wb") as f:
+        f.write(sdk.get("/artifact").body)
+    return os.path.getsize(path)
+
+
+def save_spooled_body(sdk, path):
+    with sdk.get("/artifact", spool_threshold=1024 * 1024) as response:
+        response.save_to(path)
+    return os.path.getsize(path)
+
+
+def main(argv):
+    size = int(argv[1]) * 1024 * 1024 if len(argv) > 1 else 100 * 1024 * 1024
+    body = b"x" * size
+    # the server runs in another process, so its copies of the body are not traced
+    connection, child_connection = multiprocessing.Pipe()
+    process = multiprocessing.Process(target=serve, args=(body, child_connection))
+    process.start()
+    del body
+    path = os.path.join(tempfile.mkdtemp(), "artifact")
+    try:
+        sdk = HttpSdk(host=connection.recv())
+        print("%.1f MB body" % (size / 1e6))
+        for name, func in (("body", write_body), ("spooled save_to", save_spooled_body)):
+            count, elapsed, peak = measure(lambda: func(sdk, path))
+            assert count == size
+            print("%-16s %8.1f ms   peak memory: %8.1f MB" % (name, elapsed * 1e3, peak / 1e6))
+    finally:
+        connection.send(None)
+        process.join()
+        os.remove(path)
+        os.rmdir(os.path.dirname(path))
+
+
+if __name__ == "__main__":
+    main(sys.argv)
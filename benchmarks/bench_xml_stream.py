@@ -0,0 +1,49 @@
+"""
+Peak memory and time of reading every item of a large XML response: parsing the whole document with xmltodict against
+response.iter_xml_items on a streamed response.
+
+Usage: python -m benchmarks.bench_xml_stream [items]
+"""
+import multiprocessing
+import sys
+
+from sdklib.http import HttpSdk
+from sdklib.util.structures import xml_string_to_dict
+
+from benchmarks.bench_json_stream import measure, serve
+
+
+def document(n):
+    return (
+        b'<?xml version="1.0" encoding="UTF-8"?><feed><items>' +
+        b"".join(b'<item id="%d"><name>item %d</name><price>12.5</price><tag>a</tag><tag>b</tag></item>' % (i, i)
+                 for i in range(n)) +
+        b"</items></feed>"
+    )
+
+
+def main(argv):
+    n = int(argv[1]) if len(argv) > 1 else 100000
+    body = document(n)
+    # the server runs in another process, so its copies of the body are not traced
+    connection, child_connection = multiprocessing.Pipe()
+    process = multiprocessing.Process(target=serve, args=(body, child_connection))
+    process.start()
+    try:
+        sdk = HttpSdk(host=connection.recv())
+        cases = (
+            ("xml_string_to_dict", lambda: len(xml_string_to_dict(sdk.get("/items/").body)["feed"]["items"]["item"])),
+            ("iter_xml_items", lambda: sum(1 for _ in sdk.get("/items/", stream=True).iter_xml_items(3, "item"))),
+        )
+        print("%d items, %.1f MB" % (n, len(body) / 1e6))
+        for name, func in cases:
+            count, elapsed, peak = measure(func)
+            assert count == n
+            print("%-18s %8.1f ms   peak memory: %8.1f MB" % (name, elapsed * 1e3, peak / 1e6))
+    finally:
+        connection.send(None)
+        process.join()
+
+
+if __name__ == "__main__":
+    main(sys.argv)
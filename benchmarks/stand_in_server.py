@@ -0,0 +1,84 @@
+"""
+Minimal keep-alive HTTP/1.1 server used as a stand-in upstream by the benchmarks.
+
+It runs an asyncio server in a background thread and answers every request with the same small JSON document, after
+an optional delay that simulates upstream latency.
+"""
+import asyncio
+import threading
+
+
+RESPONSE_BODY = b'{"data": {"id": 1, "name": "item"}}'
+
+
+class StandInServer(object):
+
+    def __init__(self, delay=0.0, body=RESPONSE_BODY):
+        self.delay = delay
+        self.body = body
+        self.port = None
+        self._loop = asyncio.new_event_loop()
+        self._started = threading.Event()
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+
+    @property
+    def url(self):
+        return "http://127.0.0.1:%s" % self.port
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                length = 0
+                line = await reader.readline()
+                if not line:
+                    break
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.partition(b":")
+                    if name.strip().lower() == b"content-length":
+                        length = int(value.strip())
+                if length:
+                    await reader.readexactly(length)
+                if self.delay:
+                    await asyncio.sleep(self.delay)
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nContent-Length: %d\r\n\r\n%s" % (
+                        len(self.body), self.body)
+                )
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            # stop() cancels the handlers of idle keep-alive connections: end the task normally, otherwise the
+            # start_server callback logs the cancellation as an error.
+            pass
+        finally:
+            writer.close()
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        server = self._loop.run_until_complete(
+            asyncio.start_server(self._handle, "127.0.0.1", 0, backlog=4096)
+        )
+        self.port = server.sockets[0].getsockname()[1]
+        self._started.set()
+        self._loop.run_forever()
+
+    def start(self):
+        self._thread.start()
+        self._started.wait()
+        return self
+
+    async def _shutdown(self):
+        tasks = [t for t in asyncio.all_tasks(self._loop) if t is not asyncio.current_task(self._loop)]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._loop.stop()
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop)
+        self._thread.join()
@@ -9,10 +9,14 @@ is_py2 = (_ver[0] == 2)
 #: Python 3.x?
 is_py3 = (_ver[0] == 3)
 
+#: Python 3.5 or newer? (native coroutines)
+is_py35_or_newer = (_ver >= (3, 5))
+
 if is_py2:
     import Cookie as cookies
     from urllib import urlencode, quote_plus, unquote_plus
-    from urlparse import urlsplit
+    from urlparse import urlsplit, urljoin, parse_qsl
+    import Queue as queue
     import SocketServer as socketserver
     import thread
     from StringIO import StringIO
@@ -34,7 +38,8 @@ if is_py2:
 
 
 elif is_py3:
-    from urllib.parse import urlencode, quote_plus, urlsplit, unquote_plus
+    from urllib.parse import urlencode, quote_plus, urlsplit, unquote_plus, urljoin, parse_qsl
+    import queue
     from http import cookies
     import socketserver
     import _thread as thread
@@ -1,14 +1,38 @@
 from sdklib.http.base import HttpSdk, HttpRequestContext, generate_url_path, request_from_context
 from sdklib.http.response import HttpResponse
 from sdklib.http.renderers import get_renderer, url_encode
+from sdklib.http.pool import PoolManagerRegistry, pool_registry
+from sdklib.http.cache import HttpCache
+from sdklib.http.retry import RetryPolicy, RetryBudget, retry_budget
+from sdklib.http.ratelimit import RateLimiter
+from sdklib.http.circuitbreaker import CircuitBreaker, CircuitBreakerOpenError
+from sdklib.http.singleflight import SingleFlight
+from sdklib.http.metrics import MetricsRegistry
+from sdklib.http.compression import BodyCompression
+from sdklib.http.decoders import register_decoder, unregister_decoder
+from sdklib.http.jsoncodec import JsonCodec, StdlibJsonCodec, find_json_codec, get_json_codec, set_json_codec
+from sdklib.http.prepared import PreparedRequest
+from sdklib.http.pagination import CursorPagination, OffsetPagination, LinkHeaderPagination
+from sdklib.http.timings import RequestTimings, add_timings_hook, remove_timings_hook
 from sdklib.util.design_pattern import Singleton
+from sdklib.compat import is_py35_or_newer
 
 
 __all__ = [
     'HttpSdk', 'HttpResponse', 'get_renderer', 'HttpRequestContext', 'api', 'HttpRequestContextSingleton', 'url_encode',
-    'generate_url_path', 'request_from_context'
+    'generate_url_path', 'request_from_context', 'PoolManagerRegistry', 'pool_registry',
+    'HttpCache', 'RetryPolicy', 'RetryBudget', 'retry_budget',
+    'RateLimiter', 'CircuitBreaker', 'CircuitBreakerOpenError',
+    'SingleFlight', 'RequestTimings', 'add_timings_hook', 'remove_timings_hook',
+    'MetricsRegistry', 'CursorPagination', 'OffsetPagination', 'LinkHeaderPagination',
+    'BodyCompression', 'PreparedRequest', 'JsonCodec', 'StdlibJsonCodec', 'find_json_codec', 'get_json_codec',
+    'set_json_codec', 'register_decoder', 'unregister_decoder'
 ]
 
+if is_py35_or_newer:
+    from sdklib.http.aio import AsyncHttpSdk, async_request_from_context
+    __all__ += ['AsyncHttpSdk', 'async_request_from_context']
+
 
 api = HttpSdk()
 
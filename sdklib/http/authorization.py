@@ -8,9 +8,11 @@ from hashlib import sha1
 
 from sdklib.compat import convert_str_to_bytes, convert_bytes_to_str
 from sdklib.http import url_encode
-from sdklib.http.renderers import FormRenderer, MultiPartRenderer, JSONRenderer, guess_file_name_stream_type_header
+from sdklib.http.renderers import FormRenderer, MultiPartRenderer, JSONRenderer, guess_file_name_source_type_header
+from sdklib.http.multipart import FileSource
+from sdklib.http.compression import READ_CHUNK_SIZE
 from sdklib.http.headers import (
-    AUTHORIZATION_HEADER_NAME, X_11PATHS_DATE_HEADER_NAME, X_11PATHS_BODY_HASH_HEADER_NAME,
+    AUTHORIZATION_HEADER_NAME, CONTENT_ENCODING_HEADER_NAME, X_11PATHS_DATE_HEADER_NAME, X_11PATHS_BODY_HASH_HEADER_NAME,
     X_11PATHS_FILE_HASH_HEADER_NAME
 )
 from sdklib.util.times import get_current_utc
@@ -75,8 +77,20 @@ def _sign_data(secret, data):
 
 
 def _hash_body(context):
-    body, _ = context.renderer.encode_params(context.body_params, files=context.files)
-    return sha1(body).hexdigest()
+    body = getattr(context, "rendered_body", None)
+    if not isinstance(body, (bytes, str)) and CONTENT_ENCODING_HEADER_NAME in context.headers:
+        # streamed and compressed as it is sent: hash the compressed stream, then rewind it for the upload
+        if not hasattr(body, "seek"):
+            raise ValueError("The body hash of a compressed body that cannot be rewound cannot be calculated.")
+        body_hash = sha1()
+        for chunk in iter(lambda: body.read(READ_CHUNK_SIZE), b""):
+            body_hash.update(chunk)
+        body.seek(0)
+        return body_hash.hexdigest()
+    if not isinstance(body, (bytes, str)):
+        # not rendered yet (or streamed): render it
+        body, _ = context.renderer.encode_params(context.body_params, files=context.files)
+    return sha1(convert_str_to_bytes(body)).hexdigest()
 
 
 def _hash_file(context):
@@ -84,8 +98,14 @@ def _hash_file(context):
     assert len(files) == 1, "This method only can sign requests with one file"
 
     for param in files:
-        _, fdata, _, _ = guess_file_name_stream_type_header(files[param])
-        return sha1(fdata).hexdigest()
+        _, fsource, _, _ = guess_file_name_source_type_header(files[param])
+        if not isinstance(fsource, FileSource):
+            return sha1(fsource).hexdigest()
+        # hash the file in chunks: it is not loaded in memory and file objects are rewound for the upload
+        file_hash = sha1()
+        for chunk in fsource.iter_chunks():
+            file_hash.update(chunk)
+        return file_hash.hexdigest()
 
 
 def _get_utc():
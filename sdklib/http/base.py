@@ -1,43 +1,49 @@
-import copy
-import urllib3
+from functools import partial
+from multiprocessing.pool import ThreadPool
 
 from sdklib.http.renderers import MultiPartRenderer, get_renderer, default_renderer
 from sdklib.http.session import Cookie
-from sdklib.compat import urlencode, convert_unicode_to_native_str
+from sdklib.http.pool import pool_registry, DEFAULT_NUM_POOLS, DEFAULT_MAXSIZE, DEFAULT_BLOCK
+from sdklib.compat import urlencode, convert_unicode_to_native_str, queue, str
 from sdklib.util.parser import parse_args
-from sdklib.util.urls import (
-    get_hostname_parameters_from_url, ensure_url_path_starts_with_slash, ensure_url_path_format_suffix_starts_with_dot
-)
+from sdklib.util.urls import get_hostname_parameters_from_url, compile_url_path
 from sdklib.util.structures import CaseInsensitiveDict
 from sdklib.http.response import HttpResponse
 from sdklib.http.methods import *
-from sdklib.util.logger import log_print_request, log_print_response
+from sdklib.http.prepared import PreparedRequest
+from sdklib.http.pagination import DEFAULT_PREFETCH, iter_prefetched
+from sdklib.http.timings import (
+    RequestTimings, set_current_timings, timings_hooks, call_timings_hooks, _clock
+)
+from sdklib.util.logger import log_print_request, log_print_response, should_log_request
+
+
+def _copy_params(params):
+    # params are dicts or lists of (name, value) pairs; other values (e.g. an already encoded body) are immutable
+    if isinstance(params, dict):
+        return params.copy()
+    if isinstance(params, list):
+        return list(params)
+    return params
 
 
 def generate_url_path(url_path_format, prefix=None, format_suffix=None, allow_key_errors=True, **kwargs):
-    prefix = prefix or ''
-    suffix = ensure_url_path_format_suffix_starts_with_dot(format_suffix)
-    while True:
-        try:
-            return ensure_url_path_starts_with_slash(prefix + url_path_format.format(**kwargs) + suffix)
-        except KeyError as e:
-            if not allow_key_errors:
-                raise
-            key = e.args[0]
-            kwargs[key] = '{%s}' % key
-            continue
-        except:
-            raise
+    return compile_url_path(url_path_format, prefix, format_suffix).render(kwargs, allow_key_errors=allow_key_errors)
 
 
-def request_from_context(context):
+def prepare_request_from_context(context, timings=None):
     """
-    Do http requests from context.
+    Build the request to send from context: url path generation, body rendering, authentication and cookies.
 
-    :param context: request context.
+    :param context: request context. It is not modified.
+    :param timings: RequestTimings recording the duration of each stage. By default: None (not recorded).
+    :return: tuple (new_context, url, body) where new_context is the context the request was built with.
     """
-    new_context = copy.deepcopy(context)
+    if timings is None:
+        timings = RequestTimings()
+    new_context = context.copy()
     assert new_context.method in ALLOWED_METHODS
+    timings.lap("_copy")
 
     new_context.url_path = generate_url_path(
         new_context.url_path,
@@ -45,13 +51,25 @@ def request_from_context(context):
         format_suffix=new_context.url_path_format,
         **new_context.url_path_params
     )
+    timings.lap("_url")
 
     if new_context.body_params or new_context.files:
         body, content_type = new_context.renderer.encode_params(new_context.body_params, files=new_context.files)
         if new_context.update_content_type and HttpSdk.CONTENT_TYPE_HEADER_NAME not in new_context.headers:
             new_context.headers[HttpSdk.CONTENT_TYPE_HEADER_NAME] = content_type
+        if hasattr(body, 'read') and hasattr(body, '__len__') and \
+                HttpSdk.CONTENT_LENGTH_HEADER_NAME not in new_context.headers:
+            # file-like bodies are streamed, so their length has to be sent explicitly
+            new_context.headers[HttpSdk.CONTENT_LENGTH_HEADER_NAME] = str(len(body))
+        timings.lap("_render")
+        if new_context.compression is not None:
+            body = new_context.compression.compress(body, new_context.headers)
+            timings.lap("_compress")
     else:
         body = None
+        timings.lap("_render")
+    # authentication instances sign the body actually sent
+    new_context.rendered_body = body
 
     authentication_instances = new_context.authentication_instances
     for auth_obj in authentication_instances:
@@ -59,39 +77,169 @@ def request_from_context(context):
 
     if HttpSdk.COOKIE_HEADER_NAME not in new_context.headers and not new_context.cookie.is_empty():
         new_context.headers[HttpSdk.COOKIE_HEADER_NAME] = new_context.cookie.as_cookie_header_value()
+    timings.lap("_authenticate")
 
     url = "%s%s" % (new_context.host, new_context.url_path)
     if new_context.query_params:
         url += "?%s" % (urlencode(new_context.query_params))
+    timings.lap("_url")
+
+    return new_context, url, body
+
+
+def request_from_context(context):
+    """
+    Do http requests from context.
 
-    log_print_request(new_context.method, url, new_context.query_params, new_context.headers, body)
-    # ensure method and url are native str
-    r = HttpSdk.get_pool_manager(new_context.proxy).request(
-        convert_unicode_to_native_str(new_context.method),
-        convert_unicode_to_native_str(url),
-        body=body,
-        headers=HttpSdk.convert_headers_to_native_str(new_context.headers),
-        redirect=new_context.redirect,
-        timeout=new_context.timeout
+    The duration of each stage of the request is set to the `timings` attribute of the response (see
+    sdklib.http.timings) and sent to the registered timings hooks.
+
+    :param context: request context.
+    """
+    timings = RequestTimings()
+    new_context, url, body = prepare_request_from_context(context, timings)
+
+    spool = new_context.spool_threshold is not None
+    cache = None if new_context.stream or spool else new_context.response_cache
+    cache_entry = None
+    if cache is not None:
+        cache_entry, fresh = cache.lookup(new_context.method, url, new_context.headers)
+        timings.lap("_cache")
+        if fresh:
+            return finish_response(context, new_context.response_class(cache_entry.to_response()), timings)
+        if cache_entry is not None:
+            new_context.headers.update(cache_entry.validation_headers())
+
+    retry_policy = new_context.retry_policy
+    send = partial(
+        send_request, new_context, url, body,
+        retries=None if retry_policy is None else retry_policy.get_transport_retries(new_context.method),
+        timings=timings
+    )
+    if new_context.metrics is not None:
+        send = new_context.metrics.instrument(send, new_context.host, new_context.method, context.url_path, body)
+    if new_context.circuit_breaker is not None:
+        send = new_context.circuit_breaker.protect(send, new_context.host, context.url_path)
+    if new_context.rate_limiter is not None:
+        # outside the circuit breaker: the rate limit waits are neither timed nor holding half-open permits
+        send = new_context.rate_limiter.limit(send, new_context.host, context.url_path)
+    if retry_policy is not None:
+        send = partial(retry_policy.call, new_context.method, send, body)
+
+    def fetch():
+        r = send()
+        if cache is None:
+            return r
+        r = cache.update(new_context.method, url, new_context.headers, r, cache_entry)
+        timings.lap("_cache")
+        return r
+
+    single_flight = new_context.single_flight
+    if single_flight is not None and single_flight.is_coalescable(new_context, body):
+        r = single_flight.do(single_flight.get_key(new_context, url, body), fetch)
+        timings.lap("_single_flight")
+    else:
+        r = fetch()
+    response = new_context.response_class(r)
+    if spool:
+        response.spool_threshold = new_context.spool_threshold
+        if not new_context.stream:
+            # the body is downloaded before returning, as for the requests not spooled
+            response.body
+    return finish_response(context, response, timings)
+
+
+def finish_response(context, response, timings):
+    """
+    Set the timings of a response and send them to the timings hooks.
+    """
+    timings.lap("_response")
+    timings.finish()
+    response.timings = timings.as_har()
+    if timings_hooks:
+        call_timings_hooks(context, response, response.timings)
+    return response
+
+
+def send_request(context, url, body, retries=None, timings=None):
+    """
+    Send a request built by `prepare_request_from_context` through the shared pool manager.
+
+    :param timings: RequestTimings recording the stages of the request. By default: None (not recorded).
+    :return: urllib3 response.
+    """
+    if timings is None:
+        timings = RequestTimings()
+    timings.lap("_throttle")
+    log = should_log_request()
+    if log:
+        log_print_request(context.method, url, context.query_params, context.headers, body)
+        timings.lap("_log")
+    # spooled bodies are read by the response
+    preload_content = not context.stream and context.spool_threshold is None
+    start, network_time = _clock(), timings.network_time()
+    pool_manager = HttpSdk.get_pool_manager(
+        context.proxy, num_pools=context.num_pools, maxsize=context.pool_maxsize, block=context.pool_block
     )
-    log_print_response(r.status, r.data, r.headers)
-    r = new_context.response_class(r)
+    previous_timings = set_current_timings(timings)
+    try:
+        # ensure method and url are native str
+        r = pool_manager.request(
+            convert_unicode_to_native_str(context.method),
+            convert_unicode_to_native_str(url),
+            body=body,
+            headers=HttpSdk.convert_headers_to_native_str(context.headers),
+            redirect=context.redirect,
+            timeout=context.timeout,
+            retries=retries,
+            preload_content=preload_content
+        )
+    finally:
+        set_current_timings(previous_timings)
+    if preload_content and timings.response_started is not None:
+        # the body is preloaded once the response headers are received
+        timings.add("receive", max(0, _clock() - timings.response_started))
+        timings.response_started = None
+    # time of the call not spent in the network stages recorded by the connections
+    timings.add("_transport", max(0, _clock() - start - (timings.network_time() - network_time)))
+    timings.mark()
+    if log:
+        log_print_response(r.status, r.data if preload_content else None, r.headers)
+        timings.lap("_log")
     return r
 
 
 class HttpRequestContext(object):
     """
     Context object used to save http request parameters.
+
+    Values are kept in slots (contexts have no instance dict). Headers, url path params, authentication instances and
+    cookie are created on first access, so building contexts that never use them (e.g. replaying HAR logs) is cheap.
+    The constructor, `copy` and `replace` set the slots directly; assigning an attribute goes through the same
+    normalization as the constructor (e.g. ``context.method = "post"`` stores 'POST').
     """
 
-    fields_to_clear = [
+    __slots__ = (
+        'host', 'proxy', 'prefix_url_path', 'url_path_format', 'query_params', 'body_params', 'files', 'timeout',
+        'response_cache', 'retry_policy', 'rate_limiter', 'circuit_breaker', 'single_flight', 'metrics', 'compression',
+        'spool_threshold',
+        # body sent, as rendered (and compressed) by `prepare_request_from_context`. None until then.
+        'rendered_body',
+        '_method', '_url_path', '_url_path_params', '_headers', '_renderer', '_authentication_instances',
+        '_response_class', '_update_content_type', '_redirect', '_cookie', '_num_pools', '_pool_maxsize',
+        '_pool_block', '_stream', '_fields_to_clear'
+    )
+
+    default_fields_to_clear = [
         'method', 'url_path', 'body_params', 'query_params', 'files', 'renderer'
     ]
 
     def __init__(self, host=None, proxy=None, method=None, prefix_url_path=None, url_path=None, url_path_params=None,
                  url_path_format=None, headers=None, query_params=None, body_params=None, files=None, renderer=None,
                  authentication_instances=None, response_class=None, update_content_type=None, redirect=None,
-                 cookie=None, timeout=None):
+                 cookie=None, timeout=None, num_pools=None, pool_maxsize=None, pool_block=None, stream=None,
+                 response_cache=None, retry_policy=None, rate_limiter=None,
+                 circuit_breaker=None, single_flight=None, metrics=None, compression=None, spool_threshold=None):
         """
 
         :param host:
@@ -113,41 +261,87 @@ class HttpRequestContext(object):
         :param redirect: redirect requests automatically. By default: False
         :param cookie:
         :param timeout:
+        :param num_pools: number of connection pools (one per host) kept by the shared pool manager. By default: 10.
+        :param pool_maxsize: number of connections kept alive per host. By default: 10.
+        :param pool_block: (bool) wait for a free connection instead of opening a new one when the pool is full.
+            By default: False.
+        :param stream: (bool) do not download the response body until it is accessed, so it can be read
+            incrementally with iter_content, iter_lines or readinto. By default: False.
+        :param response_cache: HttpCache used to store and revalidate responses. Streamed requests are not cached.
+            By default: None (no cache).
+        :param retry_policy: RetryPolicy used to retry failed requests. By default: None (failed requests are not
+            retried).
+        :param rate_limiter: RateLimiter delaying requests (and retries) to stay under the allowed rate of the host.
+            By default: None (no limit).
+        :param circuit_breaker: CircuitBreaker failing requests at once while their host is failing.
+            By default: None.
+        :param single_flight: SingleFlight coalescing identical concurrent requests into one. By default: None.
+        :param metrics: MetricsRegistry recording the requests sent. By default: None.
+        :param compression: BodyCompression compressing the rendered request bodies. By default: None.
+        :param spool_threshold: size (in bytes) above which response bodies are spooled to a temporary file while they
+            are read, instead of being kept in memory (see HttpResponse). Responses are not cached when it is set.
+            By default: None (bodies are kept in memory).
         """
         self.host = host
         self.proxy = proxy
-        self.method = method
+        self._method = method.upper() if method else GET_METHOD
         self.prefix_url_path = prefix_url_path
-        self.url_path = url_path
-        self.url_path_params = url_path_params
+        self._url_path = url_path if url_path else '/'
+        self._url_path_params = url_path_params or None
         self.url_path_format = url_path_format
-        self.headers = headers
+        self._headers = CaseInsensitiveDict(headers) if headers else None
         self.query_params = query_params
         self.body_params = body_params
         self.files = files
-        self.renderer = renderer
-        self.authentication_instances = authentication_instances
-        self.response_class = response_class
-        self.update_content_type = update_content_type
-        self.redirect = redirect
-        self.cookie = cookie
+        self._renderer = self._get_renderer(renderer)
+        self._authentication_instances = authentication_instances or None
+        self._response_class = response_class or HttpResponse
+        self._update_content_type = update_content_type is not False
+        self._redirect = redirect is True
+        self._cookie = cookie or None
         self.timeout = timeout
+        self._num_pools = num_pools or DEFAULT_NUM_POOLS
+        self._pool_maxsize = pool_maxsize or DEFAULT_MAXSIZE
+        self._pool_block = pool_block if pool_block is True else DEFAULT_BLOCK
+        self._stream = stream is True
+        self.response_cache = response_cache
+        self.retry_policy = retry_policy
+        self.rate_limiter = rate_limiter
+        self.circuit_breaker = circuit_breaker
+        self.single_flight = single_flight
+        self.metrics = metrics
+        self.compression = compression
+        self.spool_threshold = spool_threshold
+        self.rendered_body = None
+        self._fields_to_clear = None
 
     @property
-    def headers(self):
-        return self._headers
+    def fields_to_clear(self):
+        """
+        Fields reset by `clear`. By default: **default_fields_to_clear**.
+        """
+        if self._fields_to_clear is None:
+            return self.default_fields_to_clear
+        return self._fields_to_clear
 
-    @headers.setter
-    def headers(self, value):
-        self._headers = value or dict()
+    @fields_to_clear.setter
+    def fields_to_clear(self, value):
+        self._fields_to_clear = value
 
     @property
     def headers(self):
+        if self._headers is None:
+            self._headers = CaseInsensitiveDict()
         return self._headers
 
     @headers.setter
     def headers(self, value):
-        self._headers = CaseInsensitiveDict(value) or CaseInsensitiveDict()
+        self._headers = CaseInsensitiveDict(value) if value else None
+
+    def _get_renderer(self, value):
+        if self.files and not isinstance(value, MultiPartRenderer):
+            return MultiPartRenderer()
+        return value or default_renderer
 
     @property
     def renderer(self):
@@ -155,7 +349,7 @@ class HttpRequestContext(object):
 
     @renderer.setter
     def renderer(self, value):
-        self._renderer = value or default_renderer if not self.files else MultiPartRenderer()
+        self._renderer = self._get_renderer(value)
 
     @property
     def url_path(self):
@@ -175,19 +369,23 @@ class HttpRequestContext(object):
 
     @property
     def url_path_params(self):
+        if self._url_path_params is None:
+            self._url_path_params = dict()
         return self._url_path_params
 
     @url_path_params.setter
     def url_path_params(self, value):
-        self._url_path_params = value or dict()
+        self._url_path_params = value or None
 
     @property
     def authentication_instances(self):
+        if self._authentication_instances is None:
+            self._authentication_instances = []
         return self._authentication_instances
 
     @authentication_instances.setter
     def authentication_instances(self, value):
-        self._authentication_instances = value or []
+        self._authentication_instances = value or None
 
     @property
     def response_class(self):
@@ -203,7 +401,7 @@ class HttpRequestContext(object):
 
     @update_content_type.setter
     def update_content_type(self, value):
-        self._update_content_type = value if value is False else True
+        self._update_content_type = value is not False
 
     @property
     def redirect(self):
@@ -211,23 +409,131 @@ class HttpRequestContext(object):
 
     @redirect.setter
     def redirect(self, value):
-        self._redirect = value if value is True else False
+        self._redirect = value is True
 
     @property
     def cookie(self):
+        if self._cookie is None:
+            self._cookie = Cookie()
         return self._cookie
 
     @cookie.setter
     def cookie(self, value):
-        self._cookie = value or Cookie()
+        self._cookie = value or None
 
     @property
-    def timeout(self):
-        return self._timeout
+    def num_pools(self):
+        return self._num_pools
+
+    @num_pools.setter
+    def num_pools(self, value):
+        self._num_pools = value or DEFAULT_NUM_POOLS
 
-    @timeout.setter
-    def timeout(self, value):
-        self._timeout = value
+    @property
+    def pool_maxsize(self):
+        return self._pool_maxsize
+
+    @pool_maxsize.setter
+    def pool_maxsize(self, value):
+        self._pool_maxsize = value or DEFAULT_MAXSIZE
+
+    @property
+    def pool_block(self):
+        return self._pool_block
+
+    @pool_block.setter
+    def pool_block(self, value):
+        self._pool_block = value if value is True else DEFAULT_BLOCK
+
+    @property
+    def stream(self):
+        return self._stream
+
+    @stream.setter
+    def stream(self, value):
+        self._stream = value is True
+
+    def _new_view(self):
+        # slots are assigned one by one: it is several times faster than a loop over __slots__ or copy.copy
+        cls = self.__class__
+        new_context = cls.__new__(cls)
+        new_context.host = self.host
+        new_context.proxy = self.proxy
+        new_context.prefix_url_path = self.prefix_url_path
+        new_context.url_path_format = self.url_path_format
+        new_context.query_params = self.query_params
+        new_context.body_params = self.body_params
+        new_context.files = self.files
+        new_context.timeout = self.timeout
+        new_context.response_cache = self.response_cache
+        new_context.retry_policy = self.retry_policy
+        new_context.rate_limiter = self.rate_limiter
+        new_context.circuit_breaker = self.circuit_breaker
+        new_context.single_flight = self.single_flight
+        new_context.metrics = self.metrics
+        new_context.compression = self.compression
+        new_context.spool_threshold = self.spool_threshold
+        new_context.rendered_body = self.rendered_body
+        new_context._method = self._method
+        new_context._url_path = self._url_path
+        new_context._url_path_params = self._url_path_params
+        new_context._headers = self._headers
+        new_context._renderer = self._renderer
+        new_context._authentication_instances = self._authentication_instances
+        new_context._response_class = self._response_class
+        new_context._update_content_type = self._update_content_type
+        new_context._redirect = self._redirect
+        new_context._cookie = self._cookie
+        new_context._num_pools = self._num_pools
+        new_context._pool_maxsize = self._pool_maxsize
+        new_context._pool_block = self._pool_block
+        new_context._stream = self._stream
+        new_context._fields_to_clear = self._fields_to_clear
+        state = getattr(self, '__dict__', None)
+        if state:
+            # attributes of subclasses without __slots__
+            new_context.__dict__.update(state)
+        return new_context
+
+    def copy(self):
+        """
+        Return a per-request view of this context, without cloning its data.
+
+        Headers, query params, body params and url path params are shallow-copied, so they can be modified (e.g. by
+        authentication instances) without changing this context. Any other value (files, renderer, authentication
+        instances...) and the values inside the params are shared with this context: change them on the view by
+        assigning a new value instead of modifying them in place.
+
+        :return: HttpRequestContext
+        """
+        new_context = self._new_view()
+        if self._headers is not None:
+            new_context._headers = self._headers.copy()
+        if self.query_params:
+            new_context.query_params = _copy_params(self.query_params)
+        if self.body_params:
+            new_context.body_params = _copy_params(self.body_params)
+        if self._url_path_params is not None:
+            new_context._url_path_params = self._url_path_params.copy()
+        return new_context
+
+    def replace(self, **changes):
+        """
+        Return a per-request view of this context (see `copy`) with some fields changed, e.g.
+        ``context.replace(method="POST", body_params={"name": "value"})``. Changed fields are normalized as by the
+        constructor.
+
+        :return: HttpRequestContext
+        """
+        new_context = self.copy()
+        if 'files' in changes:
+            # as in the constructor, files are set before the renderer is chosen
+            new_context.files = changes.pop('files')
+            if 'renderer' not in changes:
+                new_context.renderer = new_context._renderer
+        for name, value in changes.items():
+            setattr(new_context, name, value)
+        return new_context
 
     def clear(self, *args):
         """
@@ -262,6 +568,19 @@ class HttpSdk(object):
     response_class = HttpResponse
     incognito_mode = False
 
+    num_pools = DEFAULT_NUM_POOLS
+    pool_maxsize = DEFAULT_MAXSIZE
+    pool_block = DEFAULT_BLOCK
+
+    response_cache = None
+    retry_policy = None
+    rate_limiter = None
+    circuit_breaker = None
+    single_flight = None
+    metrics = None
+    compression = None
+    spool_threshold = None
+
     def __init__(self, host=None, proxy=None, default_renderer=None):
         self.host = host or self.DEFAULT_HOST
         self.proxy = proxy or self.DEFAULT_PROXY
@@ -331,23 +650,31 @@ class HttpSdk(object):
         return headers
 
     @staticmethod
-    def get_pool_manager(proxy=None):
-        if proxy is not None and proxy.startswith("socks"):
-            from urllib3.contrib.socks import SOCKSProxyManager
-            pm = SOCKSProxyManager(
-                proxy,
-                num_pools=10,
-            )
-        elif proxy is not None:
-            pm = urllib3.ProxyManager(
-                proxy,
-                num_pools=10,
-            )
-        else:
-            pm = urllib3.PoolManager(
-                num_pools=10,
-            )
-        return pm
+    def get_pool_manager(proxy=None, num_pools=DEFAULT_NUM_POOLS, maxsize=DEFAULT_MAXSIZE, block=DEFAULT_BLOCK):
+        """
+        Get the pool manager shared by every request sent through the given proxy with the same pool settings.
+
+        :param proxy: proxy url or None.
+        :param num_pools: number of connection pools (one per host).
+        :param maxsize: number of connections kept alive per host.
+        :param block: wait for a free connection when the pool is full.
+        :return: PoolManager, ProxyManager or SOCKSProxyManager
+        """
+        return pool_registry.get(proxy, num_pools=num_pools, maxsize=maxsize, block=block)
+
+    @staticmethod
+    def close_pool_managers():
+        """
+        Close every connection kept alive by the shared pool managers.
+        """
+        pool_registry.close()
+
+    @staticmethod
+    def clear_pool_managers():
+        """
+        Close every connection kept alive by the shared pool managers and discard them.
+        """
+        pool_registry.clear()
 
     @classmethod
     def set_default_host(cls, value):
@@ -410,6 +737,19 @@ class HttpSdk(object):
             according to the rendered body. By default: True.
         :return:
         """
+        context = self.build_request_context(method, url_path, headers, query_params, body_params, files, **kwargs)
+        res = self.http_request_from_context(context)
+        self.cookie.update(res.cookie)
+        return res
+
+    def build_request_context(self, method, url_path, headers=None, query_params=None, body_params=None, files=None,
+                              **kwargs):
+        """
+        Build the request context used by `_http_request`, filling every parameter not given in kwargs with the sdk
+        configuration.
+
+        :return: HttpRequestContext
+        """
         host = kwargs.get('host', self.host)
         proxy = kwargs.get('proxy', self.proxy)
         renderer = kwargs.get('renderer', MultiPartRenderer() if files else self.default_renderer)
@@ -418,11 +758,23 @@ class HttpSdk(object):
         url_path_format = kwargs.get('url_path_format', self.url_path_format)
         update_content_type = kwargs.get('update_content_type', True)
         redirect = kwargs.get('redirect', False)
+        num_pools = kwargs.get('num_pools', self.num_pools)
+        pool_maxsize = kwargs.get('pool_maxsize', self.pool_maxsize)
+        pool_block = kwargs.get('pool_block', self.pool_block)
+        stream = kwargs.get('stream', False)
+        response_cache = kwargs.get('response_cache', self.response_cache)
+        retry_policy = kwargs.get('retry_policy', self.retry_policy)
+        rate_limiter = kwargs.get('rate_limiter', self.rate_limiter)
+        circuit_breaker = kwargs.get('circuit_breaker', self.circuit_breaker)
+        single_flight = kwargs.get('single_flight', self.single_flight)
+        metrics = kwargs.get('metrics', self.metrics)
+        compression = kwargs.get('compression', self.compression)
+        spool_threshold = kwargs.get('spool_threshold', self.spool_threshold)
 
         if headers is None:
             headers = self.default_headers()
 
-        context = HttpRequestContext(
+        return HttpRequestContext(
             host=host, proxy=proxy, method=method,
             prefix_url_path=prefix_url_path,
             url_path=url_path,
@@ -436,11 +788,20 @@ class HttpSdk(object):
             response_class=self.response_class,
             authentication_instances=authentication_instances,
             update_content_type=update_content_type,
-            redirect=redirect
+            redirect=redirect,
+            num_pools=num_pools,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+            stream=stream,
+            response_cache=response_cache,
+            retry_policy=retry_policy,
+            rate_limiter=rate_limiter,
+            circuit_breaker=circuit_breaker,
+            single_flight=single_flight,
+            metrics=metrics,
+            compression=compression,
+            spool_threshold=spool_threshold
         )
-        res = self.http_request_from_context(context)
-        self.cookie.update(res.cookie)
-        return res
 
     def get(self, url_path, headers=None, query_params=None, **kwargs):
         return self._http_request(GET_METHOD, url_path, headers, query_params, None, None, **kwargs)
@@ -460,6 +821,151 @@ class HttpSdk(object):
     def delete(self, url_path, headers=None, query_params=None, **kwargs):
         return self._http_request(DELETE_METHOD, url_path, headers, query_params, None, None, **kwargs)
 
+    def _request_from_batch_item(self, item):
+        if isinstance(item, HttpRequestContext):
+            res = self.http_request_from_context(item)
+            self.cookie.update(res.cookie)
+            return res
+        method, url_path = item[0], item[1]
+        kwargs = item[2] if len(item) > 2 else {}
+        return self._http_request(method, url_path, **kwargs)
+
+    def _safe_request_from_batch_item(self, indexed_item):
+        index, item = indexed_item
+        try:
+            return index, self._request_from_batch_item(item)
+        except Exception as e:
+            return index, e
+
+    def iter_request_many(self, requests, concurrency=None, ordered=False):
+        """
+        Do several http requests concurrently, sharing the connection pool, and yield their responses.
+
+        A request that fails does not abort the batch: the raised exception is yielded in place of its response.
+
+        :param requests: iterable of HttpRequestContext objects or tuples ``(method, url_path)`` or
+            ``(method, url_path, kwargs)``, where kwargs are the parameters accepted by `_http_request` (headers,
+            query_params, body_params, files...).
+        :param concurrency: maximum number of requests in flight. By default: pool_maxsize.
+        :param ordered: (bool) yield responses in the same order as requests instead of as they complete.
+            By default: False.
+        :return: generator of tuples ``(index, response_or_exception)``
+        """
+        # requests are read lazily: no more than `window` of them are sent and not yet yielded, so large (or endless)
+        # iterables of requests are not loaded in memory
+        window = concurrency or self.pool_maxsize
+        pool = ThreadPool(processes=window)
+        completed = queue.Queue()
+        items = enumerate(requests)
+        exhausted = False
+        submitted = yielded = 0
+        buffered = {}
+        try:
+            while True:
+                while not exhausted and submitted - yielded < window:
+                    item = next(items, None)
+                    if item is None:
+                        exhausted = True
+                    else:
+                        pool.apply_async(self._safe_request_from_batch_item, (item,), callback=completed.put)
+                        submitted += 1
+                if yielded == submitted:
+                    return
+                if ordered:
+                    while yielded not in buffered:
+                        index, res = completed.get()
+                        buffered[index] = res
+                    result = (yielded, buffered.pop(yielded))
+                else:
+                    result = completed.get()
+                yielded += 1
+                yield result
+        finally:
+            pool.terminate()
+
+    def request_many(self, requests, concurrency=None):
+        """
+        Do several http requests concurrently, sharing the connection pool.
+
+        A request that fails does not abort the batch: the raised exception is returned in place of its response.
+
+        :param requests: see `iter_request_many`.
+        :param concurrency: maximum number of requests in flight. By default: pool_maxsize.
+        :return: list of responses (or exceptions) in the same order as requests.
+        """
+        return [res for _, res in self.iter_request_many(requests, concurrency=concurrency, ordered=True)]
+
+    def prepare(self, method, url_path, headers=None, query_params=None, body_params=None, files=None, **kwargs):
+        """
+        Build once the request to an endpoint called many times, e.g. in a polling loop.
+
+        Everything given here (and the sdk configuration) is frozen in the returned PreparedRequest; only url path
+        params, query params, body params and extra headers can change on each `PreparedRequest.send` call. When no
+        headers are given, the current cookies of the sdk are sent with each request.
+
+        :param method: HTTP method.
+        :param url_path: url path template, e.g. '/items/{item_id}/'.
+        :param kwargs: other parameters accepted by `_http_request`.
+        :return: PreparedRequest
+        """
+        context = self.build_request_context(method, url_path, headers, query_params, body_params, files, **kwargs)
+        return PreparedRequest(
+            self, context, cookie_from_sdk=headers is None,
+            allow_fast_path=type(self).http_request_from_context is HttpSdk.http_request_from_context
+        )
+
+    def iter_pages(self, url_path, pagination, query_params=None, method=GET_METHOD, max_pages=None, **kwargs):
+        """
+        Request the pages of a list endpoint one after the other.
+
+        :param url_path: url path of the first page.
+        :param pagination: pagination strategy (CursorPagination, OffsetPagination, LinkHeaderPagination...).
+        :param query_params: query params of the first page.
+        :param method: HTTP method. By default: GET.
+        :param max_pages: maximum number of pages requested. By default: None (every page).
+        :param kwargs: other parameters accepted by `_http_request` (headers, body_params...), sent with every page.
+        :return: generator of tuples ``(response, items)``
+        """
+        request = pagination.first_request(url_path, query_params)
+        if "host" not in request.kwargs:
+            # the host of the current page, for the strategies following links (see LinkHeaderPagination)
+            request = request._replace(kwargs=dict(request.kwargs, host=kwargs.get("host", self.host)))
+        pages = 0
+        while request is not None and (max_pages is None or pages < max_pages):
+            page_kwargs = dict(kwargs)
+            page_kwargs.update(request.kwargs)
+            response = self._http_request(
+                method, request.url_path, query_params=request.query_params, **page_kwargs
+            )
+            items = pagination.get_items(response)
+            pages += 1
+            request = pagination.next_request(response, items, request)
+            yield response, items
+
+    def paginate(self, url_path, pagination, query_params=None, prefetch=DEFAULT_PREFETCH, **kwargs):
+        """
+        Iterate lazily over the items of every page of a list endpoint.
+
+        The next page is requested in a background thread while the caller processes the items of the current one.
+        No more than prefetch pages are read ahead, so memory does not grow with the number of pages.
+
+        :param url_path: url path of the first page.
+        :param pagination: pagination strategy (CursorPagination, OffsetPagination, LinkHeaderPagination...).
+        :param query_params: query params of the first page.
+        :param prefetch: number of pages read ahead. 0 requests each page only when the previous one is consumed.
+        :param kwargs: see `iter_pages`.
+        :return: generator of items
+        """
+        pages = self.iter_pages(url_path, pagination, query_params, **kwargs)
+        if prefetch:
+            pages = iter_prefetched(pages, prefetch)
+        try:
+            for _, items in pages:
+                for item in items:
+                    yield item
+        finally:
+            pages.close()
+
     def login(self, **kwargs):
         """
         Login abstract method with default implementation.
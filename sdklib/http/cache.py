@@ -0,0 +1,354 @@
+"""
+Private HTTP cache for sdk responses.
+
+Responses to GET requests are stored in memory according to their Cache-Control/Expires headers and served while they
+are fresh. Stale responses with a validator (ETag or Last-Modified) are revalidated with a conditional request, and a
+304 Not Modified answer is turned back into the full cached response.
+
+It is a private (per user) cache: Authorization and Cookie headers are not part of the cache key, so do not share a
+cache between sdk instances using different credentials.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from urllib3 import HTTPResponse
+from urllib3._collections import HTTPHeaderDict
+
+from sdklib.http.methods import GET_METHOD, HEAD_METHOD
+from sdklib.http.headers import CACHE_CONTROL_HEADER_NAME, CONTENT_LENGTH_HEADER_NAME, PRAGMA_HEADER_NAME
+from sdklib.util.times import parse_http_date
+
+
+DEFAULT_MAX_ENTRIES = 1000
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+CACHEABLE_METHODS = (GET_METHOD,)
+CACHEABLE_STATUS_CODES = (200, 203, 204, 300, 301, 308, 404, 405, 410, 414, 501)
+
+# Headers of a 304 response that must not replace the stored ones.
+NOT_UPDATED_HEADERS = ("content-length", "content-encoding", "transfer-encoding", "content-range")
+# Headers of the original response that do not apply to the stored (already decoded) body.
+NOT_STORED_HEADERS = ("content-encoding", "transfer-encoding", "connection", "keep-alive")
+
+
+def parse_cache_control(value):
+    """
+    Parse a Cache-Control header value.
+
+    :param value: header value, e.g. 'public, max-age=60'.
+    :return: dict of lower-cased directives; directives without argument are mapped to None.
+    """
+    directives = {}
+    for directive in (value or "").split(","):
+        name, _, argument = directive.strip().partition("=")
+        if name:
+            directives[name.strip().lower()] = argument.strip().strip('"') if argument else None
+    return directives
+
+
+def _parse_seconds(value):
+    try:
+        return max(0, int(value))
+    except (TypeError, ValueError):
+        return None
+
+
+class CacheEntry(object):
+    """
+    Stored response.
+    """
+
+    def __init__(self, status, reason, headers, body, vary, stored_at):
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.body = body
+        self.vary = vary
+        self.stored_at = stored_at
+        self.size = self.compute_size()
+
+    def compute_size(self):
+        return len(self.body) + sum(len(name) + len(value) for name, value in self.headers.items())
+
+    @property
+    def cache_control(self):
+        return parse_cache_control(self.headers.get(CACHE_CONTROL_HEADER_NAME))
+
+    @property
+    def etag(self):
+        return self.headers.get("ETag")
+
+    @property
+    def last_modified(self):
+        return self.headers.get("Last-Modified")
+
+    def freshness_lifetime(self):
+        """
+        Number of seconds the response is fresh since it was generated (0 if it must always be revalidated).
+        """
+        cache_control = self.cache_control
+        if "no-cache" in cache_control:
+            return 0
+        max_age = _parse_seconds(cache_control.get("max-age"))
+        if max_age is not None:
+            return max_age
+        expires = self.headers.get("Expires")
+        if expires is not None:
+            expires = parse_http_date(expires)
+            date = parse_http_date(self.headers.get("Date")) or self.stored_at
+            return max(0, expires - date) if expires is not None else 0
+        return 0
+
+    def age(self, now=None):
+        now = time.time() if now is None else now
+        return (_parse_seconds(self.headers.get("Age")) or 0) + max(0, now - self.stored_at)
+
+    def is_fresh(self, request_cache_control=None, now=None):
+        """
+        Return True if the response can be served without contacting the server.
+
+        :param request_cache_control: parsed Cache-Control directives of the request.
+        """
+        request_cache_control = request_cache_control or {}
+        if "no-cache" in request_cache_control:
+            return False
+        lifetime = self.freshness_lifetime()
+        request_max_age = _parse_seconds(request_cache_control.get("max-age"))
+        if request_max_age is not None:
+            lifetime = min(lifetime, request_max_age)
+        return self.age(now) < lifetime
+
+    def has_validators(self):
+        return self.etag is not None or self.last_modified is not None
+
+    def validation_headers(self):
+        """
+        Headers turning a request into a conditional request for this response.
+        """
+        headers = {}
+        if self.etag is not None:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified is not None:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def matches(self, request_headers):
+        return all(request_headers.get(name) == value for name, value in self.vary)
+
+    def to_response(self):
+        """
+        Build a new urllib3 response with the stored data.
+        """
+        return HTTPResponse(
+            body=self.body, headers=HTTPHeaderDict(self.headers), status=self.status, reason=self.reason,
+            preload_content=False, decode_content=False
+        )
+
+
+class HttpCache(object):
+    """
+    Thread-safe in-memory http cache with LRU eviction.
+
+    :param max_entries: maximum number of stored responses.
+    :param max_bytes: maximum size of the stored responses (bodies and headers).
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.RLock()
+        self._entries = OrderedDict()  # (method, url) -> list of CacheEntry, one per Vary variant
+        self._num_entries = 0
+        self._num_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return self._num_entries
+
+    @property
+    def size(self):
+        """
+        Size in bytes of the stored responses.
+        """
+        return self._num_bytes
+
+    def stats(self):
+        """
+        Return the cache counters.
+
+        :return: dict with hits, misses, revalidations, evictions, entries and bytes.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "revalidations": self.revalidations,
+                "evictions": self.evictions,
+                "entries": self._num_entries,
+                "bytes": self._num_bytes
+            }
+
+    @staticmethod
+    def is_cacheable_request(method, headers):
+        if method not in CACHEABLE_METHODS:
+            return False
+        if "no-store" in parse_cache_control(headers.get(CACHE_CONTROL_HEADER_NAME)):
+            return False
+        # the caller wants to handle conditional requests by itself
+        return "If-None-Match" not in headers and "If-Modified-Since" not in headers
+
+    def lookup(self, method, url, headers):
+        """
+        Look for a stored response matching the request. Fresh responses are counted as hits.
+
+        :param method: request method.
+        :param url: full request url, including the query string.
+        :param headers: request headers (case insensitive dict).
+        :return: tuple (entry, fresh) where entry is None if no stored response matches the request.
+        """
+        if not self.is_cacheable_request(method, headers):
+            return None, False
+        request_cache_control = parse_cache_control(headers.get(CACHE_CONTROL_HEADER_NAME))
+        if headers.get(PRAGMA_HEADER_NAME) == "no-cache" and CACHE_CONTROL_HEADER_NAME not in headers:
+            request_cache_control["no-cache"] = None
+        with self._lock:
+            entry = self._find(method, url, headers)
+            if entry is None:
+                self.misses += 1
+                return None, False
+            fresh = entry.is_fresh(request_cache_control)
+            if fresh:
+                self.hits += 1
+            elif not entry.has_validators():
+                self.misses += 1
+                return None, False
+            return entry, fresh
+
+    def _find(self, method, url, headers):
+        variants = self._entries.pop((method, url), None)
+        if not variants:
+            return None
+        # mark as most recently used
+        self._entries[(method, url)] = variants
+        for entry in variants:
+            if entry.matches(headers):
+                return entry
+        return None
+
+    def update(self, method, url, headers, response, entry=None):
+        """
+        Update the cache with a response received from the server.
+
+        :param method: request method.
+        :param url: full request url, including the query string.
+        :param headers: request headers (case insensitive dict).
+        :param response: urllib3 response. Its content must be already loaded.
+        :param entry: stored response that was revalidated with this request, if any.
+        :return: the urllib3 response to return to the caller: a new response with the stored data if the server
+            answered 304 Not Modified to a revalidation, otherwise the given response.
+        """
+        if method not in (GET_METHOD, HEAD_METHOD) and response.status < 400:
+            # unsafe methods invalidate the stored responses of the target url (RFC 7234, section 4.4)
+            self.invalidate(url)
+            return response
+        if not self.is_cacheable_request(method, headers) and entry is None:
+            return response
+
+        with self._lock:
+            if entry is not None and response.status == 304:
+                self.revalidations += 1
+                self._refresh(method, url, entry, response)
+                return entry.to_response()
+            if entry is not None:
+                self.misses += 1
+            new_entry = self._new_entry(headers, response)
+            if new_entry is not None:
+                self._store(method, url, new_entry)
+            elif entry is not None:
+                self._remove(method, url, entry)
+        return response
+
+    def _new_entry(self, request_headers, response):
+        if response.status not in CACHEABLE_STATUS_CODES:
+            return None
+        cache_control = parse_cache_control(response.headers.get(CACHE_CONTROL_HEADER_NAME))
+        if "no-store" in cache_control:
+            return None
+        vary_names = [name.strip().lower() for name in response.headers.get("Vary", "").split(",") if name.strip()]
+        if "*" in vary_names:
+            return None
+
+        headers = dict(
+            (name, value) for name, value in response.headers.items() if name.lower() not in NOT_STORED_HEADERS
+        )
+        body = response.data or b""
+        headers[CONTENT_LENGTH_HEADER_NAME] = str(len(body))
+        entry = CacheEntry(
+            status=response.status, reason=response.reason, headers=HTTPHeaderDict(headers), body=body,
+            vary=tuple((name, request_headers.get(name)) for name in vary_names), stored_at=time.time()
+        )
+        if not entry.freshness_lifetime() and not entry.has_validators():
+            return None
+        if entry.size > self.max_bytes:
+            return None
+        return entry
+
+    def _refresh(self, method, url, entry, response):
+        for name, value in response.headers.items():
+            if name.lower() not in NOT_UPDATED_HEADERS:
+                entry.headers[name] = value
+        entry.stored_at = time.time()
+        if entry in self._entries.get((method, url), []):
+            self._num_bytes -= entry.size
+            entry.size = entry.compute_size()
+            self._num_bytes += entry.size
+            self._evict()
+
+    def _store(self, method, url, entry):
+        variants = self._entries.pop((method, url), [])
+        for old_entry in [e for e in variants if e.vary == entry.vary]:
+            variants.remove(old_entry)
+            self._num_entries -= 1
+            self._num_bytes -= old_entry.size
+        variants.append(entry)
+        self._entries[(method, url)] = variants
+        self._num_entries += 1
+        self._num_bytes += entry.size
+        self._evict()
+
+    def _remove(self, method, url, entry):
+        variants = self._entries.get((method, url), [])
+        if entry in variants:
+            variants.remove(entry)
+            self._num_entries -= 1
+            self._num_bytes -= entry.size
+            if not variants:
+                del self._entries[(method, url)]
+
+    def _evict(self):
+        while self._entries and (self._num_entries > self.max_entries or self._num_bytes > self.max_bytes):
+            key, variants = next(iter(self._entries.items()))
+            self._remove(key[0], key[1], variants[0])
+            self.evictions += 1
+
+    def invalidate(self, url):
+        """
+        Remove every stored response of the given url.
+        """
+        with self._lock:
+            for key in [key for key in self._entries if key[1] == url]:
+                for entry in list(self._entries[key]):
+                    self._remove(key[0], key[1], entry)
+
+    def clear(self):
+        """
+        Remove every stored response. Counters are kept.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._num_entries = 0
+            self._num_bytes = 0
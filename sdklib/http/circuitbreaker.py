@@ -0,0 +1,259 @@
+"""
+Circuit breakers for sdk requests.
+
+A circuit is kept for each host (or for each endpoint of a host). It opens when too many of the last requests failed or
+were too slow, and then rejects requests at once with CircuitBreakerOpenError, instead of letting every call wait for
+a failing upstream. After a while, it lets a few trial requests through (half-open) and closes again if they succeed.
+"""
+import logging
+import threading
+import time
+from collections import deque
+
+from urllib3.exceptions import HTTPError
+
+from sdklib.util.urls import get_normalized_host_url
+
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+DEFAULT_FAILURE_STATUS_CODES = tuple(range(500, 600))
+
+_clock = getattr(time, "monotonic", time.time)
+
+
+class CircuitBreakerOpenError(HTTPError):
+    """
+    Raised instead of sending a request while its circuit is open.
+    """
+
+    def __init__(self, circuit, retry_in):
+        self.circuit = circuit
+        self.retry_in = retry_in
+        HTTPError.__init__(self, "Circuit %s is open. Retry in %.2f seconds." % (circuit.name, retry_in))
+
+
+class Circuit(object):
+    """
+    State of a circuit. It is created and configured by a CircuitBreaker.
+    """
+
+    def __init__(self, breaker, host, url_path=None):
+        self.breaker = breaker
+        self.host = host
+        self.url_path = url_path
+        self.state = CLOSED
+        self._lock = threading.Lock()
+        self._window = deque(maxlen=breaker.window_size)  # (failed, slow) tuples
+        self._opened_at = None
+        self._half_open_permits = 0
+        self._half_open_successes = 0
+        self.calls = 0
+        self.failures = 0
+        self.slow_calls = 0
+        self.rejected = 0
+
+    @property
+    def name(self):
+        return self.host if self.url_path is None else "%s %s" % (self.host, self.url_path)
+
+    def before_call(self):
+        """
+        Ask for permission to send a request.
+
+        :raise CircuitBreakerOpenError: if the circuit is open.
+        """
+        with self._lock:
+            if self.state == OPEN:
+                retry_in = self._opened_at + self.breaker.open_duration - _clock()
+                if retry_in > 0:
+                    self.rejected += 1
+                    raise CircuitBreakerOpenError(self, retry_in)
+                transition = self._set_state(HALF_OPEN)
+            else:
+                transition = None
+            if self.state == HALF_OPEN:
+                if self._half_open_permits >= self.breaker.half_open_calls:
+                    self.rejected += 1
+                    raise CircuitBreakerOpenError(self, 0)
+                self._half_open_permits += 1
+        self._notify(transition)
+
+    def record(self, duration, failed):
+        """
+        Record the outcome of a request allowed by before_call.
+
+        :param duration: seconds the request took.
+        :param failed: (bool) the request raised an error or got a failure status code.
+        """
+        slow = self.breaker.slow_call_duration is not None and duration >= self.breaker.slow_call_duration
+        with self._lock:
+            self.calls += 1
+            self.failures += failed
+            self.slow_calls += slow
+            if self.state == HALF_OPEN:
+                self._half_open_permits = max(0, self._half_open_permits - 1)
+                if failed or slow:
+                    transition = self._set_state(OPEN)
+                else:
+                    self._half_open_successes += 1
+                    transition = self._set_state(CLOSED) \
+                        if self._half_open_successes >= self.breaker.half_open_calls else None
+            else:
+                self._window.append((failed, slow))
+                transition = self._set_state(OPEN) if self.state == CLOSED and self._is_failing() else None
+        self._notify(transition)
+
+    def release(self):
+        """
+        Give back the permission of a request allowed by before_call whose outcome is not recorded (e.g. cancelled).
+        """
+        with self._lock:
+            if self.state == HALF_OPEN and self._half_open_permits > 0:
+                self._half_open_permits -= 1
+
+    def _is_failing(self):
+        if len(self._window) < self.breaker.minimum_calls:
+            return False
+        failure_rate, slow_call_rate = self._rates()
+        return failure_rate >= self.breaker.failure_rate_threshold or \
+            slow_call_rate >= self.breaker.slow_call_rate_threshold
+
+    def _rates(self):
+        if not self._window:
+            return 0.0, 0.0
+        size = float(len(self._window))
+        return sum(f for f, _ in self._window) / size, sum(s for _, s in self._window) / size
+
+    def _set_state(self, state):
+        if state == self.state:
+            return None
+        old_state, self.state = self.state, state
+        if state == OPEN:
+            self._opened_at = _clock()
+        elif state == HALF_OPEN:
+            self._half_open_permits = 0
+            self._half_open_successes = 0
+        elif state == CLOSED:
+            self._window.clear()
+        return old_state, state
+
+    def _notify(self, transition):
+        if transition is not None:
+            logger.warning("Circuit %s changed from %s to %s", self.name, transition[0], transition[1])
+            for listener in list(self.breaker.listeners):
+                listener(self, transition[0], transition[1])
+
+    def stats(self):
+        """
+        :return: dict with the state, counters and failure and slow call rates of the current window.
+        """
+        with self._lock:
+            failure_rate, slow_call_rate = self._rates()
+            return {
+                "state": self.state,
+                "calls": self.calls,
+                "failures": self.failures,
+                "slow_calls": self.slow_calls,
+                "rejected": self.rejected,
+                "failure_rate": failure_rate,
+                "slow_call_rate": slow_call_rate
+            }
+
+
+class CircuitBreaker(object):
+    """
+    Thread-safe set of circuits, one per host or one per endpoint (url path template) of a host.
+
+    :param failure_rate_threshold: ratio of failed requests of the window opening the circuit.
+    :param slow_call_rate_threshold: ratio of slow requests of the window opening the circuit.
+    :param slow_call_duration: seconds after which a request is slow. By default: None (requests are never slow).
+    :param window_size: number of last requests the rates are computed from.
+    :param minimum_calls: minimum number of requests in the window before the circuit can open.
+    :param open_duration: seconds the circuit stays open before letting trial requests through.
+    :param half_open_calls: number of successful trial requests needed to close the circuit again.
+    :param failure_status_codes: response status codes counted as failures (besides errors). By default: 5xx.
+    :param per_endpoint: (bool) keep a circuit per endpoint instead of per host.
+    """
+
+    def __init__(self, failure_rate_threshold=0.5, slow_call_rate_threshold=1.0, slow_call_duration=None,
+                 window_size=20, minimum_calls=10, open_duration=30, half_open_calls=1,
+                 failure_status_codes=DEFAULT_FAILURE_STATUS_CODES, per_endpoint=False):
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.slow_call_duration = slow_call_duration
+        self.window_size = window_size
+        self.minimum_calls = minimum_calls
+        self.open_duration = open_duration
+        self.half_open_calls = half_open_calls
+        self.failure_status_codes = frozenset(failure_status_codes)
+        self.per_endpoint = per_endpoint
+        self.listeners = []
+        self._circuits = {}
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def add_listener(self, listener):
+        """
+        Register a function called on every state change: ``listener(circuit, old_state, new_state)``.
+        """
+        self.listeners.append(listener)
+
+    def get_circuit(self, host, url_path=None):
+        """
+        :param host: host url, e.g. 'https://api.example.com'.
+        :return: Circuit of the request.
+        """
+        normalized_host = self._hosts.get(host)
+        if normalized_host is None:
+            normalized_host = self._hosts[host] = get_normalized_host_url(host)
+        key = (normalized_host, url_path if self.per_endpoint else None)
+        circuit = self._circuits.get(key)
+        if circuit is None:
+            with self._lock:
+                circuit = self._circuits.get(key)
+                if circuit is None:
+                    circuit = self._circuits[key] = Circuit(self, *key)
+        return circuit
+
+    def is_failure(self, response):
+        return response.status in self.failure_status_codes
+
+    def protect(self, func, host, url_path=None):
+        """
+        Wrap a function sending a request and returning its response, so each call goes through the circuit.
+        """
+        def protected(*args, **kwargs):
+            circuit = self.get_circuit(host, url_path)
+            circuit.before_call()
+            start = _clock()
+            try:
+                response = func(*args, **kwargs)
+            except Exception:
+                circuit.record(_clock() - start, True)
+                raise
+            except BaseException:
+                circuit.release()
+                raise
+            circuit.record(_clock() - start, self.is_failure(response))
+            return response
+        return protected
+
+    def stats(self):
+        """
+        :return: dict mapping each circuit name ('host' or 'host url_path') to its stats.
+        """
+        with self._lock:
+            circuits = list(self._circuits.values())
+        return dict((circuit.name, circuit.stats()) for circuit in circuits)
+
+    def reset(self):
+        """
+        Discard every circuit (closing them).
+        """
+        with self._lock:
+            self._circuits.clear()
@@ -0,0 +1,174 @@
+"""
+Request body compression.
+
+Rendered request bodies larger than a threshold are compressed (gzip or deflate) before they are sent, with the
+Content-Encoding header set accordingly. Only use it with servers accepting compressed request bodies.
+"""
+import zlib
+
+from sdklib.compat import str
+from sdklib.http.headers import CONTENT_ENCODING_HEADER_NAME, CONTENT_LENGTH_HEADER_NAME, CONTENT_TYPE_HEADER_NAME
+
+
+GZIP_ENCODING = "gzip"
+DEFLATE_ENCODING = "deflate"
+
+# zlib wbits of each encoding
+_WBITS = {GZIP_ENCODING: 16 + zlib.MAX_WBITS, DEFLATE_ENCODING: zlib.MAX_WBITS}
+
+DEFAULT_MIN_SIZE = 1024
+DEFAULT_LEVEL = 6
+READ_CHUNK_SIZE = 64 * 1024
+
+
+def _get_header(headers, name):
+    name = name.lower()
+    for key, value in headers.items():
+        if key.lower() == name:
+            return key, value
+    return None, None
+
+
+class CompressedStream(object):
+    """
+    File-like object compressing another (seekable) file-like object as it is read.
+
+    Its length is not known in advance, so it is sent with chunked transfer encoding. It can be rewound, e.g. to retry
+    the request.
+    """
+
+    def __init__(self, source, encoding=GZIP_ENCODING, level=DEFAULT_LEVEL, chunk_size=READ_CHUNK_SIZE):
+        self.source = source
+        self.encoding = encoding
+        self.level = level
+        self.chunk_size = chunk_size
+        self._reset()
+
+    def _reset(self):
+        self._compressor = zlib.compressobj(self.level, zlib.DEFLATED, _WBITS[self.encoding])
+        self._buffer = b""
+        self._eof = False
+
+    def read(self, size=-1):
+        while not self._eof and (size is None or size < 0 or len(self._buffer) < size):
+            chunk = self.source.read(self.chunk_size)
+            if isinstance(chunk, str):
+                chunk = chunk.encode("utf-8")
+            if chunk:
+                self._buffer += self._compressor.compress(chunk)
+            else:
+                self._buffer += self._compressor.flush()
+                self._eof = True
+        if size is None or size < 0:
+            data, self._buffer = self._buffer, b""
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+    def __iter__(self):
+        while True:
+            chunk = self.read(self.chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+    def seek(self, offset, whence=0):
+        if offset != 0 or whence != 0:
+            raise IOError("CompressedStream can only be rewound.")
+        self.source.seek(0)
+        self._reset()
+        return 0
+
+    def close(self):
+        if hasattr(self.source, "close"):
+            self.source.close()
+
+
+def _iter_file(f):
+    while True:
+        chunk = f.read(READ_CHUNK_SIZE)
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_compressed(chunks, encoding=GZIP_ENCODING, level=DEFAULT_LEVEL):
+    """
+    Compress an iterable of bytes chunks.
+
+    :return: generator of compressed chunks.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, _WBITS[encoding])
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode("utf-8")
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+class BodyCompression(object):
+    """
+    Compression of the rendered request bodies.
+
+    :param encoding: 'gzip' or 'deflate'. By default: 'gzip'.
+    :param min_size: bodies smaller than this number of bytes are sent uncompressed. Streamed bodies of unknown length
+        are always compressed. By default: 1024.
+    :param level: zlib compression level, from 1 (fastest) to 9 (smallest). By default: 6.
+    :param content_types: media types compressed (e.g. 'application/json'). By default: None (every body).
+    :param stream: (bool) compress streamed (file-like or iterable) bodies too, as they are sent. By default: True.
+    """
+
+    def __init__(self, encoding=GZIP_ENCODING, min_size=DEFAULT_MIN_SIZE, level=DEFAULT_LEVEL, content_types=None,
+                 stream=True):
+        if encoding not in _WBITS:
+            raise ValueError("Unsupported encoding: %s" % encoding)
+        self.encoding = encoding
+        self.min_size = min_size
+        self.level = level
+        self.content_types = frozenset(t.lower() for t in content_types) if content_types is not None else None
+        self.stream = stream
+
+    def should_compress(self, body, headers):
+        if body is None or _get_header(headers, CONTENT_ENCODING_HEADER_NAME)[0] is not None:
+            return False
+        if self.content_types is not None:
+            content_type = _get_header(headers, CONTENT_TYPE_HEADER_NAME)[1] or ""
+            if content_type.split(";", 1)[0].strip().lower() not in self.content_types:
+                return False
+        if isinstance(body, (bytes, str)):
+            return len(body) >= self.min_size
+        if not self.stream:
+            return False
+        try:
+            return len(body) >= self.min_size
+        except TypeError:
+            return True
+
+    def compress(self, body, headers):
+        """
+        Compress a rendered body, if it has to be compressed, and update the request headers.
+
+        :param body: rendered body (bytes, str, file-like object or iterable of bytes).
+        :param headers: request headers (dict). Content-Encoding is set and Content-Length removed.
+        :return: body to send.
+        """
+        if not self.should_compress(body, headers):
+            return body
+        if isinstance(body, (bytes, str)):
+            if isinstance(body, str):
+                body = body.encode("utf-8")
+            compressor = zlib.compressobj(self.level, zlib.DEFLATED, _WBITS[self.encoding])
+            body = compressor.compress(body) + compressor.flush()
+        elif hasattr(body, "read") and hasattr(body, "seek"):
+            body = CompressedStream(body, self.encoding, self.level)
+        elif hasattr(body, "read"):
+            body = iter_compressed(_iter_file(body), self.encoding, self.level)
+        else:
+            body = iter_compressed(body, self.encoding, self.level)
+        length_header = _get_header(headers, CONTENT_LENGTH_HEADER_NAME)[0]
+        if length_header is not None:
+            del headers[length_header]
+        headers[CONTENT_ENCODING_HEADER_NAME] = self.encoding
+        return body
@@ -0,0 +1,155 @@
+"""
+Response body decoders, chosen by the media type of the Content-Type header (see Response.data).
+
+Decoders are functions ``decoder(body, charset)`` getting the raw body (bytes) and the charset parameter of the
+Content-Type header (or None). They are registered for a media type ('application/json'), a structured syntax suffix
+('+json', matching e.g. 'application/problem+json') or a top-level type ('text/*'), and looked up in that order.
+
+JSON and XML decoders are registered by default. decode_ndjson, decode_csv and decode_msgpack can be registered for
+the APIs using those formats, e.g. ``register_decoder("application/x-ndjson", decode_ndjson)``.
+"""
+import csv
+
+from sdklib.compat import str
+from sdklib.http.jsoncodec import get_json_codec
+from sdklib.util.structures import xml_string_to_dict
+
+
+DEFAULT_CHARSET = "utf-8"
+
+response_decoders = {}
+
+
+def register_decoder(media_type, decoder):
+    """
+    Register the decoder of a media type.
+
+    :param media_type: media type (e.g. 'text/csv'), structured syntax suffix (e.g. '+json') or top-level type
+        (e.g. 'text/*').
+    :param decoder: function ``decoder(body, charset)`` returning the decoded body. It raises an exception when the
+        body cannot be decoded.
+    """
+    response_decoders[media_type.lower()] = decoder
+
+
+def unregister_decoder(media_type):
+    response_decoders.pop(media_type.lower(), None)
+
+
+def parse_content_type(value):
+    """
+    :return: media type (lowercase) and charset (or None) of a Content-Type header value.
+    """
+    parts = value.split(";")
+    charset = None
+    for param in parts[1:]:
+        name, _, param_value = param.partition("=")
+        if name.strip().lower() == "charset":
+            charset = param_value.strip().strip('"') or None
+    return parts[0].strip().lower(), charset
+
+
+def get_decoder(media_type):
+    """
+    :return: decoder registered for a media type, or None.
+    """
+    decoder = response_decoders.get(media_type)
+    if decoder is None and "+" in media_type:
+        decoder = response_decoders.get("+" + media_type.rsplit("+", 1)[1])
+    if decoder is None:
+        decoder = response_decoders.get(media_type.split("/", 1)[0] + "/*")
+    return decoder
+
+
+def decode_text(body, charset=None):
+    if isinstance(body, str):
+        return body
+    return body.decode(charset or DEFAULT_CHARSET)
+
+
+def decode_json(body, charset=None):
+    if charset and charset.lower().replace("-", "") != "utf8":
+        body = decode_text(body, charset)
+    return get_json_codec().loads(body)
+
+
+def decode_xml(body, charset=None):
+    return xml_string_to_dict(body)
+
+
+def decode_ndjson(body, charset=None):
+    """
+    Decode newline delimited JSON (one document per line).
+
+    :return: list of documents.
+    """
+    loads = get_json_codec().loads
+    return [loads(line) for line in decode_text(body, charset).splitlines() if line.strip()]
+
+
+def decode_csv(body, charset=None):
+    """
+    Decode CSV with a header row.
+
+    :return: list of dicts, one per row.
+    """
+    return list(csv.DictReader(decode_text(body, charset).splitlines()))
+
+
+def decode_msgpack(body, charset=None):
+    """
+    Decode `MessagePack <https://msgpack.org>`_. The msgpack package is required.
+    """
+    import msgpack
+    return msgpack.unpackb(body, raw=False)
+
+
+def _decode_text_or_bytes(body, charset):
+    try:
+        return decode_text(body, charset)
+    except (AttributeError, LookupError, UnicodeDecodeError):
+        return body
+
+
+def trial_decode(body):
+    """
+    Decode a body of unknown type by trial and error: as JSON, then as XML, then as text.
+
+    :return: decoded body, or the body itself if it is not text.
+    """
+    try:
+        return get_json_codec().loads(body)
+    except:
+        pass
+    data = _decode_text_or_bytes(body, None)
+    try:
+        return xml_string_to_dict(data)
+    except:
+        return data
+
+
+def decode_body(body, content_type=None, trial=False):
+    """
+    Decode a response body with the decoder registered for its media type.
+
+    :param content_type: value of the Content-Type header.
+    :param trial: (bool) decode bodies without content type by trial and error (see trial_decode).
+    :return: decoded body. When there is no decoder for the media type, or it fails, the body as text (or the body
+        itself, if it is not text).
+    """
+    if not content_type:
+        return trial_decode(body) if trial else _decode_text_or_bytes(body, None)
+    media_type, charset = parse_content_type(content_type)
+    decoder = get_decoder(media_type)
+    if decoder is not None:
+        try:
+            return decoder(body, charset)
+        except Exception:
+            pass
+    return _decode_text_or_bytes(body, charset)
+
+
+for _media_type in ("application/json", "+json"):
+    register_decoder(_media_type, decode_json)
+for _media_type in ("application/xml", "text/xml", "+xml"):
+    register_decoder(_media_type, decode_xml)
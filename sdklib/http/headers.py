@@ -4,9 +4,11 @@ ACCEPT_LANGUAGE_HEADER_NAME = "Accept-Language"
 AUTHORIZATION_HEADER_NAME = "Authorization"
 CACHE_CONTROL_HEADER_NAME = "Cache-Control"
 CONNECTION_HEADER_NAME = "Connection"
+CONTENT_ENCODING_HEADER_NAME = "Content-Encoding"
 CONTENT_LENGTH_HEADER_NAME = "Content-Length"
 CONTENT_TYPE_HEADER_NAME = "Content-Type"
 COOKIE_HEADER_NAME = "Cookie"
+LINK_HEADER_NAME = "Link"
 PRAGMA_HEADER_NAME = "Pragma"
 REFERRER_HEADER_NAME = "Referer"
 USER_AGENT_HEADER_NAME = "User-Agent"
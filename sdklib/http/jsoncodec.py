@@ -0,0 +1,168 @@
+"""
+JSON codecs used to render JSON request bodies (JSONRenderer) and to parse JSON response bodies.
+
+By default, the json module of the standard library is used. Faster backends (orjson, ujson or rapidjson) are opt-in,
+with ``set_json_codec(name)`` or ``set_json_codec(find_json_codec())``, since the bodies they render are not byte for
+byte the ones of the json module. Codecs render bytes and parse bytes (or str), so bodies are not converted to str and
+back.
+
+Fast backends render compact JSON (without spaces after separators), and orjson renders NaN and infinity as null.
+Documents they cannot render (e.g. integers larger than 64 bits, non str keys) are rendered by the json module.
+Documents are parsed by the backend only: its errors are raised as they are (they are ValueError).
+"""
+import json
+from collections import OrderedDict
+
+from sdklib.compat import convert_bytes_to_str, str
+
+
+class JsonCodec(object):
+    """
+    Base class of the JSON codecs.
+    """
+    name = None
+
+    def dumps(self, obj):
+        """
+        :return: JSON document of obj (bytes).
+        """
+        raise NotImplementedError
+
+    def loads(self, data):
+        """
+        :param data: JSON document (bytes or str).
+        :return: parsed document. Invalid documents raise ValueError.
+        """
+        raise NotImplementedError
+
+
+class StdlibJsonCodec(JsonCodec):
+    """
+    Codec using the json module of the standard library.
+    """
+    name = "json"
+
+    def dumps(self, obj):
+        try:
+            body = json.dumps(obj)
+        except UnicodeDecodeError:
+            # python 2 byte strings that are not utf-8
+            body = json.dumps(obj, encoding='latin-1')
+        return str(body).encode()
+
+    def loads(self, data):
+        try:
+            return json.loads(data)
+        except TypeError:
+            # python 3.5 or older: the json module only parses str
+            return json.loads(convert_bytes_to_str(data))
+
+
+_stdlib_codec = StdlibJsonCodec()
+
+
+class OrjsonCodec(JsonCodec):
+    """
+    Codec using `orjson <https://github.com/ijl/orjson>`_. It renders UTF-8 instead of \\u escapes and NaN and infinity
+    as null (they are not valid JSON), and parses integers larger than 64 bits as floats.
+    """
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+        self._orjson = orjson
+
+    def dumps(self, obj):
+        try:
+            return self._orjson.dumps(obj)
+        except TypeError:
+            return _stdlib_codec.dumps(obj)
+
+    def loads(self, data):
+        return self._orjson.loads(data)
+
+
+class UjsonCodec(JsonCodec):
+    """
+    Codec using `ujson <https://github.com/ultrajson/ultrajson>`_.
+    """
+    name = "ujson"
+
+    def __init__(self):
+        import ujson
+        self._ujson = ujson
+
+    def dumps(self, obj):
+        try:
+            return self._ujson.dumps(obj, escape_forward_slashes=False).encode("utf-8")
+        except (TypeError, ValueError, OverflowError):
+            return _stdlib_codec.dumps(obj)
+
+    def loads(self, data):
+        return self._ujson.loads(data)
+
+
+class RapidjsonCodec(JsonCodec):
+    """
+    Codec using `python-rapidjson <https://github.com/python-rapidjson/python-rapidjson>`_.
+    """
+    name = "rapidjson"
+
+    def __init__(self):
+        import rapidjson
+        self._rapidjson = rapidjson
+
+    def dumps(self, obj):
+        try:
+            return self._rapidjson.dumps(obj).encode("utf-8")
+        except (TypeError, ValueError, OverflowError):
+            return _stdlib_codec.dumps(obj)
+
+    def loads(self, data):
+        return self._rapidjson.loads(data)
+
+
+# codec classes by name, in order of preference
+JSON_CODECS = OrderedDict(
+    (codec_class.name, codec_class) for codec_class in (OrjsonCodec, UjsonCodec, RapidjsonCodec, StdlibJsonCodec)
+)
+
+_json_codec = _stdlib_codec
+
+
+def find_json_codec():
+    """
+    :return: codec of the first backend of JSON_CODECS installed (the fastest one).
+    """
+    for codec_class in JSON_CODECS.values():
+        try:
+            return codec_class()
+        except ImportError:
+            pass
+    return _stdlib_codec
+
+
+def get_json_codec():
+    """
+    :return: JsonCodec used by default by JSONRenderer and the responses.
+    """
+    return _json_codec
+
+
+def set_json_codec(codec):
+    """
+    Set the JsonCodec used by default by JSONRenderer and the responses.
+
+    :param codec: JsonCodec instance, name of a backend of JSON_CODECS (e.g. 'orjson') or None (the json module, the
+        default).
+    :return: JsonCodec set. Unknown names raise ValueError and backends not installed raise ImportError.
+    """
+    global _json_codec
+    if codec is None:
+        codec = _stdlib_codec
+    elif not isinstance(codec, JsonCodec):
+        if codec not in JSON_CODECS:
+            raise ValueError("Unknown JSON codec: %s" % codec)
+        codec = JSON_CODECS[codec]() if codec != StdlibJsonCodec.name else _stdlib_codec
+    _json_codec = codec
+    return codec
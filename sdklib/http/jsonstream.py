@@ -0,0 +1,185 @@
+"""
+Incremental parsing of the items of large JSON arrays (see HttpResponse.iter_json_items).
+
+The document is read chunk by chunk: values before the array are skipped without being parsed and each item of the
+array is parsed (with json.JSONDecoder.raw_decode) as soon as it is complete, so only one item and the pending chunk
+are kept in memory.
+"""
+import codecs
+import json
+import re
+
+
+_decoder = json.JSONDecoder()
+
+_NOT_WHITESPACE = re.compile(r"[^ \t\n\r]")
+# special characters inside strings and outside them
+_STRING_SPECIAL = re.compile(r'["\\]')
+_STRUCTURE = re.compile(r'["\[\]{}]')
+
+
+class _JsonReader(object):
+    """
+    Buffer over the text of a JSON document, read from an iterable of chunks.
+    """
+
+    def __init__(self, chunks, encoding="utf-8"):
+        self._chunks = iter(chunks)
+        self._text_decoder = codecs.getincrementaldecoder(encoding)()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        """
+        Append the next chunk to the buffer, dropping the text already consumed.
+
+        :return: False at the end of the document.
+        """
+        if self.eof:
+            return False
+        try:
+            chunk = next(self._chunks)
+        except StopIteration:
+            self.eof = True
+            chunk = self._text_decoder.decode(b"", True)
+        else:
+            if isinstance(chunk, bytes):
+                chunk = self._text_decoder.decode(chunk)
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """
+        Skip whitespace.
+
+        :return: next character, or None at the end of the document.
+        """
+        while True:
+            match = _NOT_WHITESPACE.search(self.buffer, self.pos)
+            if match is not None:
+                self.pos = match.start()
+                return self.buffer[self.pos]
+            self.pos = len(self.buffer)
+            if not self.fill():
+                return None
+
+    def next_char(self, expected):
+        """
+        Consume the next character, which must be one of expected.
+        """
+        char = self.peek()
+        if char is None or char not in expected:
+            raise ValueError("Expecting one of %r, found %r." % (expected, char))
+        self.pos += 1
+        return char
+
+    def read_value(self):
+        """
+        Parse the next value.
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except ValueError:
+                if self.eof:
+                    raise
+            else:
+                # a value ending with the buffer may be truncated (e.g. a number)
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return value
+            # read at least as much text again as is pending, so long values are parsed in linear time
+            pending = len(self.buffer) - self.pos
+            while self.fill() and len(self.buffer) - self.pos < 2 * pending + 1:
+                pass
+
+    def skip_value(self):
+        """
+        Skip the next value without parsing it.
+        """
+        if self.peek() not in ('"', '[', '{'):
+            self.read_value()
+            return
+        depth = 0
+        in_string = False
+        pos = self.pos
+        while True:
+            match = (_STRING_SPECIAL if in_string else _STRUCTURE).search(self.buffer, pos)
+            if match is None or (match.group() == "\\" and match.end() >= len(self.buffer)):
+                self.pos = len(self.buffer) if match is None else match.start()
+                if not self.fill():
+                    raise ValueError("Unexpected end of JSON document.")
+                pos = self.pos
+                continue
+            char = match.group()
+            pos = match.end()
+            if in_string:
+                if char == "\\":
+                    pos += 1
+                else:
+                    in_string = False
+                    if depth == 0:
+                        break
+            elif char == '"':
+                in_string = True
+            elif char in "[{":
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    break
+        self.pos = pos
+
+
+def _find(reader, key):
+    """
+    Move the reader to the value of a key of the object at the reader position.
+
+    :return: False if the value is not an object or the key is not found.
+    """
+    if reader.peek() != "{":
+        return False
+    reader.pos += 1
+    if reader.peek() == "}":
+        return False
+    while True:
+        name = reader.read_value()
+        reader.next_char(":")
+        if name == key:
+            return True
+        reader.skip_value()
+        if reader.next_char(",}") == "}":
+            return False
+
+
+def iter_json_items(chunks, prefix=None, encoding="utf-8"):
+    """
+    Iterate over the items of a JSON array, parsing the document incrementally.
+
+    :param chunks: iterable of bytes (or str) chunks of the document.
+    :param prefix: dotted path of the array in the document, e.g. 'data.items'. By default: None (the document is the
+        array).
+    :param encoding: encoding of the bytes chunks.
+    :return: generator of the parsed items. There are none if the path is not found or its value is null.
+    """
+    reader = _JsonReader(chunks, encoding)
+    for key in prefix.split(".") if prefix else ():
+        if not _find(reader, key):
+            return
+    char = reader.peek()
+    if char is None or char == "n":
+        if char is not None:
+            reader.read_value()
+        return
+    if char != "[":
+        raise ValueError("The value of %s is not an array." % (prefix or "the document"))
+    reader.pos += 1
+    if reader.peek() == "]":
+        return
+    while True:
+        yield reader.read_value()
+        if reader.next_char(",]") == "]":
+            return
@@ -0,0 +1,280 @@
+"""
+Client-side request metrics.
+
+A MetricsRegistry counts the requests sent to each endpoint (host, method and url path template, e.g.
+'/items/{id}/', so the number of series stays bounded), their responses by status class, the bytes sent and received,
+and a latency histogram. Every retry is counted as a request.
+
+Each thread updates its own shard of the registry, so recording never waits for other threads; shards are merged when
+the metrics are read with snapshot() or to_prometheus().
+"""
+import bisect
+import threading
+import time
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+ERROR_STATUS_CLASS = "error"
+
+_clock = getattr(time, "perf_counter", time.time)
+
+
+def get_status_class(status):
+    """
+    :return: '1xx', '2xx', '3xx', '4xx' or '5xx' (or 'error' if there is no status).
+    """
+    if status is None:
+        return ERROR_STATUS_CLASS
+    return "%dxx" % (status // 100)
+
+
+def get_body_size(body, headers=None):
+    """
+    :return: size in bytes of a request or response body, or its Content-Length header when it is not loaded.
+    """
+    if body is None:
+        return 0
+    if isinstance(body, bytes):
+        return len(body)
+    if hasattr(body, "encode"):
+        return len(body.encode("utf-8"))
+    if headers is not None:
+        for name, value in headers.items():
+            if name.lower() == "content-length":
+                return int(value)
+    try:
+        return len(body)
+    except TypeError:
+        return 0
+
+
+class Histogram(object):
+    """
+    Histogram with fixed bucket upper bounds. Histograms with the same buckets can be merged.
+
+    :param buckets: sorted bucket upper bounds. An implicit +Inf bucket is added.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def merge(self, other):
+        """
+        Add the observations of another histogram to this one.
+        """
+        if other.buckets != self.buckets:
+            raise ValueError("Histograms with different buckets can not be merged.")
+        for i, count in enumerate(other.counts):
+            self.counts[i] += count
+        self.sum += other.sum
+        self.count += other.count
+        return self
+
+    def cumulative_counts(self):
+        """
+        :return: list of (upper bound, number of observations lower or equal) tuples, ending with +Inf.
+        """
+        result = []
+        total = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+
+class _Series(object):
+
+    def __init__(self, buckets):
+        self.responses = {}
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.latency = Histogram(buckets)
+
+    def merge(self, other):
+        for status_class, count in other.responses.items():
+            self.responses[status_class] = self.responses.get(status_class, 0) + count
+        self.bytes_sent += other.bytes_sent
+        self.bytes_received += other.bytes_received
+        self.latency.merge(other.latency)
+
+
+class _Shard(object):
+
+    def __init__(self, thread=None):
+        self.thread = thread
+        self.lock = threading.Lock()
+        self.series = {}
+
+    def merge_into(self, series_by_key, buckets):
+        with self.lock:
+            for key, series in self.series.items():
+                if key not in series_by_key:
+                    series_by_key[key] = _Series(buckets)
+                series_by_key[key].merge(series)
+
+
+class MetricsRegistry(object):
+    """
+    Thread-safe registry of request metrics, labelled by host, method and url path template.
+
+    :param buckets: upper bounds (seconds) of the latency histogram buckets.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._local = threading.local()
+        self._shards = []
+        self._retired = _Shard()  # metrics of the threads that are gone
+        self._lock = threading.Lock()
+
+    def _get_shard(self):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = _Shard(threading.current_thread())
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def record(self, host, method, url_path, status, duration, bytes_sent=0, bytes_received=0):
+        """
+        Record a request.
+
+        :param host: host of the request.
+        :param method: HTTP method.
+        :param url_path: url path template of the request (before url path params are rendered).
+        :param status: status code of the response, or None if the request failed without response.
+        :param duration: seconds the request took.
+        :param bytes_sent: size of the request body.
+        :param bytes_received: size of the response body.
+        """
+        key = (host, method, url_path)
+        status_class = get_status_class(status)
+        shard = self._get_shard()
+        # the lock of a shard is only contended while the metrics are read
+        with shard.lock:
+            series = shard.series.get(key)
+            if series is None:
+                series = shard.series[key] = _Series(self.buckets)
+            series.responses[status_class] = series.responses.get(status_class, 0) + 1
+            series.bytes_sent += bytes_sent
+            series.bytes_received += bytes_received
+            series.latency.observe(duration)
+
+    def instrument(self, func, host, method, url_path, body=None):
+        """
+        Wrap a function sending a request and returning its urllib3 response, so each call is recorded.
+        """
+        bytes_sent = get_body_size(body)
+
+        def instrumented(*args, **kwargs):
+            start = _clock()
+            try:
+                response = func(*args, **kwargs)
+            except Exception:
+                self.record(host, method, url_path, None, _clock() - start, bytes_sent)
+                raise
+            self.record(
+                host, method, url_path, response.status, _clock() - start, bytes_sent, self.get_response_size(response)
+            )
+            return response
+        return instrumented
+
+    @staticmethod
+    def get_response_size(response):
+        """
+        :return: size of the body of a urllib3 response, without downloading it when it is streamed.
+        """
+        body = getattr(response, "_body", None)
+        return get_body_size(body, None) if body is not None else get_body_size(response, response.headers)
+
+    def _merged_series(self):
+        with self._lock:
+            # fold the shards of finished threads (e.g. of request_many thread pools) into the retired one
+            for shard in [shard for shard in self._shards if not shard.thread.is_alive()]:
+                shard.merge_into(self._retired.series, self.buckets)
+                self._shards.remove(shard)
+            merged = {}
+            for shard in [self._retired] + self._shards:
+                shard.merge_into(merged, self.buckets)
+        return merged
+
+    def snapshot(self):
+        """
+        :return: dict mapping (host, method, url_path) tuples to dicts with the number of requests, responses by status
+            class, bytes sent and received and the latency histogram (cumulative bucket counts, sum and count).
+        """
+        return dict(
+            (key, {
+                "requests": sum(series.responses.values()),
+                "responses": dict(series.responses),
+                "bytes_sent": series.bytes_sent,
+                "bytes_received": series.bytes_received,
+                "latency": {
+                    "buckets": series.latency.cumulative_counts(),
+                    "sum": series.latency.sum,
+                    "count": series.latency.count
+                }
+            })
+            for key, series in self._merged_series().items()
+        )
+
+    def to_prometheus(self, prefix="sdklib_http_client"):
+        """
+        Export the metrics in the Prometheus text exposition format.
+
+        :param prefix: prefix of the metric names.
+        :return: str
+        """
+        merged = sorted(self._merged_series().items(), key=lambda item: tuple(str(label) for label in item[0]))
+        lines = [
+            "# HELP %s_requests_total Requests sent, by status class of their response." % prefix,
+            "# TYPE %s_requests_total counter" % prefix,
+        ]
+        for key, series in merged:
+            for status_class, count in sorted(series.responses.items()):
+                lines.append('%s_requests_total{%s,status_class="%s"} %d' % (
+                    prefix, _format_labels(key), status_class, count))
+        for name, attr, help_text in (("request_bytes", "bytes_sent", "Bytes of the request bodies sent."),
+                                      ("response_bytes", "bytes_received", "Bytes of the response bodies received.")):
+            lines.append("# HELP %s_%s_total %s" % (prefix, name, help_text))
+            lines.append("# TYPE %s_%s_total counter" % (prefix, name))
+            for key, series in merged:
+                lines.append("%s_%s_total{%s} %d" % (prefix, name, _format_labels(key), getattr(series, attr)))
+        lines.append("# HELP %s_request_duration_seconds Request latency." % prefix)
+        lines.append("# TYPE %s_request_duration_seconds histogram" % prefix)
+        for key, series in merged:
+            labels = _format_labels(key)
+            for bound, count in series.latency.cumulative_counts():
+                lines.append('%s_request_duration_seconds_bucket{%s,le="%s"} %d' % (
+                    prefix, labels, "+Inf" if bound == float("inf") else repr(float(bound)), count))
+            lines.append("%s_request_duration_seconds_sum{%s} %r" % (prefix, labels, series.latency.sum))
+            lines.append("%s_request_duration_seconds_count{%s} %d" % (prefix, labels, series.latency.count))
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        """
+        Discard every recorded metric.
+        """
+        with self._lock:
+            shards = [self._retired] + self._shards
+        for shard in shards:
+            with shard.lock:
+                shard.series.clear()
+
+
+def _escape_label_value(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(key):
+    host, method, url_path = key
+    return 'host="%s",method="%s",url_template="%s"' % (
+        _escape_label_value(host), _escape_label_value(method), _escape_label_value(url_path))
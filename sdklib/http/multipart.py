@@ -0,0 +1,219 @@
+import os
+
+from sdklib.compat import str
+
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+class FileSource(object):
+    """
+    File to upload, read in chunks straight from disk (or from a file object) instead of being loaded in memory.
+
+    :param path: path to the file.
+    :param fileobj: file object opened in binary mode. It is read from its current position.
+    """
+
+    def __init__(self, path=None, fileobj=None):
+        assert (path is None) != (fileobj is None), "Either path or fileobj must be given"
+        self.path = path
+        self.fileobj = fileobj
+        self._fp = None
+        self._position = 0
+        if fileobj is not None:
+            try:
+                self._start = fileobj.tell()
+            except (AttributeError, IOError, OSError):
+                self._start = None
+            self._size = self._get_fileobj_size()
+        else:
+            self._start = 0
+            self._size = os.path.getsize(path)
+
+    def _get_fileobj_size(self):
+        try:
+            return os.fstat(self.fileobj.fileno()).st_size - (self._start or 0)
+        except (AttributeError, IOError, OSError, ValueError):
+            pass
+        if self._start is None:
+            return None
+        self.fileobj.seek(0, os.SEEK_END)
+        size = self.fileobj.tell() - self._start
+        self.fileobj.seek(self._start)
+        return size
+
+    def __len__(self):
+        if self._size is None:
+            raise TypeError("The size of the file object is unknown")
+        return self._size
+
+    def _open(self):
+        if self.path is not None:
+            self._fp = open(self.path, 'rb')
+        else:
+            self._fp = self.fileobj
+            if self._start is not None:
+                self.fileobj.seek(self._start)
+        self._position = 0
+
+    def read(self, offset, size):
+        """
+        Read size bytes starting at offset (relative to the beginning of the file source).
+        """
+        if self._fp is None:
+            self._open()
+        if offset != self._position:
+            if self._start is None:
+                raise IOError("The file object can not be rewound")
+            self._fp.seek(self._start + offset)
+            self._position = offset
+        chunks = []
+        while size > 0:
+            chunk = self._fp.read(size)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            size -= len(chunk)
+            self._position += len(chunk)
+        return b"".join(chunks)
+
+    def iter_chunks(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Iterate over the whole file content. File objects are rewound to their initial position afterwards.
+        """
+        try:
+            offset = 0
+            while True:
+                chunk = self.read(offset, chunk_size)
+                if not chunk:
+                    break
+                offset += len(chunk)
+                yield chunk
+        finally:
+            self.close()
+
+    def close(self):
+        if self._fp is not None:
+            if self.path is not None:
+                self._fp.close()
+            elif self._start is not None:
+                self.fileobj.seek(self._start)
+            self._fp = None
+
+
+class MultiPartEncoder(object):
+    """
+    File-like multipart/form-data body.
+
+    Boundaries and part headers are kept in memory, but file parts are read in chunks when the body is sent, so
+    uploads run in constant memory. Its length is known up front from the file sizes, so it can be sent with a
+    Content-Length header.
+
+    :param fields: list of tuples (RequestField, source), where source is None (the field data is used), bytes or a
+        FileSource.
+    :param boundary: multipart boundary.
+    """
+
+    def __init__(self, fields, boundary):
+        self.boundary = boundary
+        self.content_type = "multipart/form-data; boundary=%s" % boundary
+        parts = []
+        for field, source in fields:
+            parts.append(("--%s\r\n" % boundary).encode("utf-8") + field.render_headers().encode("utf-8"))
+            if source is None:
+                source = field.data
+            if isinstance(source, int):
+                source = str(source)
+            if isinstance(source, str):
+                source = source.encode("utf-8")
+            parts.append(source if isinstance(source, FileSource) else bytes(source))
+            parts.append(b"\r\n")
+        parts.append(("--%s--\r\n" % boundary).encode("utf-8"))
+
+        # merge consecutive in-memory parts
+        self._parts = []
+        for part in parts:
+            if self._parts and isinstance(part, bytes) and isinstance(self._parts[-1], bytes):
+                self._parts[-1] += part
+            else:
+                self._parts.append(part)
+        self._length = sum(len(p) for p in self._parts)
+        self._index = 0
+        self._offset = 0
+        self._position = 0
+
+    def __len__(self):
+        return self._length
+
+    def read(self, size=-1):
+        """
+        Read up to size bytes of the body (all the remaining body if size is negative or None).
+        """
+        remaining = self._length - self._position
+        if size is None or size < 0 or size > remaining:
+            size = remaining
+        chunks = []
+        while size > 0 or (self._index < len(self._parts) and not len(self._parts[self._index])):
+            part = self._parts[self._index]
+            n = min(size, len(part) - self._offset)
+            if isinstance(part, bytes):
+                chunk = part[self._offset:self._offset + n]
+            else:
+                chunk = part.read(self._offset, n)
+                if len(chunk) != n:
+                    raise IOError("File size changed while reading the multipart body")
+            chunks.append(chunk)
+            size -= n
+            self._offset += n
+            self._position += n
+            if self._offset == len(part):
+                if isinstance(part, FileSource):
+                    part.close()
+                self._index += 1
+                self._offset = 0
+        return b"".join(chunks)
+
+    def __iter__(self):
+        while True:
+            chunk = self.read(DEFAULT_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        """
+        Move to a position of the body. It is used to rewind the body when a request is retried or redirected.
+        """
+        if whence == os.SEEK_CUR:
+            offset += self._position
+        elif whence == os.SEEK_END:
+            offset += self._length
+        offset = max(0, min(offset, self._length))
+        self.close()
+        self._position = offset
+        self._index = 0
+        for part in self._parts:
+            if offset < len(part):
+                break
+            offset -= len(part)
+            self._index += 1
+        self._offset = offset
+        return self._position
+
+    def getvalue(self):
+        """
+        Return the whole body as bytes (loading it in memory).
+        """
+        position = self._position
+        self.seek(0)
+        value = self.read()
+        self.seek(position)
+        return value
+
+    def close(self):
+        for part in self._parts:
+            if isinstance(part, FileSource):
+                part.close()
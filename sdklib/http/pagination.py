@@ -0,0 +1,238 @@
+"""
+Pagination of list endpoints.
+
+A pagination strategy knows where the items of a page are and how to request the next page: with a cursor returned in
+the body (CursorPagination), with offset and limit query params (OffsetPagination) or following the 'next' url of the
+Link header (LinkHeaderPagination). HttpSdk.paginate uses them to yield the items of every page lazily.
+"""
+import re
+import threading
+from collections import namedtuple
+
+from sdklib.compat import queue, parse_qsl, urlsplit, urljoin
+from sdklib.http.headers import LINK_HEADER_NAME
+from sdklib.util.urls import get_hostname_parameters_from_url, ensure_url_path_starts_with_slash
+
+
+DEFAULT_PREFETCH = 1
+
+PageRequest = namedtuple("PageRequest", ["url_path", "query_params", "kwargs"])
+
+_LINK_RE = re.compile(r'<([^>]*)>((?:\s*;\s*[^;,]+)*)')
+_LINK_PARAM_RE = re.compile(r';\s*([^\s=;,]+)\s*=\s*"?([^";,]*)"?')
+
+
+def parse_link_header(value):
+    """
+    Parse a Link header value.
+
+    :return: dict mapping each relation type (e.g. 'next') to its url.
+    """
+    links = {}
+    for url, params in _LINK_RE.findall(value or ""):
+        for name, param_value in _LINK_PARAM_RE.findall(params):
+            if name.lower() == "rel":
+                for rel in param_value.split():
+                    links[rel.lower()] = url
+    return links
+
+
+def get_path(data, key):
+    """
+    :param key: dotted path of a value of a parsed json document, e.g. 'meta.next_cursor'. None returns data itself.
+    :return: value, or None if it is not found.
+    """
+    if key is None:
+        return data
+    for name in key.split("."):
+        if not isinstance(data, dict):
+            return None
+        data = data.get(name)
+    return data
+
+
+class Pagination(object):
+    """
+    Base class of the pagination strategies.
+
+    :param items_key: dotted path of the list of items in the json body of a page. By default: None (the body is the
+        list).
+    """
+
+    def __init__(self, items_key=None):
+        self.items_key = items_key
+
+    def get_items(self, response):
+        """
+        :return: list of the items of a page.
+        """
+        return get_path(response.json, self.items_key) or []
+
+    def first_request(self, url_path, query_params):
+        """
+        :return: PageRequest of the first page.
+        """
+        return PageRequest(url_path, dict(query_params or {}), {})
+
+    def next_request(self, response, items, request):
+        """
+        :param response: response of the current page.
+        :param items: items of the current page.
+        :param request: PageRequest of the current page.
+        :return: PageRequest of the next page, or None if it is the last one.
+        """
+        raise NotImplementedError
+
+
+class CursorPagination(Pagination):
+    """
+    Pages linked by an opaque cursor returned in the body and sent back as a query param.
+
+    :param cursor_key: dotted path of the cursor of the next page in the json body. No cursor means no more pages.
+    :param cursor_param: query param the cursor is sent in.
+    """
+
+    def __init__(self, items_key="items", cursor_key="next_cursor", cursor_param="cursor"):
+        super(CursorPagination, self).__init__(items_key)
+        self.cursor_key = cursor_key
+        self.cursor_param = cursor_param
+
+    def next_request(self, response, items, request):
+        cursor = get_path(response.json, self.cursor_key)
+        if cursor is None or cursor == "" or not items:
+            return None
+        query_params = dict(request.query_params)
+        query_params[self.cursor_param] = cursor
+        return request._replace(query_params=query_params)
+
+
+class OffsetPagination(Pagination):
+    """
+    Pages requested with offset and limit query params. The last page is the first one with less than limit items
+    (or the one reaching the total count, when the body has one).
+
+    :param limit: number of items requested per page.
+    :param offset_param: query param of the offset.
+    :param limit_param: query param of the limit.
+    :param total_key: dotted path of the total number of items in the json body. By default: None.
+    :param start: offset of the first page.
+    """
+
+    def __init__(self, items_key="items", limit=100, offset_param="offset", limit_param="limit", total_key=None,
+                 start=0):
+        super(OffsetPagination, self).__init__(items_key)
+        self.limit = limit
+        self.offset_param = offset_param
+        self.limit_param = limit_param
+        self.total_key = total_key
+        self.start = start
+
+    def first_request(self, url_path, query_params):
+        query_params = dict(query_params or {})
+        query_params.setdefault(self.offset_param, self.start)
+        query_params.setdefault(self.limit_param, self.limit)
+        return PageRequest(url_path, query_params, {})
+
+    def next_request(self, response, items, request):
+        limit = int(request.query_params[self.limit_param])
+        offset = int(request.query_params[self.offset_param]) + len(items)
+        total = get_path(response.json, self.total_key) if self.total_key is not None else None
+        if len(items) < limit or (total is not None and offset >= int(total)):
+            return None
+        query_params = dict(request.query_params)
+        query_params[self.offset_param] = offset
+        return request._replace(query_params=query_params)
+
+
+def _get_origin(url):
+    # scheme and hostname are case insensitive
+    return get_hostname_parameters_from_url(url.lower())
+
+
+class LinkHeaderPagination(Pagination):
+    """
+    Pages linked by the url of the 'next' relation of the Link header (RFC 8288), e.g. GitHub style APIs.
+
+    Relative links are resolved against the url of the current page. Only links to the host of the current page are
+    followed: the requests of every page carry the authentication of the sdk, so a link to another host raises
+    ValueError unless allow_other_hosts is set.
+
+    :param rel: relation type of the next page.
+    :param allow_other_hosts: (bool) follow links to other hosts (scheme, hostname or port). By default: False.
+    """
+
+    def __init__(self, items_key=None, rel="next", allow_other_hosts=False):
+        super(LinkHeaderPagination, self).__init__(items_key)
+        self.rel = rel
+        self.allow_other_hosts = allow_other_hosts
+
+    def next_request(self, response, items, request):
+        url = parse_link_header(response.headers.get(LINK_HEADER_NAME)).get(self.rel)
+        if not url:
+            return None
+        current_host = request.kwargs.get("host")
+        parts = urlsplit(urljoin((current_host or "") + ensure_url_path_starts_with_slash(request.url_path), url))
+        kwargs = {"prefix_url_path": None, "url_path_format": None}
+        if parts.netloc:
+            host = "%s://%s" % (parts.scheme, parts.netloc)
+            if not self.allow_other_hosts and (current_host is None or _get_origin(host) != _get_origin(current_host)):
+                raise ValueError("The link to the next page points to another host: %s" % url)
+            # carried to the next pages, to resolve their links
+            kwargs["host"] = host
+        # the next url is complete: it replaces the url path and the query params of the first request. Query params
+        # are kept as a list of pairs, so repeated params (e.g. '?id=1&id=2') are sent back as they are.
+        return PageRequest(parts.path, parse_qsl(parts.query, keep_blank_values=True), kwargs)
+
+
+class _Error(object):
+
+    def __init__(self, error):
+        self.error = error
+
+
+_END = object()
+
+
+def iter_prefetched(iterable, prefetch=DEFAULT_PREFETCH):
+    """
+    Iterate over an iterable in a background thread, reading up to prefetch values ahead of the caller.
+
+    :param iterable: iterable, consumed by the background thread only.
+    :param prefetch: maximum number of values read ahead.
+    :return: generator of the values of iterable. Closing it stops the background thread.
+    """
+    values = queue.Queue(maxsize=prefetch)
+    stopped = threading.Event()
+
+    def put(value):
+        while not stopped.is_set():
+            try:
+                values.put(value, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            for value in iterable:
+                if not put(value):
+                    return
+        except Exception as e:
+            put(_Error(e))
+        else:
+            put(_END)
+
+    thread = threading.Thread(target=produce, name="sdklib-prefetch")
+    thread.daemon = True
+    thread.start()
+    try:
+        while True:
+            value = values.get()
+            if value is _END:
+                return
+            if isinstance(value, _Error):
+                raise value.error
+            yield value
+    finally:
+        stopped.set()
@@ -0,0 +1,180 @@
+import threading
+
+import urllib3
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from sdklib.http.timings import get_current_timings, _clock
+
+
+DEFAULT_NUM_POOLS = 10
+DEFAULT_MAXSIZE = 10
+DEFAULT_BLOCK = False
+
+
+class TimedConnectionMixin(object):
+    """
+    Record the connect, ssl, send and wait stages into the RequestTimings of the current thread.
+    """
+    _tcp_time = 0
+
+    def _new_conn(self):
+        start = _clock()
+        try:
+            return super(TimedConnectionMixin, self)._new_conn()
+        finally:
+            self._tcp_time = _clock() - start
+
+    def connect(self):
+        timings = get_current_timings()
+        if timings is None:
+            return super(TimedConnectionMixin, self).connect()
+        start = _clock()
+        try:
+            super(TimedConnectionMixin, self).connect()
+        finally:
+            duration = _clock() - start
+            timings.add("connect", duration)
+            if isinstance(self, HTTPSConnection):
+                timings.add("ssl", duration - self._tcp_time)
+
+    def _timed_send(self, send, *args, **kwargs):
+        timings = get_current_timings()
+        if timings is None:
+            return send(*args, **kwargs)
+        connect_time = timings.get("connect")
+        start = _clock()
+        try:
+            return send(*args, **kwargs)
+        finally:
+            # a new connection is opened by the first send: it is recorded as connect
+            timings.add("send", _clock() - start - (timings.get("connect") - connect_time))
+
+    def request(self, *args, **kwargs):
+        return self._timed_send(super(TimedConnectionMixin, self).request, *args, **kwargs)
+
+    def request_chunked(self, *args, **kwargs):
+        return self._timed_send(super(TimedConnectionMixin, self).request_chunked, *args, **kwargs)
+
+    def getresponse(self, *args, **kwargs):
+        timings = get_current_timings()
+        if timings is None:
+            return super(TimedConnectionMixin, self).getresponse(*args, **kwargs)
+        start = _clock()
+        try:
+            return super(TimedConnectionMixin, self).getresponse(*args, **kwargs)
+        finally:
+            timings.response_started = _clock()
+            timings.add("wait", timings.response_started - start)
+
+
+class TimedHTTPConnection(TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class TimedPoolMixin(object):
+    """
+    Record the time spent getting a connection from the pool as the blocked stage.
+    """
+
+    def _get_conn(self, timeout=None):
+        timings = get_current_timings()
+        if timings is None:
+            return super(TimedPoolMixin, self)._get_conn(timeout)
+        start = _clock()
+        try:
+            return super(TimedPoolMixin, self)._get_conn(timeout)
+        finally:
+            timings.add("blocked", _clock() - start)
+
+
+class TimedHTTPConnectionPool(TimedPoolMixin, HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(TimedPoolMixin, HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+timed_pool_classes_by_scheme = {"http": TimedHTTPConnectionPool, "https": TimedHTTPSConnectionPool}
+
+
+def new_pool_manager(proxy=None, num_pools=DEFAULT_NUM_POOLS, maxsize=DEFAULT_MAXSIZE, block=DEFAULT_BLOCK):
+    """
+    Build a new urllib3 pool manager for the given proxy url.
+
+    :param proxy: proxy url (http, https or socks scheme) or None.
+    :param num_pools: number of connection pools to cache (one per host).
+    :param maxsize: number of connections to save that can be reused per host.
+    :param block: block when no free connections are available instead of creating a new one.
+    :return: PoolManager, ProxyManager or SOCKSProxyManager
+    """
+    if proxy is not None and proxy.startswith("socks"):
+        from urllib3.contrib.socks import SOCKSProxyManager
+        return SOCKSProxyManager(proxy, num_pools=num_pools, maxsize=maxsize, block=block)
+    elif proxy is not None:
+        pm = urllib3.ProxyManager(proxy, num_pools=num_pools, maxsize=maxsize, block=block)
+    else:
+        pm = urllib3.PoolManager(num_pools=num_pools, maxsize=maxsize, block=block)
+    # connections record the stages of the requests they send (see sdklib.http.timings)
+    pm.pool_classes_by_scheme = timed_pool_classes_by_scheme
+    return pm
+
+
+class PoolManagerRegistry(object):
+    """
+    Thread-safe registry of urllib3 pool managers shared by every request of the process.
+
+    Pool managers are keyed by proxy url and pool settings, so connections (and TLS sessions) are kept alive and reused
+    across calls instead of being opened again for each request.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pool_managers = {}
+
+    def get(self, proxy=None, num_pools=DEFAULT_NUM_POOLS, maxsize=DEFAULT_MAXSIZE, block=DEFAULT_BLOCK):
+        """
+        Return the pool manager registered for these settings, creating it the first time.
+        """
+        key = (proxy, num_pools, maxsize, block)
+        pm = self._pool_managers.get(key)
+        if pm is None:
+            with self._lock:
+                pm = self._pool_managers.get(key)
+                if pm is None:
+                    pm = new_pool_manager(proxy, num_pools=num_pools, maxsize=maxsize, block=block)
+                    self._pool_managers[key] = pm
+        return pm
+
+    def close(self):
+        """
+        Close every pooled connection. Pool managers remain registered and will open new connections on demand.
+        """
+        with self._lock:
+            pool_managers = list(self._pool_managers.values())
+        for pm in pool_managers:
+            pm.clear()
+
+    def clear(self):
+        """
+        Close every pooled connection and forget all registered pool managers.
+        """
+        with self._lock:
+            pool_managers = list(self._pool_managers.values())
+            self._pool_managers.clear()
+        for pm in pool_managers:
+            pm.clear()
+
+    def __len__(self):
+        return len(self._pool_managers)
+
+    def __contains__(self, key):
+        return key in self._pool_managers
+
+
+pool_registry = PoolManagerRegistry()
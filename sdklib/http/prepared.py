@@ -0,0 +1,186 @@
+"""
+Prepared requests.
+
+HttpSdk.prepare builds the request context of an endpoint once (host, headers, renderer, url path template, options),
+so calling the endpoint again only costs what changes between calls: url path params, query params, body and extra
+headers. It is meant for hot loops, e.g. polling the same endpoint thousands of times.
+"""
+from sdklib.compat import urlencode, convert_unicode_to_native_str
+from sdklib.http.headers import CONTENT_TYPE_HEADER_NAME, COOKIE_HEADER_NAME
+from sdklib.http.methods import ALLOWED_METHODS
+from sdklib.http.pool import pool_registry
+from sdklib.http.timings import timings_hooks
+from sdklib.util.logger import log_print_request, log_print_response, should_log_request
+from sdklib.util.structures import CaseInsensitiveDict
+from sdklib.util.urls import compile_url_path
+
+
+# request options handled by request_from_context only: requests using any of them are not sent by the fast path
+PIPELINE_OPTIONS = (
+    "authentication_instances", "files", "response_cache", "retry_policy", "rate_limiter", "circuit_breaker",
+    "single_flight", "metrics", "compression"
+)
+
+
+def _native_headers(headers):
+    return dict(
+        (convert_unicode_to_native_str(name), convert_unicode_to_native_str(value)) for name, value in headers.items()
+    )
+
+
+class PreparedRequest(object):
+    """
+    Immutable request to an endpoint, built by HttpSdk.prepare.
+
+    When the request does not use authentication, files, body spooling or any of the optional request stages (cache,
+    retries, rate limits, circuit breaker, request coalescing, metrics, compression, timings hooks), `send` builds the
+    url and headers from their pre-computed parts and sends them straight to the pool manager. Otherwise, it sends a
+    copy of the prepared context through the sdk (http_request_from_context). Responses of the fast path have no
+    timings.
+
+    :param sdk: HttpSdk the request is sent with. Its cookies are updated with the cookies of the responses.
+    :param context: HttpRequestContext of the request.
+    :param cookie_from_sdk: (bool) send the current cookies of the sdk with every request.
+    :param allow_fast_path: (bool) use the fast path when possible. False sends every request through the sdk.
+    """
+    __slots__ = (
+        "_sdk", "_context", "_cookie_from_sdk", "_fast", "_template", "_url_path_params", "_query_params",
+        "_query_string", "_host", "_native_headers", "_body", "_pool_manager"
+    )
+
+    def __init__(self, sdk, context, cookie_from_sdk=False, allow_fast_path=True):
+        assert context.method in ALLOWED_METHODS
+        set_attr = super(PreparedRequest, self).__setattr__
+        set_attr("_sdk", sdk)
+        set_attr("_context", context)
+        set_attr("_cookie_from_sdk", cookie_from_sdk)
+        set_attr("_fast", allow_fast_path and context.spool_threshold is None and
+                 not any(getattr(context, name) for name in PIPELINE_OPTIONS))
+        set_attr("_template", compile_url_path(context.url_path, context.prefix_url_path, context.url_path_format))
+        set_attr("_url_path_params", dict(context.url_path_params or {}))
+        set_attr("_query_params", dict(context.query_params or {}))
+        set_attr("_query_string", "?%s" % urlencode(context.query_params) if context.query_params else "")
+        set_attr("_host", context.host)
+        headers = CaseInsensitiveDict(context.headers)
+        body = None
+        if self._fast and context.body_params:
+            body, content_type = context.renderer.encode_params(context.body_params)
+            if context.update_content_type and CONTENT_TYPE_HEADER_NAME not in headers:
+                headers[CONTENT_TYPE_HEADER_NAME] = content_type
+        set_attr("_body", body)
+        set_attr("_native_headers", _native_headers(headers))
+        set_attr("_pool_manager", pool_registry.get(
+            context.proxy, num_pools=context.num_pools, maxsize=context.pool_maxsize, block=context.pool_block
+        ))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("PreparedRequest is immutable.")
+
+    @property
+    def method(self):
+        return self._context.method
+
+    @property
+    def url_path(self):
+        """
+        Url path template of the request.
+        """
+        return self._context.url_path
+
+    @property
+    def headers(self):
+        """
+        Copy of the static headers of the request.
+        """
+        return dict(self._context.headers)
+
+    def _get_cookie_header(self):
+        if not self._cookie_from_sdk:
+            return None
+        cookie = self._sdk.cookie
+        if cookie.is_empty() or self._sdk.incognito_mode:
+            return None
+        return cookie.as_cookie_header_value()
+
+    def build_context(self, query_params=None, body_params=None, headers=None, **url_path_params):
+        """
+        :return: copy of the prepared context with the dynamic parameters of a request.
+        """
+        context = self._context.copy()
+        if url_path_params:
+            params = dict(self._url_path_params)
+            params.update(url_path_params)
+            context.url_path_params = params
+        if query_params:
+            params = dict(self._query_params)
+            params.update(query_params)
+            context.query_params = params
+        if body_params is not None:
+            context.body_params = body_params
+        if headers:
+            context.headers.update(headers)
+        cookie_header = self._get_cookie_header()
+        if cookie_header:
+            context.headers[COOKIE_HEADER_NAME] = cookie_header
+        return context
+
+    def send(self, query_params=None, body_params=None, headers=None, **url_path_params):
+        """
+        Send the request.
+
+        :param query_params: query params added to (or replacing) the prepared ones.
+        :param body_params: body params replacing the prepared ones.
+        :param headers: headers added to (or replacing) the prepared ones.
+        :param url_path_params: url path params, e.g. ``send(item_id=3)`` for '/items/{item_id}/'.
+        :return: response (of the response class of the sdk).
+        """
+        if not self._fast or timings_hooks:
+            context = self.build_context(query_params, body_params, headers, **url_path_params)
+            res = self._sdk.http_request_from_context(context)
+            self._sdk.cookie.update(res.cookie)
+            return res
+
+        context = self._context
+        if url_path_params:
+            params = dict(self._url_path_params)
+            params.update(url_path_params)
+        else:
+            params = self._url_path_params
+        url = self._host + self._template.render(params)
+        if query_params:
+            params = dict(self._query_params)
+            params.update(query_params)
+            url += "?%s" % urlencode(params)
+        else:
+            url += self._query_string
+
+        native_headers = self._native_headers
+        cookie_header = self._get_cookie_header()
+        if headers or cookie_header or body_params is not None:
+            # merged case-insensitively, as the context headers of the other requests
+            native_headers = CaseInsensitiveDict(native_headers)
+            if headers:
+                native_headers.update(_native_headers(headers))
+            if cookie_header:
+                native_headers[COOKIE_HEADER_NAME] = convert_unicode_to_native_str(cookie_header)
+        if body_params is not None:
+            body, content_type = context.renderer.encode_params(body_params)
+            if context.update_content_type and CONTENT_TYPE_HEADER_NAME not in native_headers:
+                native_headers[CONTENT_TYPE_HEADER_NAME] = content_type
+        else:
+            body = self._body
+
+        log = should_log_request()
+        if log:
+            log_print_request(context.method, url, query_params or self._query_params, native_headers, body)
+        r = self._pool_manager.urlopen(
+            convert_unicode_to_native_str(context.method), convert_unicode_to_native_str(url), body=body,
+            headers=native_headers, redirect=context.redirect, timeout=context.timeout,
+            preload_content=not context.stream
+        )
+        if log:
+            log_print_response(r.status, None if context.stream else r.data, r.headers)
+        res = context.response_class(r)
+        if "Set-Cookie" in r.headers:
+            self._sdk.cookie.update(res.cookie)
+        return res
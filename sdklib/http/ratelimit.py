@@ -0,0 +1,176 @@
+"""
+Client-side rate limiting.
+
+Requests are delayed so they never exceed the allowed rate of a host (or of an endpoint of a host), instead of being
+sent and rejected with 429 responses. Limits are token buckets shared by every thread of the process using the same
+RateLimiter.
+"""
+import threading
+import time
+
+from sdklib.util.urls import get_normalized_host_url
+
+_clock = getattr(time, "monotonic", time.time)
+
+
+class TokenBucket(object):
+    """
+    Thread-safe token bucket.
+
+    Tokens are reserved in advance: when the bucket is empty, reserve returns the time the caller has to wait for its
+    token, so concurrent callers are spaced exactly at the allowed rate.
+
+    :param rate: tokens added per second.
+    :param capacity: maximum number of tokens (burst size). By default, one second of tokens (at least 1).
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1, rate))
+        self._tokens = self.capacity
+        self._updated_at = _clock()
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.delayed = 0
+        self.wait_time = 0.0
+        self.max_wait_time = 0.0
+
+    def reserve(self, tokens=1):
+        """
+        Take tokens from the bucket.
+
+        :return: seconds to wait before the tokens are available (0 if they are available now).
+        """
+        with self._lock:
+            now = _clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            self._tokens -= tokens
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            self.requests += 1
+            if wait:
+                self.delayed += 1
+                self.wait_time += wait
+                self.max_wait_time = max(self.max_wait_time, wait)
+            return wait
+
+    def stats(self):
+        """
+        :return: dict with the number of requests, delayed requests, total wait time and maximum wait time (seconds).
+        """
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "delayed": self.delayed,
+                "wait_time": self.wait_time,
+                "max_wait_time": self.max_wait_time
+            }
+
+
+class RateLimiter(object):
+    """
+    Rate limits by host and, optionally, by endpoint.
+
+    :param rate: requests per second allowed to each host without a specific limit. None means no limit.
+    :param capacity: burst size of the default limit. By default, one second of requests.
+    :param per_endpoint: (bool) apply the default limit to each endpoint (url path template, e.g. '/items/{id}/') of a
+        host, instead of to the whole host.
+    """
+
+    def __init__(self, rate=None, capacity=None, per_endpoint=False):
+        self.rate = rate
+        self.capacity = capacity
+        self.per_endpoint = per_endpoint
+        self._limits = {}
+        self._buckets = {}
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def set_limit(self, host, rate, capacity=None, url_path=None):
+        """
+        Set the limit of a host, or of an endpoint of a host when url_path is given. Endpoint limits are applied in
+        addition to the host limit.
+
+        :param host: host url, e.g. 'https://api.example.com'.
+        :param rate: requests per second.
+        :param capacity: burst size. By default, one second of requests.
+        :param url_path: url path template, as passed to the sdk request methods (e.g. '/items/{id}/').
+        """
+        key = (get_normalized_host_url(host), url_path)
+        with self._lock:
+            self._limits[key] = (rate, capacity)
+            self._buckets.pop(key, None)
+
+    def _get_bucket(self, key, rate, capacity):
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    bucket = self._buckets[key] = TokenBucket(rate, capacity)
+        return bucket
+
+    def _get_host_key(self, host):
+        key = self._hosts.get(host)
+        if key is None:
+            key = self._hosts[host] = get_normalized_host_url(host)
+        return key
+
+    def get_buckets(self, host, url_path=None):
+        """
+        :return: list of TokenBucket applying to the request.
+        """
+        host = self._get_host_key(host)
+        buckets = []
+        host_limit = self._limits.get((host, None))
+        if host_limit is not None:
+            buckets.append(self._get_bucket((host, None), *host_limit))
+        endpoint_limit = self._limits.get((host, url_path)) if url_path is not None else None
+        if endpoint_limit is not None:
+            buckets.append(self._get_bucket((host, url_path), *endpoint_limit))
+        elif self.rate is not None and self.per_endpoint:
+            buckets.append(self._get_bucket((host, url_path), self.rate, self.capacity))
+        if host_limit is None and self.rate is not None and not self.per_endpoint:
+            buckets.append(self._get_bucket((host, None), self.rate, self.capacity))
+        return buckets
+
+    def reserve(self, host, url_path=None):
+        """
+        Reserve a request.
+
+        :param host: host url, e.g. 'https://api.example.com'.
+        :param url_path: url path template.
+        :return: seconds to wait before sending the request.
+        """
+        wait = 0
+        for bucket in self.get_buckets(host, url_path):
+            wait = max(wait, bucket.reserve())
+        return wait
+
+    def wait(self, host, url_path=None):
+        """
+        Block the current thread until a request can be sent.
+        """
+        seconds = self.reserve(host, url_path)
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def limit(self, func, host, url_path=None):
+        """
+        Wrap a function sending a request, so each call waits for the rate limit first.
+        """
+        def limited(*args, **kwargs):
+            self.wait(host, url_path)
+            return func(*args, **kwargs)
+        return limited
+
+    def stats(self):
+        """
+        :return: dict mapping each limit ('host' or 'host url_path') to its TokenBucket stats.
+        """
+        with self._lock:
+            buckets = list(self._buckets.items())
+        return dict(
+            (host if url_path is None else "%s %s" % (host, url_path), bucket.stats())
+            for (host, url_path), bucket in buckets
+        )
@@ -1,4 +1,3 @@
-import json
 try:
     from exceptions import BaseException
 except:
@@ -6,7 +5,9 @@ except:
 from urllib3.filepost import encode_multipart_formdata
 from urllib3.fields import RequestField, guess_content_type
 
-from sdklib.util.files import guess_filename_stream
+from sdklib.util.files import guess_filename_stream, guess_filename
+from sdklib.http.multipart import FileSource, MultiPartEncoder
+from sdklib.http.jsoncodec import get_json_codec
 from sdklib.util.structures import to_key_val_list, to_key_val_dict
 from sdklib.compat import urlencode, quote_plus, basestring, str
 
@@ -77,11 +78,52 @@ def guess_file_name_stream_type_header(args):
     return fname, fdata, ftype, fheader
 
 
+def guess_file_name_source_type_header(args):
+    """
+    Guess filename, file source, file type, file header from args, without reading the file.
+
+    :param args: may be string (filepath), 2-tuples (filename, fileobj), 3-tuples (filename, fileobj,
+    contentype) or 4-tuples (filename, fileobj, contentype, custom_headers).
+    :return: filename, file source (bytes, string or FileSource), file type, file header
+    """
+    ftype = None
+    fheader = None
+    if isinstance(args, (tuple, list)):
+        if len(args) == 2:
+            fname, fstream = args
+        elif len(args) == 3:
+            fname, fstream, ftype = args
+        else:
+            fname, fstream, ftype, fheader = args
+    else:
+        fname = guess_filename(args)
+        fstream = FileSource(path=args)
+        ftype = guess_content_type(fname)
+
+    if isinstance(fstream, (str, bytes, bytearray, FileSource)):
+        fsource = fstream
+    else:
+        fsource = FileSource(fileobj=fstream)
+        try:
+            len(fsource)
+        except TypeError:
+            # unknown size: the content is needed to compute the Content-Length header
+            fsource = fstream.read()
+    return fname, fsource, ftype, fheader
+
+
 class MultiPartRenderer(BaseRenderer):
 
-    def __init__(self, boundary="----------ThIs_Is_tHe_bouNdaRY_$", output_str='javascript'):
+    def __init__(self, boundary="----------ThIs_Is_tHe_bouNdaRY_$", output_str='javascript', stream=False):
+        """
+        :param boundary: multipart boundary.
+        :param output_str: language used to render primitive values (see to_string).
+        :param stream: (bool) build a file-like body (MultiPartEncoder) that reads files in chunks while it is sent,
+            instead of loading them in memory. By default: False.
+        """
         self.boundary = boundary
         self.output_str = output_str
+        self.stream = stream
 
     def encode_params(self, data=None, files=None, **kwargs):
         """
@@ -98,6 +140,7 @@ class MultiPartRenderer(BaseRenderer):
         # optional args
         boundary = kwargs.get("boundary", None)
         output_str = kwargs.get("output_str", self.output_str)
+        stream = kwargs.get("stream", self.stream)
 
         new_fields = []
         fields = to_key_val_list(data or {})
@@ -122,18 +165,27 @@ class MultiPartRenderer(BaseRenderer):
 
                 rf = RequestField(name=field, data=v)
                 rf.make_multipart(content_type=ctype)
-                new_fields.append(rf)
+                new_fields.append((rf, None))
 
         for (k, v) in files:
-            fn, fdata, ft, fh = guess_file_name_stream_type_header(v)
-            rf = RequestField(name=k, data=fdata, filename=fn, headers=fh)
+            if stream:
+                fn, fsource, ft, fh = guess_file_name_source_type_header(v)
+                rf = RequestField(name=k, data=b"", filename=fn, headers=fh)
+            else:
+                fn, fsource, ft, fh = guess_file_name_stream_type_header(v)
+                rf = RequestField(name=k, data=fsource, filename=fn, headers=fh)
+                fsource = None
             rf.make_multipart(content_type=ft)
-            new_fields.append(rf)
+            new_fields.append((rf, fsource))
 
         if boundary is None:
             boundary = self.boundary
-        body, content_type = encode_multipart_formdata(new_fields, boundary=boundary)
 
+        if stream:
+            body = MultiPartEncoder(new_fields, boundary)
+            return body, body.content_type
+
+        body, content_type = encode_multipart_formdata([rf for rf, _ in new_fields], boundary=boundary)
         return body, content_type
 
 
@@ -284,8 +336,12 @@ class JSONRenderer(BaseRenderer):
 
     DEFAULT_CONTENT_TYPE = "application/json"
 
-    def __init__(self):
+    def __init__(self, codec=None):
+        """
+        :param codec: JsonCodec rendering the body. By default: None (the codec returned by get_json_codec).
+        """
         self.content_type = self.DEFAULT_CONTENT_TYPE
+        self.codec = codec
 
     def encode_params(self, data=None, **kwargs):
         """
@@ -296,13 +352,9 @@ class JSONRenderer(BaseRenderer):
         if data is None:
             return b"", self.content_type
 
-        fields = to_key_val_dict(data or "")
-        try:
-            body = json.dumps(fields)
-        except:
-            body = json.dumps(fields, encoding='latin-1')
-
-        return str(body).encode(), self.content_type
+        # dicts are rendered as they are; other values (lists of 2-tuples, mappings) are converted to a dict first
+        fields = data if type(data) is dict else to_key_val_dict(data or "")
+        return (self.codec or get_json_codec()).dumps(fields), self.content_type
 
 
 class XMLRenderer(BaseRenderer):
@@ -2,28 +2,90 @@ import json
 
 from xml.etree import ElementTree
 
-from sdklib.compat import convert_bytes_to_str
+from sdklib.http.decoders import decode_body, parse_content_type
+from sdklib.http.headers import CONTENT_TYPE_HEADER_NAME
+from sdklib.http.jsoncodec import get_json_codec
+from sdklib.http.jsonstream import iter_json_items
 from sdklib.http.session import Cookie
-from sdklib.util.structures import xml_string_to_dict, CaseInsensitiveDict
+from sdklib.http.spool import spool_body
+from sdklib.http.xmlstream import iter_xml_items
+from sdklib.util.structures import CaseInsensitiveDict
 from sdklib.html import HTML
 
 
 class JsonResponseMixin(object):
+    """
+    Parsed representations of the body (json, data, xml, html...) are computed on first access and cached until the
+    body is reassigned. Every access returns the same object: copy it before modifying it in place.
+
+    Set release_body_after_parse (on a response or on a response class) to free the raw body as soon as it is parsed,
+    so large bodies are not kept twice in memory (see `release_body`).
+    """
     _body = ""
+    _parsed = None
+    _body_released = False
+    release_body_after_parse = False
+
+    def _check_body_released(self):
+        if self._body_released:
+            raise RuntimeError("The response body has been released.")
 
     @property
-    def json(self):
+    def body(self):
+        self._check_body_released()
+        return self._body
+
+    def _get_body_bytes(self):
+        # parsers need bytes: spooled bodies (memoryview) are read in memory
+        body = self.body
+        return body.tobytes() if isinstance(body, memoryview) else body
+
+    def _get_parsed(self, name, parse):
+        """
+        :return: cached result of parse(), computed on first access.
+        """
+        parsed = self._parsed
+        if parsed is None:
+            parsed = self._parsed = {}
+        elif name in parsed:
+            return parsed[name]
+        value = parsed[name] = parse()
+        if self.release_body_after_parse:
+            self.release_body()
+        return value
+
+    def _reset_parsed(self):
+        self._parsed = None
+        self._body_released = False
+
+    def release_body(self):
+        """
+        Free the raw body. Representations already parsed are still available; reading the body or parsing a new
+        representation raises RuntimeError.
+        """
+        self._body = None
+        self._body_released = True
+
+    def _parse_json(self):
+        self._check_body_released()
         try:
-            return json.loads(convert_bytes_to_str(self._body))
+            return get_json_codec().loads(self._get_body_bytes())
         except:
             return dict()
 
+    @property
+    def json(self):
+        return self._get_parsed("json", self._parse_json)
+
     @property
     def case_insensitive_dict(self):
-        return CaseInsensitiveDict(self.json)
+        return self._get_parsed("case_insensitive_dict", lambda: CaseInsensitiveDict(self.json))
 
 
 class Response(JsonResponseMixin):
+    # decode bodies without Content-Type header by trial and error (see Response.data). Opt-in fallback.
+    trial_parsing = False
+
     def __init__(self, headers=None, status=None, status_text=None, http_version=None, body=None):
         self.headers = headers
         self.status = status
@@ -69,15 +131,17 @@ class Response(JsonResponseMixin):
 
     @property
     def body(self):
+        self._check_body_released()
         return self._body
 
     @body.setter
     def body(self, value):
         self._body = value
+        self._reset_parsed()
 
     @property
     def xml(self):
-        return ElementTree.fromstring(self.body)
+        return self._get_parsed("xml", lambda: ElementTree.fromstring(self._get_body_bytes()))
 
     @property
     def raw(self):
@@ -91,23 +155,28 @@ class Response(JsonResponseMixin):
         """
         Returns HTML response data.
         """
-        return HTML(self.body)
+        return self._get_parsed("html", lambda: HTML(self._get_body_bytes()))
+
+    def _get_content_type(self):
+        headers = self.headers
+        value = headers.get(CONTENT_TYPE_HEADER_NAME)
+        if value is None:
+            for name, header_value in headers.items():
+                if name.lower() == "content-type":
+                    return header_value
+        return value
 
     @property
     def data(self):
-        data = self.body
-        try:
-            data = data.decode()
-        except:
-            pass
-        try:
-            return json.loads(data)
-        except:
-            pass
-        try:
-            return xml_string_to_dict(data)
-        except:
-            return data
+        """
+        Returns the body decoded according to its Content-Type, with the decoders registered in sdklib.http.decoders
+        (JSON and XML by default). Bodies of other types are returned as text (or bytes, if they are not text).
+        Bodies without Content-Type are returned as text too, or decoded by trial and error (JSON, XML, text) when
+        trial_parsing is True.
+        """
+        return self._get_parsed(
+            "data", lambda: decode_body(self._get_body_bytes(), self._get_content_type(), trial=self.trial_parsing)
+        )
 
 
 class AbstractBaseHttpResponse(object):
@@ -117,11 +186,18 @@ class AbstractBaseHttpResponse(object):
     See `Urllib3 <http://urllib3.readthedocs.io/en/latest/user-guide.html#response-content>`_.
     """
     urllib3_response = None
+    # HAR timings of the request, set by request_from_context (see sdklib.http.timings)
+    timings = None
     _cookie = None
 
     def __init__(self, resp):
         self.urllib3_response = resp
 
+    def _release_urllib3_body(self):
+        # the urllib3 response keeps a reference to the downloaded body too
+        if getattr(self.urllib3_response, "_body", None) is not None:
+            self.urllib3_response._body = None
+
     @property
     def cookie(self):
         if not self._cookie:
@@ -142,21 +218,194 @@ class HttpResponse(Response, AbstractBaseHttpResponse):
     """
     Wrapper of Urllib3 HTTPResponse class compatible with AbstractBaseHttpResponse.
 
+    The body is downloaded the first time it is accessed. When the request was sent with ``stream=True``, it can be
+    read incrementally instead with `iter_content`, `iter_lines` or `readinto`; the connection is released back to the
+    pool once the body is consumed or the response is closed.
+
+    When spool_threshold is set (see HttpSdk.spool_threshold), a streamed body larger than spool_threshold bytes is
+    written to a temporary file while it is read, and `body` (and `raw`) is a read-only memoryview of the file mapped in
+    memory. The temporary file is removed when the response is closed or garbage collected, unless it is moved with
+    `save_to`.
+
     See `Urllib3 <http://urllib3.readthedocs.io/en/latest/user-guide.html#response-content>`_.
     """
+    DEFAULT_CHUNK_SIZE = 64 * 1024
+    spool_threshold = None
+    _spooled = None
+
     def __init__(self, resp):
         self.urllib3_response = resp
+        self._streaming = not getattr(resp, "closed", True)
+        self._consumed = False
         super(HttpResponse, self).__init__(
             headers=self.urllib3_response.getheaders(),
             status=self.urllib3_response.status,
-            status_text=self.urllib3_response.reason,
-            body=self.urllib3_response.data
+            status_text=self.urllib3_response.reason
         )
 
+    @property
+    def body(self):
+        if self._body is None:
+            self._check_body_released()
+            if self._consumed:
+                raise RuntimeError("The response content has already been consumed.")
+            if self.spool_threshold is not None and self._streaming:
+                self._set_spooled(spool_body(self.iter_content(), self.spool_threshold))
+            else:
+                self._body = self.urllib3_response.data
+        return self._body
+
+    @body.setter
+    def body(self, value):
+        self._set_spooled(None)
+        self._body = value
+        self._reset_parsed()
+
+    @property
+    def spooled(self):
+        """
+        (bool) The body is spooled to a temporary file.
+        """
+        return self._spooled is not None
+
+    def _set_spooled(self, body):
+        if self._spooled is not None:
+            self._spooled.close()
+            self._spooled = None
+        if body is None or isinstance(body, bytes):
+            self._body = body
+        else:
+            self._spooled = body
+            self._body = body.view
+
+    def release_body(self):
+        self._set_spooled(None)
+        super(HttpResponse, self).release_body()
+        self._release_urllib3_body()
+
+    def save_to(self, path):
+        """
+        Save the body to a file. A spooled body is moved (or copied by the OS) from its temporary file, and a streamed
+        body not read yet is written chunk by chunk, so neither is loaded in memory.
+
+        :param path: path of the file.
+        """
+        if self._spooled is not None:
+            self._spooled.save_to(path)
+            return
+        with open(path, "wb") as f:
+            for chunk in self.iter_content():
+                f.write(chunk)
+
     @property
     def reason(self):
         return self.status_text
 
+    def iter_content(self, chunk_size=DEFAULT_CHUNK_SIZE, decode_content=True):
+        """
+        Iterate over the response body in chunks of bytes, without loading it in memory when it is streamed.
+
+        :param chunk_size: maximum size of each chunk.
+        :param decode_content: decode the body according to the Content-Encoding header.
+        :return: generator of bytes
+        """
+        if self._body is not None or not self._streaming:
+            body = self.body or b""
+            for i in range(0, len(body), chunk_size):
+                chunk = body[i:i + chunk_size]
+                yield chunk.tobytes() if isinstance(chunk, memoryview) else chunk
+            return
+        if self._consumed:
+            raise RuntimeError("The response content has already been consumed.")
+        self._consumed = True
+        try:
+            for chunk in self.urllib3_response.stream(chunk_size, decode_content=decode_content):
+                yield chunk
+        finally:
+            self.close()
+
+    def iter_lines(self, chunk_size=DEFAULT_CHUNK_SIZE, delimiter=None, decode_content=True):
+        """
+        Iterate over the response body line by line, without loading it in memory when it is streamed.
+
+        :param chunk_size: size of the chunks read from the connection.
+        :param delimiter: line delimiter (bytes). By default, lines end with "\\n" or "\\r\\n".
+        :return: generator of bytes, without line delimiters
+        """
+        split_by = delimiter or b"\n"
+        pending = b""
+        for chunk in self.iter_content(chunk_size, decode_content=decode_content):
+            lines = (pending + chunk).split(split_by)
+            pending = lines.pop()
+            for line in lines:
+                yield line if delimiter else line.rstrip(b"\r")
+        if pending:
+            yield pending if delimiter else pending.rstrip(b"\r")
+
+    def iter_json_items(self, prefix=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Iterate over the items of a JSON array of the body, parsing them as the body is read. When the request was sent
+        with ``stream=True``, only one item is kept in memory at a time instead of the whole document.
+
+        :param prefix: dotted path of the array in the document, e.g. 'data.items'. By default: None (the body is the
+            array).
+        :param chunk_size: size of the chunks read from the connection.
+        :return: generator of the parsed items. There are none if the path is not found or its value is null.
+        """
+        content_type = self._get_content_type()
+        charset = parse_content_type(content_type)[1] if content_type else None
+        return iter_json_items(self.iter_content(chunk_size), prefix, charset or "utf-8")
+
+    def iter_xml_items(self, depth=2, tag=None, chunk_size=DEFAULT_CHUNK_SIZE, **kwargs):
+        """
+        Iterate over the elements of the XML body at a given depth, parsing them as the body is read. When the request
+        was sent with ``stream=True``, only one item is kept in memory at a time instead of the whole document.
+
+        :param depth: depth of the items: 1 is the root element, 2 its children (default), 3 their children...
+        :param tag: name of the items. By default: None (every element at the depth).
+        :param chunk_size: size of the chunks read from the connection.
+        :param kwargs: options of sdklib.util.xmltodict.parse (e.g. xml_attribs, attr_prefix, force_list).
+        :return: generator of the items, as parsed by xmltodict (dicts, or strings for text only elements).
+        """
+        content_type = self._get_content_type()
+        charset = parse_content_type(content_type)[1] if content_type else None
+        return iter_xml_items(self.iter_content(chunk_size), depth, tag, charset, **kwargs)
+
+    def readinto(self, b):
+        """
+        Read bytes of the streamed response body into a pre-allocated, writable bytes-like object.
+
+        :param b: bytearray or memoryview
+        :return: number of bytes read, 0 once the body is consumed.
+        """
+        if self._body is not None or not self._streaming:
+            raise RuntimeError("The response content is not streamed.")
+        self._consumed = True
+        n = self.urllib3_response.readinto(b)
+        if not n:
+            self.close()
+        return n
+
+    def close(self):
+        """
+        Close the response and release its connection back to the pool.
+
+        A streamed body that was not fully read is discarded and its connection closed. A spooled body is released
+        (see `release_body`) and its temporary file removed.
+        """
+        if self._streaming and self._body is None:
+            self._consumed = True
+            self.urllib3_response.close()
+        self.urllib3_response.release_conn()
+        if self._spooled is not None:
+            self.release_body()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
 
 class Error(object):
     def __init__(self, json_data):
@@ -205,10 +454,17 @@ class Api11PathsResponse(AbstractBaseHttpResponse, JsonResponseMixin):
         """
         return self.case_insensitive_dict.get("data", None)
 
+    def release_body(self):
+        super(Api11PathsResponse, self).release_body()
+        self._release_urllib3_body()
+
+    def _parse_error(self):
+        error = self.case_insensitive_dict.get("error", None)
+        return Error(error) if error is not None else None
+
     @property
     def error(self):
         """
         @return Error the error part of the API response, consisting of an error code and an error message
         """
-        return Error(self.case_insensitive_dict["error"]) if self.case_insensitive_dict.get("error", None) is not None \
-            else None
+        return self._get_parsed("error", self._parse_error)
@@ -0,0 +1,285 @@
+"""
+Retry policies for sdk requests.
+
+A RetryPolicy decides whether a failed request (a connection error, a timeout or a response with a retryable status
+code) is sent again and how long to wait before. Retries are limited by a RetryBudget shared by every policy of the
+process, so they can not amplify the load of an upstream that is already failing.
+"""
+import random
+import threading
+import time
+from collections import deque
+
+from urllib3 import Retry
+from urllib3.exceptions import ConnectTimeoutError, MaxRetryError, ProtocolError, TimeoutError
+
+from sdklib.compat import str
+from sdklib.http.methods import IDEMPOTENT_METHODS
+from sdklib.util.times import parse_http_date
+
+
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_STATUS_CODES = (429, 502, 503, 504)
+DEFAULT_EXCEPTIONS = (TimeoutError, ProtocolError)
+DEFAULT_BACKOFF_FACTOR = 0.1
+DEFAULT_BACKOFF_MAX = 10
+
+# urllib3 retries of the requests retried by a retry policy: redirects are still followed, but connection and read
+# errors are raised at once so they are only retried by the policy. Other requests keep the default urllib3 retries.
+TRANSPORT_RETRIES = Retry(3, connect=0, read=0)
+
+_clock = getattr(time, "monotonic", time.time)
+
+
+class RetryBudget(object):
+    """
+    Thread-safe limit of retries as a ratio of the requests sent in the last seconds.
+
+    :param ratio: maximum number of retries per request, e.g. 0.2 allows 1 retry every 5 requests.
+    :param min_retries_per_second: retries always allowed, so clients with low traffic can still retry.
+    :param ttl: length (in seconds) of the window the requests and retries are counted in.
+    """
+
+    def __init__(self, ratio=0.2, min_retries_per_second=10, ttl=10):
+        self.ratio = ratio
+        self.min_retries_per_second = min_retries_per_second
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._window = deque()  # [second, requests, retries]
+        self.requests = 0
+        self.retries = 0
+        self.rejected = 0
+
+    def _current_bucket(self, now):
+        second = int(now)
+        while self._window and self._window[0][0] <= second - self.ttl:
+            self._window.popleft()
+        if not self._window or self._window[-1][0] != second:
+            self._window.append([second, 0, 0])
+        return self._window[-1]
+
+    def record_request(self):
+        """
+        Count a new request (not a retry).
+        """
+        with self._lock:
+            self._current_bucket(_clock())[1] += 1
+            self.requests += 1
+
+    def can_retry(self):
+        """
+        Withdraw a retry from the budget.
+
+        :return: True if the retry is allowed, False if the budget is exhausted.
+        """
+        with self._lock:
+            bucket = self._current_bucket(_clock())
+            requests = sum(b[1] for b in self._window)
+            retries = sum(b[2] for b in self._window)
+            if retries >= self.min_retries_per_second * self.ttl + self.ratio * requests:
+                self.rejected += 1
+                return False
+            bucket[2] += 1
+            self.retries += 1
+            return True
+
+    def stats(self):
+        """
+        :return: dict with the number of requests, retries and rejected retries.
+        """
+        with self._lock:
+            return {"requests": self.requests, "retries": self.retries, "rejected": self.rejected}
+
+
+retry_budget = RetryBudget()
+
+
+class RetryPolicy(object):
+    """
+    Thread-safe retry policy. It can be shared by several sdk instances.
+
+    :param max_attempts: maximum number of times a request is sent (including the first one).
+    :param status_codes: response status codes that are retried.
+    :param methods: methods that are retried. By default, only idempotent methods.
+    :param exceptions: exceptions that are retried (urllib3 MaxRetryError are unwrapped).
+    :param backoff_factor: the n-th retry waits up to ``backoff_factor * 2 ** (n - 1)`` seconds.
+    :param backoff_max: maximum number of seconds to wait between attempts.
+    :param jitter: (bool) wait a random time between 0 and the backoff time ("full jitter"), so clients failing at the
+        same time do not retry at the same time.
+    :param respect_retry_after: (bool) wait the time asked by the Retry-After header of the response. The request is
+        not retried if it is longer than backoff_max.
+    :param budget: RetryBudget limiting the retries. By default, the budget shared by the whole process. None means no
+        limit.
+    """
+
+    def __init__(self, max_attempts=DEFAULT_MAX_ATTEMPTS, status_codes=DEFAULT_STATUS_CODES, methods=IDEMPOTENT_METHODS,
+                 exceptions=DEFAULT_EXCEPTIONS, backoff_factor=DEFAULT_BACKOFF_FACTOR, backoff_max=DEFAULT_BACKOFF_MAX,
+                 jitter=True, respect_retry_after=True, budget=retry_budget):
+        self.max_attempts = max_attempts
+        self.status_codes = frozenset(status_codes)
+        self.methods = frozenset(m.upper() for m in methods)
+        self.exceptions = tuple(exceptions)
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        self.jitter = jitter
+        self.respect_retry_after = respect_retry_after
+        self.budget = budget
+        self._lock = threading.Lock()
+        self.retries = 0
+        self.exhausted = 0
+        self.rejected = 0
+
+    def stats(self):
+        """
+        :return: dict with the number of retries, requests that failed after max_attempts and retries rejected by the
+            budget.
+        """
+        with self._lock:
+            return {"retries": self.retries, "exhausted": self.exhausted, "rejected": self.rejected}
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def record_request(self):
+        if self.budget is not None:
+            self.budget.record_request()
+
+    def is_retryable_method(self, method):
+        return method.upper() in self.methods
+
+    def get_transport_retries(self, method):
+        """
+        :return: urllib3 retries of a request sent with this policy: TRANSPORT_RETRIES if the policy retries its method,
+            None (the urllib3 defaults, which retry connection errors) otherwise.
+        """
+        return TRANSPORT_RETRIES if self.is_retryable_method(method) else None
+
+    def is_retryable_error(self, error):
+        if isinstance(error, MaxRetryError) and error.reason is not None:
+            error = error.reason
+        return isinstance(error, self.exceptions)
+
+    def get_backoff_time(self, attempt):
+        """
+        :param attempt: number of the attempt that failed (1 for the first one).
+        :return: seconds to wait before the next attempt.
+        """
+        backoff = min(self.backoff_max, self.backoff_factor * (2 ** (attempt - 1)))
+        return random.uniform(0, backoff) if self.jitter else backoff
+
+    @staticmethod
+    def parse_retry_after(value):
+        """
+        :param value: Retry-After header value (seconds or http date).
+        :return: seconds to wait or None if the value is not valid.
+        """
+        if value is None:
+            return None
+        value = value.strip()
+        if value.isdigit():
+            return int(value)
+        date = parse_http_date(value)
+        return max(0, date - time.time()) if date is not None else None
+
+    def get_retry_delay(self, method, attempt, response=None, error=None):
+        """
+        Decide whether a failed attempt is retried.
+
+        :param method: request method.
+        :param attempt: number of the attempt that failed (1 for the first one).
+        :param response: response of the attempt, if any.
+        :param error: exception raised by the attempt, if any.
+        :return: seconds to wait before retrying or None if the request must not be retried.
+        """
+        if not self.is_retryable_method(method):
+            return None
+        if error is not None and not self.is_retryable_error(error):
+            return None
+        if error is None and (response is None or response.status not in self.status_codes):
+            return None
+        if attempt >= self.max_attempts:
+            self._count("exhausted")
+            return None
+
+        delay = self.get_backoff_time(attempt)
+        if self.respect_retry_after and response is not None:
+            retry_after = self.parse_retry_after(response.headers.get("Retry-After"))
+            if retry_after is not None:
+                if retry_after > self.backoff_max:
+                    return None
+                delay = max(delay, retry_after)
+
+        if self.budget is not None and not self.budget.can_retry():
+            self._count("rejected")
+            return None
+        self._count("retries")
+        return delay
+
+    def call(self, method, send, body=None):
+        """
+        Call ``send()`` until it returns a response that does not have to be retried.
+
+        :param method: request method.
+        :param send: function sending the request and returning a urllib3 response.
+        :param body: request body. File-like bodies are rewound before each retry. Requests with a body that can not
+            be rewound (e.g. a generator) are only retried when the connection could not be established, since nothing
+            was sent.
+        :return: urllib3 response.
+        """
+        if not self.is_retryable_method(method):
+            return send()
+        self.record_request()
+        rewindable = is_rewindable(body)
+        attempt = 1
+        while True:
+            try:
+                response = send()
+            except Exception as e:
+                delay = None
+                if rewindable or is_connect_error(e):
+                    delay = self.get_retry_delay(method, attempt, error=e)
+                if delay is None:
+                    raise
+            else:
+                delay = self.get_retry_delay(method, attempt, response=response) if rewindable else None
+                if delay is None:
+                    return response
+                discard_response(response)
+            time.sleep(delay)
+            rewind_body(body)
+            attempt += 1
+
+
+def discard_response(response):
+    """
+    Read the remaining content of a response that is not returned, so its connection can be reused.
+    """
+    try:
+        response.read()
+    except Exception:
+        pass
+    finally:
+        response.release_conn()
+
+
+def is_connect_error(error):
+    """
+    :return: True if error was raised because the connection could not be established, so the request was not sent.
+    """
+    if isinstance(error, MaxRetryError) and error.reason is not None:
+        error = error.reason
+    if isinstance(error, ProtocolError) and len(error.args) > 1:
+        # urllib3 (and the asyncio transport) wrap the original errors
+        error = error.args[1]
+    # NewConnectionError is a ConnectTimeoutError
+    return isinstance(error, ConnectTimeoutError)
+
+
+def is_rewindable(body):
+    return body is None or isinstance(body, (bytes, str)) or hasattr(body, "seek")
+
+
+def rewind_body(body):
+    if hasattr(body, "seek"):
+        body.seek(0)
@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+import threading
 
 from urllib3._collections import HTTPHeaderDict
 from sdklib.compat import cookies
@@ -9,12 +10,20 @@ class Cookie(object):
     Wrapper of python Cookie class.
 
     See https://docs.python.org/2/library/cookie.html
+
+    It is thread-safe: a cookie may be read and updated from several threads at the same time.
     """
 
     def __init__(self, headers=None):
+        self._lock = threading.RLock()
         self._cookie = cookies.SimpleCookie()
         self.load_from_headers(headers)
 
+    def __deepcopy__(self, memo):
+        new_cookie = Cookie()
+        new_cookie.update(self)
+        return new_cookie
+
     def load_from_headers(self, headers):
         if not headers:
             return
@@ -22,12 +31,13 @@ class Cookie(object):
             headers = HTTPHeaderDict(headers)
         set_cookie_headers = headers.getlist("Set-Cookie")
         if set_cookie_headers:
-            self._cookie.load("; ".join(set_cookie_headers))
+            with self._lock:
+                self._cookie.load("; ".join(set_cookie_headers))
 
     def as_cookie_header_value(self):
-        if self.is_empty():
-            return ""
         items = list(self.items())
+        if not items:
+            return ""
         name, morsel = items[0]
         output = "%s=%s" % (name, morsel.value)
         for name, morsel in items[1:]:
@@ -42,11 +52,14 @@ class Cookie(object):
         return self._cookie
 
     def items(self):
-        return self._cookie.items()
+        with self._lock:
+            return list(self._cookie.items())
 
     def get(self, key, default=None):
         return self._cookie.get(key, default)
 
     def update(self, cookie):
-        for key, morsel in cookie.items():
-            self._cookie[key] = morsel.value
+        items = cookie.items()
+        with self._lock:
+            for key, morsel in items:
+                self._cookie[key] = morsel.value
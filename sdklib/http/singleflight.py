@@ -0,0 +1,137 @@
+"""
+Request coalescing ("single flight").
+
+Identical requests sent at the same time by several threads share one network round trip: the first one (the leader)
+is sent, and the others wait for its response. Each caller gets its own response object, rebuilt from the status,
+headers and body received by the leader.
+"""
+import threading
+
+from urllib3 import HTTPResponse
+from urllib3._collections import HTTPHeaderDict
+
+from sdklib.compat import str
+from sdklib.http.methods import GET_METHOD, HEAD_METHOD
+
+
+DEFAULT_METHODS = (GET_METHOD, HEAD_METHOD)
+
+
+def snapshot_response(response):
+    """
+    :param response: urllib3 response with its content loaded.
+    :return: tuple with the data needed to rebuild the response.
+    """
+    return response.status, response.reason, response.version, list(response.headers.items()), response.data
+
+
+def new_response(snapshot):
+    """
+    Build a new urllib3 response from a snapshot.
+    """
+    status, reason, version, headers, data = snapshot
+    return HTTPResponse(
+        body=data, headers=HTTPHeaderDict(headers), status=status, reason=reason, version=version,
+        preload_content=False, decode_content=False
+    )
+
+
+class _Call(object):
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.snapshot = None
+        self.error = None
+
+
+class SingleFlight(object):
+    """
+    Thread-safe coalescing of identical in-flight requests.
+
+    By default, requests are identical when they have the same method, url (including the query string), headers
+    and body. Streamed requests and requests with a file-like body are never coalesced.
+
+    :param methods: methods coalesced. Only idempotent methods should be coalesced. By default: GET and HEAD.
+    :param headers: names of the headers that are part of the key. By default: None (all the headers).
+    :param exclude_headers: names of the headers that are not part of the key, e.g. headers with a per request value
+        like a date or a nonce.
+    :param key_func: function ``key_func(context, url, body)`` returning the key of a request, replacing the default
+        key.
+    """
+
+    def __init__(self, methods=DEFAULT_METHODS, headers=None, exclude_headers=(), key_func=None):
+        self.methods = frozenset(m.upper() for m in methods)
+        self.headers = frozenset(h.lower() for h in headers) if headers is not None else None
+        self.exclude_headers = frozenset(h.lower() for h in exclude_headers)
+        self.key_func = key_func
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.requests = 0
+        self.coalesced = 0
+
+    def is_coalescable(self, context, body):
+        return context.method in self.methods and not context.stream and context.spool_threshold is None and \
+            (body is None or isinstance(body, (bytes, str)))
+
+    def _is_key_header(self, name):
+        name = name.lower()
+        return name not in self.exclude_headers and (self.headers is None or name in self.headers)
+
+    def get_key(self, context, url, body):
+        """
+        :return: hashable key of the request.
+        """
+        if self.key_func is not None:
+            return self.key_func(context, url, body)
+        headers = tuple(sorted((k.lower(), v) for k, v in context.headers.items() if self._is_key_header(k)))
+        return context.method, url, headers, body
+
+    def count(self, coalesced):
+        with self._lock:
+            if coalesced:
+                self.coalesced += 1
+            else:
+                self.requests += 1
+
+    def do(self, key, func):
+        """
+        Call ``func()`` (returning a urllib3 response), unless an identical call is in flight; in that case, wait for
+        it and return a copy of its response.
+
+        :param key: key of the request.
+        :param func: function sending the request.
+        :return: urllib3 response.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.requests += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return new_response(call.snapshot)
+
+        try:
+            response = func()
+            call.snapshot = snapshot_response(response)
+            return response
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+    def stats(self):
+        """
+        :return: dict with the number of requests sent and of requests that waited for an identical one.
+        """
+        with self._lock:
+            return {"requests": self.requests, "coalesced": self.coalesced}
@@ -0,0 +1,116 @@
+"""
+Spooling of large response bodies to disk (see HttpSdk.spool_threshold).
+
+While a body is read, its chunks are kept in memory until their size goes above the threshold; from then on they are
+written to a temporary file instead, which is mapped in memory read-only once the body is complete. The pages of the
+mapping are loaded by the operating system on access and can be dropped under memory pressure, so many concurrent large
+downloads do not add up in the resident memory of the process.
+"""
+import mmap
+import os
+import shutil
+import tempfile
+
+
+class SpooledBody(object):
+    """
+    Response body stored in a temporary file, mapped in memory read-only.
+
+    The temporary file is removed by `close` (or when the object is garbage collected), unless it was moved by
+    `save_to`: path is then the path it was moved to.
+
+    :param fileobj: file object of the temporary file, positioned at its end.
+    :param path: path of the temporary file.
+    """
+    path = None
+    view = None
+    _owned = False
+
+    def __init__(self, fileobj, path):
+        self._file = fileobj
+        self.path = path
+        self._owned = True
+        self.size = fileobj.tell()
+        self._mmap = mmap.mmap(fileobj.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self._mmap)
+
+    def __len__(self):
+        return self.size
+
+    def save_to(self, path):
+        """
+        Move the temporary file to path, without reading it. When it cannot be moved (e.g. path is in another file
+        system), it is copied with shutil.copyfile, which does not load the file in memory. The mapping stays valid
+        either way.
+        """
+        if self.view is None:
+            raise RuntimeError("The spooled body is closed.")
+        if self._owned:
+            try:
+                os.rename(self.path, path)
+            except OSError:
+                pass
+            else:
+                self.path = path
+                self._owned = False
+                return
+        shutil.copyfile(self.path, path)
+
+    def close(self):
+        """
+        Unmap the body and remove the temporary file. Slices of the memoryview still referenced keep the mapping open
+        until they are garbage collected.
+        """
+        view, self.view = self.view, None
+        if view is not None:
+            try:
+                if hasattr(view, "release"):
+                    view.release()
+                self._mmap.close()
+            except BufferError:
+                pass
+            self._file.close()
+        if self._owned:
+            self._owned = False
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+    def __del__(self):
+        self.close()
+
+
+def spool_body(chunks, threshold, dir=None):
+    """
+    Read a body, spooling it to a temporary file when its size goes above threshold.
+
+    :param chunks: iterable of bytes chunks of the body.
+    :param threshold: maximum size (in bytes) of the bodies kept in memory.
+    :param dir: directory of the temporary files. By default: None (see tempfile.gettempdir).
+    :return: body as bytes, or SpooledBody when it is larger than threshold.
+    """
+    buffered = []
+    size = 0
+    chunks = iter(chunks)
+    for chunk in chunks:
+        buffered.append(chunk)
+        size += len(chunk)
+        if size > threshold:
+            break
+    else:
+        return b"".join(buffered)
+
+    fd, path = tempfile.mkstemp(prefix="sdklib-body-", dir=dir)
+    fileobj = os.fdopen(fd, "w+b")
+    try:
+        fileobj.writelines(buffered)
+        del buffered
+        for chunk in chunks:
+            fileobj.write(chunk)
+        fileobj.flush()
+        return SpooledBody(fileobj, path)
+    except BaseException:
+        fileobj.close()
+        os.remove(path)
+        raise
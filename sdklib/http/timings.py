@@ -0,0 +1,126 @@
+"""
+Per-stage timings of requests, in the format of the ``timings`` object of HAR entries (see sdklib.http.har).
+
+Standard HAR fields are milliseconds spent in each network stage of the request:
+
+- blocked: waiting for a free connection of the pool.
+- dns, connect, ssl: opening a new connection (connect includes dns and ssl). -1 when a kept-alive connection is reused.
+- send: sending the request line, headers and body.
+- wait: waiting for the first byte of the response (time to first byte).
+- receive: downloading the response body. 0 when the body is streamed.
+
+Custom fields (prefixed with an underscore, as allowed by the HAR format) measure the work done by sdklib itself:
+_copy, _url, _render, _compress, _authenticate, _cache, _throttle (rate limits, circuit breakers and retry delays),
+_log, _transport (urllib3 overhead), _single_flight (waiting for an identical request), _response (response wrapping)
+and _total (the whole call).
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+HAR_FIELDS = ("blocked", "dns", "connect", "send", "wait", "receive", "ssl")
+# Fields that must be non-negative in HAR; the other ones are -1 when they do not apply.
+REQUIRED_HAR_FIELDS = ("send", "wait", "receive")
+
+_clock = getattr(time, "perf_counter", time.time)
+_local = threading.local()
+
+timings_hooks = []
+
+
+def add_timings_hook(hook):
+    """
+    Register a function called with the timings of every request: ``hook(context, response, timings)``.
+
+    The hook gets the request context sent (before url path params are rendered), the response and its HAR timings
+    dict. It is called by the thread (or task) that sent the request, once the response is built, and it is not called
+    when the request fails.
+    """
+    timings_hooks.append(hook)
+
+
+def remove_timings_hook(hook):
+    timings_hooks.remove(hook)
+
+
+def get_current_timings():
+    """
+    :return: RequestTimings of the request being sent by the current thread, or None.
+    """
+    return getattr(_local, "timings", None)
+
+
+def set_current_timings(timings):
+    """
+    Set the RequestTimings the connections used by the current thread record their stages into.
+
+    :return: previous RequestTimings of the thread.
+    """
+    previous = getattr(_local, "timings", None)
+    _local.timings = timings
+    return previous
+
+
+class RequestTimings(object):
+    """
+    Stage durations of a request. Durations are accumulated, e.g. over retries and redirects.
+    """
+
+    def __init__(self):
+        self.start = self._last = _clock()
+        self.end = None
+        self.response_started = None
+        self._durations = OrderedDict()
+
+    def add(self, name, seconds):
+        self._durations[name] = self._durations.get(name, 0) + seconds
+
+    def get(self, name, default=0):
+        """
+        :return: seconds recorded for a stage.
+        """
+        return self._durations.get(name, default)
+
+    def lap(self, name):
+        """
+        Record the time elapsed since the previous lap (or mark) as a stage.
+        """
+        now = _clock()
+        self.add(name, now - self._last)
+        self._last = now
+
+    def mark(self):
+        """
+        Start the next lap now, without recording the time elapsed since the previous one.
+        """
+        self._last = _clock()
+
+    def network_time(self):
+        """
+        :return: seconds recorded in the standard stages (ssl is part of connect).
+        """
+        return sum(self._durations.get(name, 0) for name in HAR_FIELDS if name != "ssl")
+
+    def finish(self):
+        self.end = self._last = _clock()
+
+    def as_har(self):
+        """
+        :return: dict with the standard HAR timings and the custom stages, in milliseconds.
+        """
+        har = OrderedDict(
+            (name, round(self._durations[name] * 1000, 3) if name in self._durations else
+             (0 if name in REQUIRED_HAR_FIELDS else -1))
+            for name in HAR_FIELDS
+        )
+        for name, seconds in self._durations.items():
+            if name not in har:
+                har[name] = round(seconds * 1000, 3)
+        har["_total"] = round(((self.end or _clock()) - self.start) * 1000, 3)
+        return har
+
+
+def call_timings_hooks(context, response, timings):
+    for hook in list(timings_hooks):
+        hook(context, response, timings)
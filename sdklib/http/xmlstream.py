@@ -0,0 +1,77 @@
+"""
+Incremental parsing of the items of large XML documents (see HttpResponse.iter_xml_items).
+
+Chunks of the document are fed to the expat parser as they are read, and the items at the requested depth are built
+by the streaming mode of the bundled xmltodict (item_depth), so only one item is kept in memory at a time.
+"""
+from collections import deque
+
+from sdklib.compat import str
+from sdklib.util.xmltodict import _DictSAXHandler, expat
+
+
+def _complete_item(handler, item, attrs):
+    """
+    Add to an item what the item callback of xmltodict leaves out: its attributes and the text of items with children.
+    """
+    data = handler.cdata_separator.join(handler.data) if handler.data else None
+    if handler.strip_whitespace and data:
+        data = data.strip() or None
+    entries = []
+    if handler.xml_attribs and attrs:
+        entries.extend((handler.attr_prefix + key, value) for key, value in attrs.items())
+    if isinstance(item, dict):
+        entries.extend(item.items())
+    if not entries and not (data and handler.force_cdata):
+        return data
+    item = handler.dict_constructor(entries)
+    if data:
+        item[handler.cdata_key] = data
+    return item
+
+
+def iter_xml_items(chunks, depth=2, tag=None, encoding=None, **kwargs):
+    """
+    Iterate over the elements of an XML document at a given depth, parsing the document incrementally.
+
+    :param chunks: iterable of bytes (or str) chunks of the document.
+    :param depth: depth of the items: 1 is the root element, 2 its children (default), 3 their children...
+    :param tag: name of the items. By default: None (every element at the depth).
+    :param encoding: encoding of the document, overriding its XML declaration. By default: None.
+    :param kwargs: options of sdklib.util.xmltodict.parse (e.g. xml_attribs, attr_prefix, force_list).
+    :return: generator of the items, as parsed by xmltodict (dicts, or strings for text only elements).
+    """
+    items = deque()
+
+    def start(name, attrs):
+        # the text around the items is not theirs
+        if len(handler.path) < depth:
+            handler.data = []
+        handler.startElement(name, attrs)
+
+    def collect(path, item):
+        name, attrs = path[-1]
+        if tag is None or name == tag:
+            items.append(_complete_item(handler, item, attrs))
+        return True
+
+    handler = _DictSAXHandler(item_depth=depth, item_callback=collect, **kwargs)
+    parser = expat.ParserCreate(encoding, None)
+    try:
+        parser.ordered_attributes = True
+    except AttributeError:
+        pass
+    parser.StartElementHandler = start
+    parser.EndElementHandler = handler.endElement
+    parser.CharacterDataHandler = handler.characters
+    parser.buffer_text = True
+
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode(encoding or "utf-8")
+        parser.Parse(chunk, False)
+        while items:
+            yield items.popleft()
+    parser.Parse(b"", True)
+    while items:
+        yield items.popleft()
@@ -1,9 +1,13 @@
 import ntpath
 
 
+def guess_filename(path_to_file):
+    return ntpath.basename(path_to_file)
+
+
 def guess_filename_stream(path_to_file):
     f = open(path_to_file, 'rb')
     buf = f.read()
     f.close()
-    filename = ntpath.basename(path_to_file)
+    filename = guess_filename(path_to_file)
     return filename, buf
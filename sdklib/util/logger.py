@@ -2,6 +2,7 @@
 
 import json
 import logging
+import random
 from xml.dom.minidom import parseString
 
 from sdklib.compat import str
@@ -35,10 +36,100 @@ def _get_pretty_body(headers, body):
         return body
 
 
+# Maximum number of characters of the logged bodies (None means no limit).
+log_body_max_length = None
+# Ratio of requests logged (1.0 logs every request).
+log_sample_rate = 1.0
+
+
+def configure_logging(body_max_length=None, sample_rate=1.0):
+    """
+    Configure the debug logs of requests and responses.
+
+    :param body_max_length: maximum number of characters of the logged bodies. Longer bodies are truncated (and not
+        pretty printed). By default: None (no limit).
+    :param sample_rate: ratio of requests logged, e.g. 0.01 logs 1 of every 100 requests. By default: 1.0.
+    """
+    global log_body_max_length, log_sample_rate
+    log_body_max_length = body_max_length
+    log_sample_rate = sample_rate
+
+
+def should_log_request():
+    """
+    Return True if the request about to be sent has to be logged: debug logs are enabled and the request is sampled.
+    Check it once per request, so its request and its response are logged (or skipped) together.
+    """
+    if not logger.isEnabledFor(logging.DEBUG):
+        return False
+    return log_sample_rate >= 1 or random.random() < log_sample_rate
+
+
+def _format_body(headers, body):
+    if log_body_max_length is not None and len(body) > log_body_max_length:
+        return '{}... ({} more)'.format(body[:log_body_max_length], len(body) - log_body_max_length)
+    return _get_pretty_body(headers, body)
+
+
+class _RequestLogMessage(object):
+    """
+    Request log message, formatted only if the log record is emitted.
+    """
+
+    def __init__(self, method, url, query_params, headers, body):
+        self.method = method
+        self.url = url
+        self.query_params = query_params
+        self.headers = headers
+        self.body = body
+
+    def __str__(self):
+        log_msg = '\n>>>>>>>>>>>>>>>>>>>>> Request >>>>>>>>>>>>>>>>>>> \n'
+        log_msg += '\t> Method: %s\n' % self.method
+        log_msg += '\t> Url: %s\n' % self.url
+        if self.query_params is not None:
+            log_msg += '\t> Query params: {}\n'.format(str(self.query_params))
+        if self.headers is not None:
+            log_msg += '\t> Headers:\n{}\n'.format(json.dumps(dict(self.headers), sort_keys=True, indent=4))
+        if self.body is not None:
+            try:
+                log_msg += '\t> Payload sent:\n{}\n'.format(_format_body(self.headers, self.body))
+            except:
+                log_msg += "\t> Payload could't be formatted"
+        return log_msg
+
+
+class _ResponseLogMessage(object):
+    """
+    Response log message, formatted only if the log record is emitted.
+    """
+
+    def __init__(self, status_code, response, headers):
+        self.status_code = status_code
+        self.response = response
+        self.headers = headers
+
+    def __str__(self):
+        log_msg = '\n<<<<<<<<<<<<<<<<<<<<<< Response <<<<<<<<<<<<<<<<<<\n'
+        log_msg += '\t< Response code: {}\n'.format(str(self.status_code))
+        if self.headers is not None:
+            log_msg += '\t< Headers:\n{}\n'.format(json.dumps(dict(self.headers), sort_keys=True, indent=4))
+        if self.response is None:
+            log_msg += '\t< Payload not downloaded yet (stream)'
+        else:
+            try:
+                log_msg += '\t< Payload received:\n{}'.format(_format_body(self.headers, self.response))
+            except:
+                log_msg += '\t< Payload received:\n{}'.format(self.response)
+        return log_msg
+
+
 def log_print_request(method, url, query_params=None, headers=None, body=None):
     """
     Log an HTTP request data in a user-friendly representation.
 
+    The message is only formatted when debug logs are enabled.
+
     :param method: HTTP method
     :param url: URL
     :param query_params: Query parameters in the URL
@@ -46,39 +137,20 @@ def log_print_request(method, url, query_params=None, headers=None, body=None):
     :param body: Body (raw body, string)
     :return: None
     """
-
-    log_msg = '\n>>>>>>>>>>>>>>>>>>>>> Request >>>>>>>>>>>>>>>>>>> \n'
-    log_msg += '\t> Method: %s\n' % method
-    log_msg += '\t> Url: %s\n' % url
-    if query_params is not None:
-        log_msg += '\t> Query params: {}\n'.format(str(query_params))
-    if headers is not None:
-        log_msg += '\t> Headers:\n{}\n'.format(json.dumps(dict(headers), sort_keys=True, indent=4))
-    if body is not None:
-        try:
-            log_msg += '\t> Payload sent:\n{}\n'.format(_get_pretty_body(headers, body))
-        except:
-            log_msg += "\t> Payload could't be formatted"
-
-    logger.debug(log_msg)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(_RequestLogMessage(method, url, query_params, headers, body))
 
 
 def log_print_response(status_code, response, headers=None):
     """
     Log an HTTP response data in a user-friendly representation.
 
+    The message is only formatted when debug logs are enabled.
+
     :param status_code: HTTP Status Code
-    :param response: Raw response content (string)
+    :param response: Raw response content (string) or None if it is not downloaded yet
     :param headers: Headers in the response (dict)
     :return: None
     """
-
-    log_msg = '\n<<<<<<<<<<<<<<<<<<<<<< Response <<<<<<<<<<<<<<<<<<\n'
-    log_msg += '\t< Response code: {}\n'.format(str(status_code))
-    if headers is not None:
-        log_msg += '\t< Headers:\n{}\n'.format(json.dumps(dict(headers), sort_keys=True, indent=4))
-    try:
-        log_msg += '\t< Payload received:\n{}'.format(_get_pretty_body(headers, response))
-    except:
-        log_msg += '\t< Payload received:\n{}'.format(response)
-    logger.debug(log_msg)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(_ResponseLogMessage(status_code, response, headers))
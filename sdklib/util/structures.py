@@ -152,7 +152,10 @@ class CaseInsensitiveDict(collections.MutableMapping):
 
     # Copy is required
     def copy(self):
-        return CaseInsensitiveDict(self._store.values())
+        # the stored (key, value) tuples are immutable: copying the store is enough
+        new_dict = CaseInsensitiveDict.__new__(CaseInsensitiveDict)
+        new_dict._store = self._store.copy()
+        return new_dict
 
     def __repr__(self):
         return str(dict(self.items()))
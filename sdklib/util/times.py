@@ -5,6 +5,7 @@ from multiprocessing import TimeoutError
 from multiprocessing.pool import ThreadPool
 import threading
 import weakref
+from email.utils import parsedate_tz, mktime_tz
 
 from sdklib.compat import thread
 
@@ -47,6 +48,19 @@ def datetime_to_milliseconds_timestamp(datetime_obj):
     return seconds_to_milliseconds_timestamp(seconds_timestamp)
 
 
+def parse_http_date(value):
+    """
+    Parse an http date (e.g. an Expires header) into a timestamp.
+
+    :return: timestamp or None if the date is not valid.
+    """
+    try:
+        parsed = parsedate_tz(value)
+        return mktime_tz(parsed) if parsed else None
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
 def get_thread_pool():
     global thread_pool
     if thread_pool is None:
@@ -1,4 +1,5 @@
 import re
+import string
 
 from sdklib.compat import urlencode, str, urlsplit as py_urlsplit
 
@@ -41,6 +42,15 @@ def get_hostname_parameters_from_url(url):
     return scheme, host, port
 
 
+def get_normalized_host_url(url):
+    """
+    :return: 'scheme://hostname:port' of url, lowercased and with the default port of the scheme when it has none.
+    """
+    # scheme and hostname are case insensitive
+    scheme, host, port = get_hostname_parameters_from_url(url.lower())
+    return "%s://%s:%s" % (scheme, host, port)
+
+
 def _ensure_str_starts_with(_str, beginning, default=''):
     if not _str:
         return default
@@ -80,3 +90,94 @@ def generate_url(scheme=None, host=None, port=None, path=None, query=None):
     if query is not None:
         url += "?%s" % (urlencode(query))
     return url
+
+
+URL_PATH_TEMPLATES_CACHE_SIZE = 1024
+
+_LITERAL, _SIMPLE_FIELD, _FIELD = range(3)
+
+_formatter = string.Formatter()
+_url_path_templates = {}
+
+
+class UrlPathTemplate(object):
+    """
+    Url path format string (e.g. "/items/{item_id}/") parsed once, with its prefix and format suffix.
+
+    Rendering it is a single pass over the parsed pieces: known parameters are filled and unknown "{placeholders}" are
+    left intact.
+    """
+
+    def __init__(self, url_path_format, prefix=None, format_suffix=None):
+        self.url_path_format = url_path_format
+        self.prefix = prefix or ''
+        self.suffix = ensure_url_path_format_suffix_starts_with_dot(format_suffix)
+        self.pieces = []
+        for literal, field_name, format_spec, conversion in _formatter.parse(url_path_format):
+            if literal:
+                self.pieces.append((_LITERAL, literal, None, None))
+            if field_name is None:
+                continue
+            placeholder = "{%s%s%s}" % (
+                field_name, "!" + conversion if conversion else "", ":" + format_spec if format_spec else ""
+            )
+            root = re.split(r'[.\[]', field_name, 1)[0]
+            if not root or root.isdigit():
+                # positional fields are rendered by str.format, which raises the usual IndexError
+                self.pieces.append((_FIELD, placeholder, None, None))
+            elif root == field_name and not conversion and "{" not in format_spec:
+                self.pieces.append((_SIMPLE_FIELD, placeholder, root, format_spec))
+            else:
+                self.pieces.append((_FIELD, placeholder, root, None))
+
+        self.static_url_path = None
+        if all(kind == _LITERAL for kind, _, _, _ in self.pieces):
+            self.static_url_path = ensure_url_path_starts_with_slash(
+                self.prefix + ''.join(text for _, text, _, _ in self.pieces) + self.suffix
+            )
+
+    def render(self, params, allow_key_errors=True):
+        """
+        Generate the url path.
+
+        :param params: dict of url path parameters.
+        :param allow_key_errors: if False, raise KeyError when a parameter is missing.
+        :return: url path
+        """
+        if self.static_url_path is not None:
+            return self.static_url_path
+        parts = [self.prefix]
+        for kind, text, root, format_spec in self.pieces:
+            if kind == _LITERAL:
+                parts.append(text)
+            elif root is not None and root not in params:
+                if not allow_key_errors:
+                    raise KeyError(root)
+                parts.append(text)
+            elif kind == _SIMPLE_FIELD:
+                parts.append(format(params[root], format_spec))
+            else:
+                try:
+                    parts.append(_formatter.vformat(text, (), params))
+                except KeyError:
+                    if not allow_key_errors:
+                        raise
+                    parts.append(text)
+        parts.append(self.suffix)
+        return ensure_url_path_starts_with_slash(''.join(parts))
+
+
+def compile_url_path(url_path_format, prefix=None, format_suffix=None):
+    """
+    Get the parsed url path template, from cache if it was already compiled.
+
+    :return: UrlPathTemplate
+    """
+    key = (url_path_format, prefix, format_suffix)
+    template = _url_path_templates.get(key)
+    if template is None:
+        if len(_url_path_templates) >= URL_PATH_TEMPLATES_CACHE_SIZE:
+            _url_path_templates.clear()
+        # concurrent compilations of the same template are harmless: the last one is kept
+        template = _url_path_templates[key] = UrlPathTemplate(url_path_format, prefix, format_suffix)
+    return template
@@ -7,7 +7,7 @@ def read_file(filepath):
     return open(filepath, 'r', encoding='utf-8').read()
 
 
-EXCLUDE_FROM_PACKAGES = []
+EXCLUDE_FROM_PACKAGES = ['benchmarks', 'benchmarks.*']
 
 
 setup(
@@ -0,0 +1,14 @@
+"""
+Coroutines used by the tests of the asyncio transport. The module is only imported on python 3.5 or +, where the
+async syntax is available.
+"""
+
+
+async def collect(async_iterable):
+    """
+    :return: list of the values of an async iterable.
+    """
+    values = []
+    async for value in async_iterable:
+        values.append(value)
+    return values
@@ -0,0 +1,229 @@
+"""
+Local HTTP server for testing purposes.
+
+Every response is a JSON document echoing the request (method, path, query, headers and body), unless the path asks
+for something else:
+
+- /status/<code>: respond with the given status code.
+- /delay/<seconds>: wait before responding.
+- /cookie/<name>/<value>: set a cookie.
+- /redirect/<n>: redirect n times before reaching /.
+- /gzip: gzip encoded response.
+- /chunked: chunked transfer encoded response.
+- /bytes/<n>: respond with n bytes.
+
+LocalProxy is an http proxy forwarding requests and opening CONNECT tunnels.
+"""
+import gzip
+import io
+import json
+import select
+import socket
+import threading
+import time
+
+try:
+    from http.server import HTTPServer, BaseHTTPRequestHandler
+    from socketserver import ThreadingMixIn
+except ImportError:
+    from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+    from SocketServer import ThreadingMixIn
+
+from urllib3 import PoolManager
+
+from sdklib.compat import urlsplit
+
+
+class LocalRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # headers and body are written separately: do not wait for the ack of the headers to send the body
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _send(self, status, body, headers=None):
+        self.send_response(status)
+        headers = headers or {}
+        headers.setdefault("Content-Type", "application/json")
+        for name, value in headers.items():
+            self.send_header(name, value)
+        if status not in (204, 304) and self.command != "HEAD":
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if status not in (204, 304) and self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _echo(self):
+        _, _, path, query, _ = urlsplit(self.path)
+        body = self._read_body()
+        self.server.requests.append((self.command, self.path, dict(self.headers.items()), body))
+        return json.dumps({
+            "method": self.command,
+            "path": path,
+            "query": query,
+            "headers": dict(self.headers.items()),
+            "body": body.decode("latin-1")
+        }).encode()
+
+    def _handle(self):
+        echo = self._echo()
+        parts = [p for p in urlsplit(self.path)[2].split("/") if p]
+        route = parts[0] if parts else ""
+        handler = self.server.routes.get(route)
+        if handler is not None:
+            return handler(self, parts[1:], echo)
+        if route == "status":
+            self._send(int(parts[1]), echo)
+        elif route == "delay":
+            time.sleep(float(parts[1]))
+            self._send(200, echo)
+        elif route == "cookie":
+            self._send(200, echo, {"Set-Cookie": "%s=%s" % (parts[1], parts[2])})
+        elif route == "redirect":
+            n = int(parts[1])
+            self._send(302, b"", {"Location": "/redirect/%s" % (n - 1) if n > 1 else "/"})
+        elif route == "gzip":
+            out = io.BytesIO()
+            with gzip.GzipFile(fileobj=out, mode="wb") as f:
+                f.write(echo)
+            self._send(200, out.getvalue(), {"Content-Encoding": "gzip"})
+        elif route == "chunked":
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for i in range(0, len(echo), 10):
+                chunk = echo[i:i + 10]
+                self.wfile.write(("%x\r\n" % len(chunk)).encode() + chunk + b"\r\n")
+            self.wfile.write(b"0\r\n\r\n")
+        elif route == "bytes":
+            self._send(200, b"x" * int(parts[1]), {"Content-Type": "application/octet-stream"})
+        else:
+            self._send(200, echo)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = do_HEAD = do_OPTIONS = _handle
+
+
+class ThreadingLocalServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class LocalServer(object):
+    """
+    Run a LocalRequestHandler server on a random port of localhost in a background thread.
+
+    Extra routes can be registered with ``routes``: a dict mapping the first path segment to a function
+    ``handler(request_handler, path_segments, echo_body)``.
+    """
+
+    def __init__(self, routes=None, ssl_context=None):
+        self.server = ThreadingLocalServer(("127.0.0.1", 0), LocalRequestHandler)
+        self.server.routes = routes or {}
+        self.server.requests = []
+        self.scheme = "http"
+        if ssl_context is not None:
+            self.server.socket = ssl_context.wrap_socket(self.server.socket, server_side=True)
+            self.scheme = "https"
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+
+    @property
+    def url(self):
+        return "%s://127.0.0.1:%s" % (self.scheme, self.server.server_address[1])
+
+    @property
+    def requests(self):
+        return self.server.requests
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class ProxyRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    hop_by_hop_headers = ("connection", "proxy-connection", "proxy-authorization", "keep-alive", "transfer-encoding")
+
+    def log_message(self, format, *args):
+        pass
+
+    def _authorize(self):
+        self.server.requests.append((self.command, self.path, dict(self.headers.items())))
+        if self.server.auth is None or self.headers.get("Proxy-Authorization") == self.server.auth:
+            return True
+        self.send_response(407)
+        self.send_header("Proxy-Authenticate", 'Basic realm="proxy"')
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+        return False
+
+    def do_CONNECT(self):
+        if not self._authorize():
+            return
+        host, _, port = self.path.rpartition(":")
+        upstream = socket.create_connection((host, int(port)))
+        self.send_response(200, "Connection established")
+        self.end_headers()
+        self.wfile.flush()
+        sockets = [self.connection, upstream]
+        try:
+            while True:
+                readable, _, _ = select.select(sockets, [], [], 10)
+                if not readable:
+                    break
+                for sock in readable:
+                    data = sock.recv(64 * 1024)
+                    if not data:
+                        return
+                    (upstream if sock is self.connection else self.connection).sendall(data)
+        finally:
+            upstream.close()
+            self.close_connection = True
+
+    def _forward(self):
+        if not self._authorize():
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else None
+        headers = dict((name, value) for name, value in self.headers.items()
+                       if name.lower() not in self.hop_by_hop_headers)
+        r = self.server.pool_manager.urlopen(
+            self.command, self.path, body=body, headers=headers, redirect=False, retries=False, decode_content=False
+        )
+        self.send_response(r.status)
+        for name, value in r.headers.items():
+            if name.lower() not in self.hop_by_hop_headers and name.lower() != "content-length":
+                self.send_header(name, value)
+        self.send_header("Content-Length", str(len(r.data)))
+        self.end_headers()
+        self.wfile.write(r.data)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = do_HEAD = _forward
+
+
+class LocalProxy(LocalServer):
+    """
+    Run an http proxy on a random port of localhost in a background thread.
+
+    :param auth: value of the Proxy-Authorization header required by the proxy. By default: None (no authentication).
+    """
+
+    def __init__(self, auth=None):
+        self.server = ThreadingLocalServer(("127.0.0.1", 0), ProxyRequestHandler)
+        self.server.auth = auth
+        self.server.pool_manager = PoolManager()
+        self.server.requests = []
+        self.scheme = "http"
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
@@ -0,0 +1,94 @@
+import threading
+import unittest
+
+from sdklib.http import HttpSdk, HttpRequestContext
+from sdklib.http.session import Cookie
+from tests.local_server import LocalServer
+
+
+class TestRequestMany(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = LocalServer().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.sdk = HttpSdk(host=self.server.url)
+
+    def test_request_many_in_order(self):
+        requests = [("GET", "/items/%s/" % i) for i in range(20)]
+        responses = self.sdk.request_many(requests, concurrency=5)
+        self.assertEqual(["/items/%s/" % i for i in range(20)], [r.json["path"] for r in responses])
+
+    def test_request_many_with_kwargs_and_contexts(self):
+        requests = [
+            ("POST", "/items/", {"body_params": {"name": "item"}}),
+            HttpRequestContext(host=self.server.url, url_path="/contexts/", method="PUT"),
+            ("GET", "/items/", {"query_params": {"page": 2}})
+        ]
+        responses = self.sdk.request_many(requests)
+        self.assertEqual("POST", responses[0].json["method"])
+        self.assertEqual("PUT", responses[1].json["method"])
+        self.assertEqual("page=2", responses[2].json["query"])
+
+    def test_request_many_captures_errors(self):
+        requests = [("GET", "/items/"), ("WRONG", "/items/"), ("GET", "/status/500")]
+        responses = self.sdk.request_many(requests)
+        self.assertEqual(200, responses[0].status)
+        self.assertTrue(isinstance(responses[1], Exception))
+        self.assertEqual(500, responses[2].status)
+
+    def test_iter_request_many_as_completed(self):
+        requests = [("GET", "/delay/0.3"), ("GET", "/items/")]
+        results = list(self.sdk.iter_request_many(requests, concurrency=2))
+        self.assertEqual([1, 0], [index for index, _ in results])
+
+    def test_iter_request_many_reads_requests_lazily(self):
+        read = []
+
+        def requests():
+            for i in range(100):
+                read.append(i)
+                yield ("GET", "/items/%s/" % i)
+
+        for ordered in (False, True):
+            del read[:]
+            results = self.sdk.iter_request_many(requests(), concurrency=4, ordered=ordered)
+            next(results)
+            self.assertTrue(len(read) <= 5, read)
+            self.assertEqual(99, len(list(results)))
+            self.assertEqual(100, len(read))
+
+    def test_iter_request_many_ordered(self):
+        requests = [("GET", "/delay/0.2"), ("GET", "/items/")] + [("GET", "/items/%s/" % i) for i in range(10)]
+        results = list(self.sdk.iter_request_many(requests, concurrency=3, ordered=True))
+        self.assertEqual(list(range(12)), [index for index, _ in results])
+        self.assertEqual("/items/9/", results[-1][1].json["path"])
+
+    def test_request_many_updates_cookie(self):
+        requests = [("GET", "/cookie/name%s/value%s" % (i, i)) for i in range(10)]
+        self.sdk.request_many(requests, concurrency=10)
+        for i in range(10):
+            self.assertEqual("value%s" % i, self.sdk.cookie.get("name%s" % i).value)
+
+
+class TestCookieThreadSafety(unittest.TestCase):
+
+    def test_concurrent_update(self):
+        cookie = Cookie()
+
+        def update(i):
+            for j in range(100):
+                cookie.update(Cookie({"Set-Cookie": "k%s_%s=v" % (i, j)}))
+                cookie.as_cookie_header_value()
+
+        threads = [threading.Thread(target=update, args=(i,)) for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(800, len(cookie.items()))
@@ -0,0 +1,234 @@
+import time
+import unittest
+
+from urllib3 import HTTPResponse
+
+from sdklib.http import HttpSdk, HttpCache
+from sdklib.http.cache import CacheEntry, parse_cache_control
+from sdklib.util.structures import CaseInsensitiveDict
+from tests.local_server import LocalServer
+
+
+def etag_route(request_handler, path_segments, echo):
+    etag = '"v1"'
+    if request_handler.headers.get("If-None-Match") == etag:
+        request_handler._send(304, b"", {"ETag": etag, "Cache-Control": "no-cache"})
+    else:
+        request_handler._send(200, echo, {"ETag": etag, "Cache-Control": "no-cache"})
+
+
+def max_age_route(request_handler, path_segments, echo):
+    request_handler._send(200, echo, {"Cache-Control": "max-age=%s" % path_segments[0]})
+
+
+def vary_route(request_handler, path_segments, echo):
+    request_handler._send(200, echo, {"Cache-Control": "max-age=60", "Vary": "Accept-Language"})
+
+
+def no_store_route(request_handler, path_segments, echo):
+    request_handler._send(200, echo, {"Cache-Control": "no-store"})
+
+
+def new_response(body=b"body", status=200, headers=None):
+    return HTTPResponse(body=body, headers=headers or {}, status=status, preload_content=False)
+
+
+class TestParseCacheControl(unittest.TestCase):
+
+    def test_parse(self):
+        self.assertEqual(
+            {"public": None, "max-age": "60", "no-cache": "Set-Cookie"},
+            parse_cache_control('public, Max-Age=60, no-cache="Set-Cookie"')
+        )
+
+    def test_parse_empty(self):
+        self.assertEqual({}, parse_cache_control(None))
+
+
+class TestCacheEntry(unittest.TestCase):
+
+    def new_entry(self, headers, stored_at=None):
+        return CacheEntry(200, "OK", headers, b"body", (), stored_at or time.time())
+
+    def test_max_age(self):
+        entry = self.new_entry({"Cache-Control": "max-age=60"})
+        self.assertEqual(60, entry.freshness_lifetime())
+        self.assertTrue(entry.is_fresh())
+        self.assertFalse(entry.is_fresh(now=time.time() + 61))
+
+    def test_age_header(self):
+        entry = self.new_entry({"Cache-Control": "max-age=60", "Age": "60"})
+        self.assertFalse(entry.is_fresh())
+
+    def test_expires(self):
+        entry = self.new_entry({"Date": "Sun, 06 Nov 1994 08:49:37 GMT", "Expires": "Sun, 06 Nov 1994 08:50:37 GMT"})
+        self.assertEqual(60, entry.freshness_lifetime())
+
+    def test_invalid_expires(self):
+        entry = self.new_entry({"Expires": "0"})
+        self.assertEqual(0, entry.freshness_lifetime())
+
+    def test_no_cache(self):
+        entry = self.new_entry({"Cache-Control": "no-cache, max-age=60"})
+        self.assertFalse(entry.is_fresh())
+
+    def test_request_cache_control(self):
+        entry = self.new_entry({"Cache-Control": "max-age=60"}, stored_at=time.time() - 10)
+        self.assertFalse(entry.is_fresh({"no-cache": None}))
+        self.assertFalse(entry.is_fresh({"max-age": "5"}))
+        self.assertTrue(entry.is_fresh({"max-age": "20"}))
+
+    def test_validation_headers(self):
+        entry = self.new_entry({"ETag": '"abc"', "Last-Modified": "Sun, 06 Nov 1994 08:49:37 GMT"})
+        self.assertEqual(
+            {"If-None-Match": '"abc"', "If-Modified-Since": "Sun, 06 Nov 1994 08:49:37 GMT"},
+            entry.validation_headers()
+        )
+
+
+class TestHttpCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = HttpCache()
+        self.headers = CaseInsensitiveDict()
+
+    def store(self, url, body=b"body", headers=None, method="GET"):
+        headers = headers if headers is not None else {"Cache-Control": "max-age=60"}
+        return self.cache.update(method, url, self.headers, new_response(body, headers=headers))
+
+    def test_hit(self):
+        self.store("http://localhost/a")
+        entry, fresh = self.cache.lookup("GET", "http://localhost/a", self.headers)
+        self.assertTrue(fresh)
+        self.assertEqual(b"body", entry.to_response().data)
+        self.assertEqual(1, self.cache.stats()["hits"])
+
+    def test_miss(self):
+        entry, fresh = self.cache.lookup("GET", "http://localhost/a", self.headers)
+        self.assertIsNone(entry)
+        self.assertEqual(1, self.cache.stats()["misses"])
+
+    def test_not_cacheable(self):
+        self.store("http://localhost/a", headers={"Cache-Control": "no-store"})
+        self.store("http://localhost/b", headers={})
+        self.store("http://localhost/c", method="POST")
+        self.assertEqual(0, len(self.cache))
+
+    def test_unsafe_method_invalidates(self):
+        self.store("http://localhost/a")
+        self.store("http://localhost/a", method="DELETE")
+        self.assertEqual(0, len(self.cache))
+
+    def test_evict_by_entries(self):
+        self.cache.max_entries = 2
+        for url in ("a", "b", "c"):
+            self.store(url)
+        self.cache.lookup("GET", "b", self.headers)
+        self.store("d")
+        self.assertEqual(2, len(self.cache))
+        self.assertEqual(2, self.cache.stats()["evictions"])
+        self.assertIsNotNone(self.cache.lookup("GET", "b", self.headers)[0])
+        self.assertIsNotNone(self.cache.lookup("GET", "d", self.headers)[0])
+
+    def test_evict_by_bytes(self):
+        self.cache.max_bytes = 2500
+        for url in ("a", "b", "c"):
+            self.store(url, body=b"x" * 1000)
+        self.assertEqual(2, len(self.cache))
+        self.assertTrue(self.cache.size <= 2500)
+        self.assertIsNone(self.cache.lookup("GET", "a", self.headers)[0])
+
+    def test_too_big_response_is_not_stored(self):
+        self.cache.max_bytes = 100
+        self.store("a", body=b"x" * 1000)
+        self.assertEqual(0, len(self.cache))
+
+    def test_vary(self):
+        self.headers["Accept-Language"] = "es"
+        self.store("a", body=b"es", headers={"Cache-Control": "max-age=60", "Vary": "Accept-Language"})
+        self.headers["Accept-Language"] = "en"
+        self.assertIsNone(self.cache.lookup("GET", "a", self.headers)[0])
+        self.store("a", body=b"en", headers={"Cache-Control": "max-age=60", "Vary": "Accept-Language"})
+        self.assertEqual(b"en", self.cache.lookup("GET", "a", self.headers)[0].body)
+        self.headers["Accept-Language"] = "es"
+        self.assertEqual(b"es", self.cache.lookup("GET", "a", self.headers)[0].body)
+        self.assertEqual(2, len(self.cache))
+
+    def test_clear(self):
+        self.store("a")
+        self.cache.clear()
+        self.assertEqual(0, len(self.cache))
+        self.assertEqual(0, self.cache.size)
+
+
+class CachedSdk(HttpSdk):
+    pass
+
+
+class TestHttpSdkCache(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = LocalServer(routes={
+            "etag": etag_route, "max-age": max_age_route, "vary": vary_route, "no-store": no_store_route
+        }).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.cache = HttpCache()
+        self.sdk = CachedSdk(host=self.server.url)
+        self.sdk.response_cache = self.cache
+        del self.server.requests[:]
+
+    def test_fresh_response_is_served_from_cache(self):
+        first = self.sdk.get("/max-age/60")
+        second = self.sdk.get("/max-age/60")
+        self.assertEqual(1, len(self.server.requests))
+        self.assertEqual(first.json, second.json)
+        self.assertEqual(200, second.status)
+        self.assertEqual(1, self.cache.hits)
+
+    def test_query_params_are_part_of_the_key(self):
+        self.sdk.get("/max-age/60", query_params={"page": 1})
+        response = self.sdk.get("/max-age/60", query_params={"page": 2})
+        self.assertEqual(2, len(self.server.requests))
+        self.assertEqual("page=2", response.json["query"])
+
+    def test_revalidation(self):
+        first = self.sdk.get("/etag/")
+        second = self.sdk.get("/etag/")
+        self.assertEqual(2, len(self.server.requests))
+        self.assertEqual('"v1"', self.server.requests[-1][2]["If-None-Match"])
+        self.assertEqual(200, second.status)
+        self.assertEqual(first.json, second.json)
+        self.assertEqual({"hits": 0, "misses": 1, "revalidations": 1}, dict(
+            (k, v) for k, v in self.cache.stats().items() if k in ("hits", "misses", "revalidations")
+        ))
+
+    def test_no_store(self):
+        self.sdk.get("/no-store/")
+        self.sdk.get("/no-store/")
+        self.assertEqual(2, len(self.server.requests))
+
+    def test_vary(self):
+        self.sdk.get("/vary/", headers={"Accept-Language": "es"})
+        response = self.sdk.get("/vary/", headers={"Accept-Language": "en"})
+        self.assertEqual("en", response.json["headers"]["Accept-Language"])
+        response = self.sdk.get("/vary/", headers={"Accept-Language": "es"})
+        self.assertEqual("es", response.json["headers"]["Accept-Language"])
+        self.assertEqual(2, len(self.server.requests))
+
+    def test_stream_is_not_cached(self):
+        self.sdk.get("/max-age/60", stream=True).close()
+        self.sdk.get("/max-age/60")
+        self.assertEqual(2, len(self.server.requests))
+
+    def test_per_request_cache(self):
+        sdk = HttpSdk(host=self.server.url)
+        sdk.get("/max-age/60", response_cache=self.cache)
+        sdk.get("/max-age/60", response_cache=self.cache)
+        sdk.get("/max-age/60")
+        self.assertEqual(2, len(self.server.requests))
@@ -0,0 +1,177 @@
+import time
+import unittest
+
+from urllib3.exceptions import ProtocolError
+
+from sdklib.compat import is_py35_or_newer
+from sdklib.http import HttpSdk, CircuitBreaker, CircuitBreakerOpenError, RateLimiter, RetryPolicy
+from sdklib.http.circuitbreaker import CLOSED, OPEN, HALF_OPEN
+from tests.local_server import LocalServer
+from tests.test_retry import get_free_port
+
+if is_py35_or_newer:
+    import asyncio
+    from sdklib.http.aio import AsyncHttpSdk
+
+
+class FakeResponse(object):
+
+    def __init__(self, status):
+        self.status = status
+
+
+class TestCircuit(unittest.TestCase):
+
+    def setUp(self):
+        self.events = []
+        self.breaker = CircuitBreaker(minimum_calls=4, window_size=4, open_duration=0.05, slow_call_duration=0.5)
+        self.breaker.add_listener(lambda circuit, old, new: self.events.append((circuit.name, old, new)))
+        self.circuit = self.breaker.get_circuit("http://localhost:80")
+
+    def call(self, failed=False, duration=0):
+        self.circuit.before_call()
+        self.circuit.record(duration, failed)
+
+    def test_closed_until_minimum_calls(self):
+        for _ in range(3):
+            self.call(failed=True)
+        self.assertEqual(CLOSED, self.circuit.state)
+        self.call(failed=True)
+        self.assertEqual(OPEN, self.circuit.state)
+        self.assertEqual([("http://localhost:80", CLOSED, OPEN)], self.events)
+
+    def test_failure_rate_threshold(self):
+        for failed in (False, False, True, False):
+            self.call(failed=failed)
+        self.assertEqual(CLOSED, self.circuit.state)
+        self.call(failed=True)
+        self.assertEqual(OPEN, self.circuit.state)
+
+    def test_slow_calls(self):
+        for _ in range(4):
+            self.call(duration=0.6)
+        self.assertEqual(OPEN, self.circuit.state)
+        self.assertEqual(4, self.circuit.stats()["slow_calls"])
+
+    def test_open_rejects_calls(self):
+        for _ in range(4):
+            self.call(failed=True)
+        self.assertRaises(CircuitBreakerOpenError, self.circuit.before_call)
+        self.assertEqual(1, self.circuit.stats()["rejected"])
+
+    def test_half_open_closes_after_success(self):
+        for _ in range(4):
+            self.call(failed=True)
+        time.sleep(0.06)
+        self.circuit.before_call()
+        self.assertEqual(HALF_OPEN, self.circuit.state)
+        self.assertRaises(CircuitBreakerOpenError, self.circuit.before_call)
+        self.circuit.record(0, False)
+        self.assertEqual(CLOSED, self.circuit.state)
+        self.assertEqual([OPEN, HALF_OPEN, CLOSED], [new for _, _, new in self.events])
+        self.assertEqual(0, self.circuit.stats()["failure_rate"])
+
+    def test_half_open_opens_after_failure(self):
+        for _ in range(4):
+            self.call(failed=True)
+        time.sleep(0.06)
+        self.call(failed=True)
+        self.assertEqual(OPEN, self.circuit.state)
+        self.assertRaises(CircuitBreakerOpenError, self.circuit.before_call)
+
+    def test_release(self):
+        for _ in range(4):
+            self.call(failed=True)
+        time.sleep(0.06)
+        self.circuit.before_call()
+        self.circuit.release()
+        self.circuit.before_call()
+
+    def test_circuits_by_host_and_endpoint(self):
+        self.assertIs(self.circuit, self.breaker.get_circuit("http://localhost:80", "/items/"))
+        self.assertIsNot(self.circuit, self.breaker.get_circuit("http://otherhost:80"))
+        breaker = CircuitBreaker(per_endpoint=True)
+        self.assertIsNot(breaker.get_circuit("http://localhost:80", "/a/"), breaker.get_circuit("http://localhost:80"))
+        self.assertEqual("http://localhost:80 /a/", breaker.get_circuit("http://localhost:80", "/a/").name)
+
+    def test_host_normalization(self):
+        self.assertIs(self.circuit, self.breaker.get_circuit("HTTP://LocalHost"))
+        self.assertEqual(["http://localhost:80"], list(self.breaker.stats().keys()))
+
+    def test_protect(self):
+        def fail():
+            raise ProtocolError("reset")
+
+        protected_fail = self.breaker.protect(fail, "http://localhost:80")
+        protected_error = self.breaker.protect(lambda: FakeResponse(503), "http://localhost:80")
+        self.assertRaises(ProtocolError, protected_fail)
+        self.assertRaises(ProtocolError, protected_fail)
+        self.assertEqual(503, protected_error().status)
+        self.assertEqual(503, protected_error().status)
+        self.assertRaises(CircuitBreakerOpenError, protected_error)
+        self.assertEqual(4, self.breaker.stats()["http://localhost:80"]["failures"])
+
+
+class TestHttpSdkCircuitBreaker(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = LocalServer().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.breaker = CircuitBreaker(minimum_calls=2, window_size=2, open_duration=60)
+
+    def test_open_on_status(self):
+        sdk = HttpSdk(host=self.server.url)
+        sdk.circuit_breaker = self.breaker
+        sdk.get("/status/500")
+        sdk.get("/status/503")
+        del self.server.requests[:]
+        self.assertRaises(CircuitBreakerOpenError, sdk.get, "/items/")
+        self.assertEqual(0, len(self.server.requests))
+
+    def test_open_on_connection_errors(self):
+        sdk = HttpSdk(host="http://127.0.0.1:%s" % get_free_port())
+        policy = RetryPolicy(max_attempts=5, backoff_factor=0, budget=None)
+        self.assertRaises(CircuitBreakerOpenError, sdk.get, "/", circuit_breaker=self.breaker, retry_policy=policy)
+        self.assertEqual(2, self.breaker.stats()[sdk.host]["failures"])
+
+    def test_rate_limit_waits_are_not_slow_calls(self):
+        breaker = CircuitBreaker(slow_call_rate_threshold=0.5, slow_call_duration=0.05, minimum_calls=2, window_size=2)
+        sdk = HttpSdk(host=self.server.url)
+        sdk.circuit_breaker = breaker
+        sdk.rate_limiter = RateLimiter(rate=10, capacity=1)
+        for _ in range(3):
+            sdk.get("/items/")
+        self.assertEqual(0, breaker.stats()[sdk.host]["slow_calls"])
+        self.assertEqual(CLOSED, breaker.get_circuit(sdk.host).state)
+
+    @unittest.skipIf(not is_py35_or_newer, "Only available for python 3.5 or +.")
+    def test_async_rate_limit_waits_are_not_slow_calls(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        breaker = CircuitBreaker(slow_call_rate_threshold=0.5, slow_call_duration=0.05, minimum_calls=2, window_size=2)
+        sdk = AsyncHttpSdk(host=self.server.url)
+        sdk.circuit_breaker = breaker
+        sdk.rate_limiter = RateLimiter(rate=10, capacity=1)
+        for _ in range(3):
+            loop.run_until_complete(sdk.get("/items/"))
+        self.assertEqual(0, breaker.stats()[sdk.host]["slow_calls"])
+        AsyncHttpSdk.close_async_pools()
+        loop.close()
+
+    @unittest.skipIf(not is_py35_or_newer, "Only available for python 3.5 or +.")
+    def test_async(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        sdk = AsyncHttpSdk(host=self.server.url)
+        sdk.circuit_breaker = self.breaker
+        loop.run_until_complete(sdk.get("/status/500"))
+        loop.run_until_complete(sdk.get("/status/500"))
+        self.assertRaises(CircuitBreakerOpenError, loop.run_until_complete, sdk.get("/items/"))
+        AsyncHttpSdk.close_async_pools()
+        loop.close()
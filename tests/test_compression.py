@@ -0,0 +1,181 @@
+import gzip
+import io
+import json
+import unittest
+import zlib
+from hashlib import sha1
+
+from sdklib.compat import is_py35_or_newer
+from sdklib.http import HttpSdk, HttpRequestContext, BodyCompression, RetryPolicy
+from sdklib.http.authorization import X11PathsAuthentication
+from sdklib.http.base import prepare_request_from_context
+from sdklib.http.compression import CompressedStream, iter_compressed
+from sdklib.http.renderers import CustomRenderer, MultiPartRenderer
+from tests.local_server import LocalServer
+
+if is_py35_or_newer:
+    import asyncio
+    from sdklib.http.aio import AsyncHttpSdk
+
+
+def read_chunked(rfile):
+    chunks = []
+    while True:
+        size = int(rfile.readline().split(b";")[0].strip(), 16)
+        if size == 0:
+            rfile.readline()
+            return b"".join(chunks)
+        chunks.append(rfile.read(size))
+        rfile.readline()
+
+
+def decompress_route(request_handler, path_segments, echo):
+    """
+    Respond with the decompressed request body and its Content-Encoding.
+    """
+    headers = request_handler.headers
+    if "chunked" in (headers.get("Transfer-Encoding") or ""):
+        body = read_chunked(request_handler.rfile)
+    else:
+        body = request_handler.server.requests[-1][3]
+    encoding = headers.get("Content-Encoding")
+    if encoding == "gzip":
+        body = gzip.GzipFile(fileobj=io.BytesIO(body)).read()
+    elif encoding == "deflate":
+        body = zlib.decompress(body)
+    request_handler._send(200, json.dumps({"encoding": encoding, "body": body.decode("utf-8")}).encode())
+
+
+class TestBodyCompression(unittest.TestCase):
+
+    def test_threshold(self):
+        compression = BodyCompression(min_size=10)
+        headers = {}
+        self.assertEqual(b"short", compression.compress(b"short", headers))
+        self.assertEqual({}, headers)
+        body = compression.compress(b"x" * 100, headers)
+        self.assertEqual(b"x" * 100, gzip.GzipFile(fileobj=io.BytesIO(body)).read())
+        self.assertEqual({"Content-Encoding": "gzip"}, headers)
+
+    def test_deflate(self):
+        headers = {"Content-Length": "100"}
+        body = BodyCompression(encoding="deflate", min_size=0).compress(b"x" * 100, headers)
+        self.assertEqual(b"x" * 100, zlib.decompress(body))
+        self.assertEqual({"Content-Encoding": "deflate"}, headers)
+
+    def test_unsupported_encoding(self):
+        self.assertRaises(ValueError, BodyCompression, encoding="br")
+
+    def test_content_types(self):
+        compression = BodyCompression(min_size=0, content_types=["application/json"])
+        self.assertEqual(b"{}", compression.compress(b"{}", {"Content-Type": "image/png"}))
+        headers = {"Content-Type": "application/json; charset=utf-8"}
+        compression.compress(b"{}", headers)
+        self.assertEqual("gzip", headers["Content-Encoding"])
+
+    def test_already_encoded(self):
+        headers = {"content-encoding": "br"}
+        self.assertEqual(b"x" * 2000, BodyCompression().compress(b"x" * 2000, headers))
+
+    def test_compressed_stream(self):
+        stream = CompressedStream(io.BytesIO(b"abc" * 100000), chunk_size=1024)
+        first = b"".join(stream)
+        self.assertEqual(b"abc" * 100000, gzip.GzipFile(fileobj=io.BytesIO(first)).read())
+        stream.seek(0)
+        self.assertEqual(first, stream.read())
+
+    def test_iter_compressed(self):
+        body = b"".join(iter_compressed(iter([b"abc"] * 1000), encoding="deflate"))
+        self.assertEqual(b"abc" * 1000, zlib.decompress(body))
+
+
+class TestPrepareCompressedRequest(unittest.TestCase):
+
+    def test_rendered_body_is_compressed(self):
+        context = HttpRequestContext(
+            method="POST", url_path="/items/", body_params={"a": "x" * 2000}, compression=BodyCompression()
+        )
+        new_context, _, body = prepare_request_from_context(context)
+        self.assertEqual({"a": "x" * 2000}, json.loads(zlib.decompress(body, 16 + zlib.MAX_WBITS).decode()))
+        self.assertIs(body, new_context.rendered_body)
+        self.assertEqual("gzip", new_context.headers["Content-Encoding"])
+
+    def test_body_hash_of_compressed_body(self):
+        context = HttpRequestContext(
+            method="POST", url_path="/items/", body_params={"a": "x" * 2000}, compression=BodyCompression(),
+            authentication_instances=[X11PathsAuthentication("app", "secret", utc="2016-01-01 00:00:00")]
+        )
+        new_context, _, body = prepare_request_from_context(context)
+        self.assertEqual(sha1(body).hexdigest(), new_context.headers["X-11paths-body-hash"])
+
+    def test_body_hash_of_compressed_stream(self):
+        context = HttpRequestContext(
+            method="POST", url_path="/items/", body_params=io.BytesIO(b'{"a": "' + b"x" * 2000 + b'"}'),
+            renderer=CustomRenderer("application/json"), compression=BodyCompression(),
+            authentication_instances=[X11PathsAuthentication("app", "secret", utc="2016-01-01 00:00:00")]
+        )
+        new_context, _, body = prepare_request_from_context(context)
+        self.assertIsInstance(body, CompressedStream)
+        self.assertEqual(sha1(body.read()).hexdigest(), new_context.headers["X-11paths-body-hash"])
+
+    def test_body_hash_of_compressed_generator(self):
+        context = HttpRequestContext(
+            method="POST", url_path="/items/", body_params=iter([b'{"a": 1}']),
+            renderer=CustomRenderer("application/json"), compression=BodyCompression(min_size=0),
+            authentication_instances=[X11PathsAuthentication("app", "secret", utc="2016-01-01 00:00:00")]
+        )
+        self.assertRaises(ValueError, prepare_request_from_context, context)
+
+    def test_streamed_body(self):
+        context = HttpRequestContext(
+            method="POST", url_path="/files/", files={"file": "tests/resources/file.pdf"},
+            renderer=MultiPartRenderer(stream=True), compression=BodyCompression()
+        )
+        new_context, _, body = prepare_request_from_context(context)
+        self.assertIsInstance(body, CompressedStream)
+        self.assertNotIn("Content-Length", new_context.headers)
+
+
+class TestHttpSdkCompression(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = LocalServer(routes={"decompress": decompress_route}).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.sdk = HttpSdk(host=self.server.url)
+        self.sdk.compression = BodyCompression(min_size=100)
+
+    def test_json_body(self):
+        response = self.sdk.post("/decompress/", body_params={"a": "x" * 1000})
+        self.assertEqual("gzip", response.json["encoding"])
+        self.assertEqual({"a": "x" * 1000}, json.loads(response.json["body"]))
+
+    def test_small_body_not_compressed(self):
+        response = self.sdk.post("/decompress/", body_params={"a": 1})
+        self.assertIsNone(response.json["encoding"])
+
+    def test_streamed_body_is_retried(self):
+        body = io.BytesIO(b"y" * 200000)
+        policy = RetryPolicy(max_attempts=2, backoff_factor=0, budget=None, status_codes=(200,))
+        response = self.sdk.post(
+            "/decompress/", body_params=body, renderer=CustomRenderer("application/octet-stream"),
+            retry_policy=policy
+        )
+        self.assertEqual("y" * 200000, response.json["body"])
+
+    @unittest.skipIf(not is_py35_or_newer, "Only available for python 3.5 or +.")
+    def test_async(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        sdk = AsyncHttpSdk(host=self.server.url)
+        sdk.compression = BodyCompression(encoding="deflate", min_size=100)
+        response = loop.run_until_complete(sdk.post("/decompress/", body_params={"a": "x" * 1000}))
+        self.assertEqual("deflate", response.json["encoding"])
+        self.assertEqual({"a": "x" * 1000}, json.loads(response.json["body"]))
+        AsyncHttpSdk.close_async_pools()
+        loop.close()
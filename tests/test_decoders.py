@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from sdklib.http.decoders import (
+    parse_content_type, get_decoder, register_decoder, unregister_decoder, decode_body, decode_json, decode_xml,
+    decode_ndjson, decode_csv, decode_msgpack
+)
+from sdklib.http.response import Response
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+XML_BODY = b'<?xml version="1.0" encoding="UTF-8"?><items><item>1</item><item>2</item></items>'
+XHTML_BODY = b"<html><body><p>paragraph</p></body></html>"
+
+
+class TestDecoders(unittest.TestCase):
+
+    def test_parse_content_type(self):
+        self.assertEqual(("application/json", None), parse_content_type("application/json"))
+        self.assertEqual(("text/html", "ISO-8859-1"), parse_content_type('Text/HTML; charset="ISO-8859-1"'))
+        self.assertEqual(("text/csv", "utf-8"), parse_content_type("text/csv;header=present;charset=utf-8"))
+
+    def test_get_decoder(self):
+        self.assertIs(decode_json, get_decoder("application/json"))
+        self.assertIs(decode_json, get_decoder("application/problem+json"))
+        self.assertIs(decode_xml, get_decoder("text/xml"))
+        self.assertIs(decode_xml, get_decoder("application/atom+xml"))
+        self.assertIsNone(get_decoder("text/html"))
+
+    def test_get_decoder_top_level_type(self):
+        decoder = lambda body, charset: "image"
+        register_decoder("image/*", decoder)
+        try:
+            self.assertIs(decoder, get_decoder("image/png"))
+        finally:
+            unregister_decoder("image/*")
+        self.assertIsNone(get_decoder("image/png"))
+
+    def test_decode_json(self):
+        self.assertEqual({"a": 1}, decode_body(b'{"a": 1}', "application/json; charset=utf-8"))
+        self.assertEqual({"a": 1}, decode_body(b'{"a": 1}', "application/vnd.api+json"))
+        self.assertEqual({"a": u"ñ"}, decode_body(u'{"a": "ñ"}'.encode("utf-16"), "application/json; charset=utf-16"))
+
+    def test_decode_xml(self):
+        self.assertEqual(["1", "2"], decode_body(XML_BODY, "application/xml")["items"]["item"])
+
+    def test_no_trial_parsing_of_other_types(self):
+        self.assertEqual(XHTML_BODY.decode(), decode_body(XHTML_BODY, "text/html"))
+        self.assertEqual(u"café", decode_body(u"café".encode("latin-1"), "text/plain; charset=latin-1"))
+        self.assertEqual(b"\xff\xfe\x00", decode_body(b"\xff\xfe\x00", "application/octet-stream"))
+
+    def test_invalid_body(self):
+        self.assertEqual("not json", decode_body(b"not json", "application/json"))
+
+    def test_no_content_type(self):
+        self.assertEqual({"a": 1}, decode_body(b'{"a": 1}', None, trial=True))
+        self.assertEqual(["1", "2"], decode_body(XML_BODY, None, trial=True)["items"]["item"])
+        self.assertEqual("text", decode_body(b"text", None, trial=True))
+        self.assertEqual('{"a": 1}', decode_body(b'{"a": 1}', None))
+
+    def test_decode_ndjson(self):
+        self.assertEqual([{"a": 1}, {"a": 2}], decode_ndjson(b'{"a": 1}\n\n{"a": 2}\n'))
+
+    def test_decode_csv(self):
+        self.assertEqual([{"id": "1", "name": "one"}, {"id": "2", "name": "two"}],
+                         decode_csv(b"id,name\r\n1,one\r\n2,two\r\n"))
+
+    @unittest.skipIf(msgpack is None, "msgpack is not installed.")
+    def test_decode_msgpack(self):
+        self.assertEqual({"a": [1, 2]}, decode_msgpack(msgpack.packb({"a": [1, 2]})))
+
+
+class TestResponseData(unittest.TestCase):
+
+    def tearDown(self):
+        unregister_decoder("text/csv")
+
+    def test_dispatch_on_content_type(self):
+        response = Response(headers={"content-type": "application/json"}, body=b'{"a": 1}')
+        self.assertEqual({"a": 1}, response.data)
+        response = Response(headers={"Content-Type": "text/html"}, body=XHTML_BODY)
+        self.assertEqual(XHTML_BODY.decode(), response.data)
+
+    def test_registered_decoder(self):
+        register_decoder("text/csv", decode_csv)
+        response = Response(headers={"Content-Type": "text/csv; charset=utf-8"}, body=b"id\n1\n")
+        self.assertEqual([{"id": "1"}], response.data)
+
+    def test_trial_parsing(self):
+        self.assertEqual('{"a": 1}', Response(body=b'{"a": 1}').data)
+        response = Response(body=b'{"a": 1}')
+        response.trial_parsing = True
+        self.assertEqual({"a": 1}, response.data)
+        response = Response(headers={"Content-Type": "text/plain"}, body=b'{"a": 1}')
+        response.trial_parsing = True
+        self.assertEqual('{"a": 1}', response.data)
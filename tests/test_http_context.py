@@ -1,6 +1,11 @@
+import json
 import unittest
 
 from sdklib.http import HttpRequestContextSingleton, HttpRequestContext
+from sdklib.http.base import prepare_request_from_context
+from sdklib.http.authorization import BasicAuthentication
+from sdklib.http.renderers import MultiPartRenderer, FormRenderer, default_renderer
+from sdklib.http.response import HttpResponse
 
 
 class TestHttpContext(unittest.TestCase):
@@ -86,3 +91,121 @@ class TestHttpContext(unittest.TestCase):
         ctxt = HttpRequestContext()
         ctxt.headers = None
         self.assertEqual({}, ctxt.headers)
+
+    def test_http_context_copy_shares_data(self):
+        items = [1, 2]
+        ctxt = HttpRequestContext(body_params={"items": items}, files={"file": ("file.txt", b"data")})
+        new_ctxt = ctxt.copy()
+        self.assertIs(items, new_ctxt.body_params["items"])
+        self.assertIs(ctxt.files, new_ctxt.files)
+        self.assertIs(ctxt.renderer, new_ctxt.renderer)
+
+    def test_http_context_copy_params(self):
+        ctxt = HttpRequestContext(
+            query_params={"page": 1}, body_params=[("name", "value")], url_path_params={"id": 1}
+        )
+        new_ctxt = ctxt.copy()
+        new_ctxt.query_params["access_token"] = "token"
+        new_ctxt.body_params.append(("signature", "abc"))
+        new_ctxt.url_path_params["id"] = 2
+        self.assertEqual({"page": 1}, ctxt.query_params)
+        self.assertEqual([("name", "value")], ctxt.body_params)
+        self.assertEqual({"id": 1}, ctxt.url_path_params)
+        self.assertEqual({"page": 1, "access_token": "token"}, new_ctxt.query_params)
+
+    def test_http_context_copy_headers(self):
+        ctxt = HttpRequestContext(headers={"Accept": "*/*"})
+        new_ctxt = ctxt.copy()
+        new_ctxt.headers["Authorization"] = "Basic token"
+        new_ctxt.url_path = "/new/"
+        self.assertEqual({"Accept": "*/*"}, ctxt.headers)
+        self.assertEqual("/", ctxt.url_path)
+        self.assertEqual("*/*", new_ctxt.headers["accept"])
+
+    def test_prepare_request_from_context_does_not_modify_context(self):
+        ctxt = HttpRequestContext(
+            host="http://localhost", url_path="/items/{id}/", url_path_params={"id": 1},
+            headers={"Accept": "*/*"}, body_params={"name": "value"},
+            authentication_instances=[BasicAuthentication("user", "password")]
+        )
+        new_ctxt, url, body = prepare_request_from_context(ctxt)
+        self.assertEqual("http://localhost/items/1/", url)
+        self.assertEqual({"name": "value"}, json.loads(body.decode()))
+        self.assertIn("Authorization", new_ctxt.headers)
+        self.assertEqual({"Accept": "*/*"}, ctxt.headers)
+        self.assertEqual("/items/{id}/", ctxt.url_path)
+
+    def test_http_context_slots(self):
+        ctxt = HttpRequestContext()
+        self.assertFalse(hasattr(ctxt, "__dict__"))
+        self.assertRaises(AttributeError, setattr, ctxt, "unknown_field", 1)
+
+    def test_http_context_lazy_defaults(self):
+        ctxt = HttpRequestContext()
+        ctxt.authentication_instances.append(BasicAuthentication("user", "password"))
+        ctxt.headers["Accept"] = "*/*"
+        ctxt.url_path_params["id"] = 1
+        ctxt.cookie.load_from_headers({"Set-Cookie": "name=value"})
+        self.assertEqual(1, len(ctxt.authentication_instances))
+        self.assertEqual({"Accept": "*/*"}, ctxt.headers)
+        self.assertEqual({"id": 1}, ctxt.url_path_params)
+        self.assertEqual("name=value", ctxt.cookie.as_cookie_header_value())
+
+    def test_http_context_defaults(self):
+        ctxt = HttpRequestContext(method="post", redirect="yes", stream=True, update_content_type=None)
+        self.assertEqual("POST", ctxt.method)
+        self.assertEqual("/", ctxt.url_path)
+        self.assertFalse(ctxt.redirect)
+        self.assertTrue(ctxt.stream)
+        self.assertTrue(ctxt.update_content_type)
+        self.assertIs(HttpResponse, ctxt.response_class)
+        self.assertIs(default_renderer, ctxt.renderer)
+        self.assertIsNone(ctxt.rendered_body)
+
+    def test_http_context_files_and_renderer(self):
+        ctxt = HttpRequestContext()
+        ctxt.files = {"file": "tests/resources/file.pdf"}
+        self.assertIs(default_renderer, ctxt.renderer)
+        ctxt.renderer = None
+        self.assertIsInstance(ctxt.renderer, MultiPartRenderer)
+        ctxt.clear()
+        self.assertIsNone(ctxt.files)
+        self.assertIs(default_renderer, ctxt.renderer)
+
+    def test_http_context_copy_all_fields(self):
+        ctxt = HttpRequestContext(host="http://localhost", headers={"Accept": "*/*"}, timeout=3)
+        ctxt.fields_to_clear = ["proxy"]
+        new_ctxt = ctxt.copy()
+        for name in HttpRequestContext.__slots__:
+            if name != "_headers":
+                self.assertIs(getattr(ctxt, name), getattr(new_ctxt, name), name)
+        self.assertEqual(ctxt.headers, new_ctxt.headers)
+        self.assertIsNot(ctxt.headers, new_ctxt.headers)
+
+    def test_http_context_replace(self):
+        ctxt = HttpRequestContext(host="http://localhost", url_path="/items/", headers={"Accept": "*/*"})
+        new_ctxt = ctxt.replace(method="post", body_params={"name": "value"}, renderer=FormRenderer())
+        self.assertEqual("POST", new_ctxt.method)
+        self.assertEqual({"name": "value"}, new_ctxt.body_params)
+        self.assertIsInstance(new_ctxt.renderer, FormRenderer)
+        self.assertEqual("/items/", new_ctxt.url_path)
+        self.assertEqual({"Accept": "*/*"}, new_ctxt.headers)
+        self.assertEqual("GET", ctxt.method)
+        self.assertIsNone(ctxt.body_params)
+
+    def test_http_context_replace_files(self):
+        ctxt = HttpRequestContext(method="POST")
+        new_ctxt = ctxt.replace(files={"file": "tests/resources/file.pdf"})
+        self.assertIsInstance(new_ctxt.renderer, MultiPartRenderer)
+        self.assertIs(default_renderer, ctxt.renderer)
+
+    def test_http_context_subclass_copy(self):
+        class MyContext(HttpRequestContext):
+            pass
+
+        ctxt = MyContext(host="http://localhost")
+        ctxt.extra = "value"
+        new_ctxt = ctxt.copy()
+        self.assertIsInstance(new_ctxt, MyContext)
+        self.assertEqual("value", new_ctxt.extra)
+        self.assertEqual("http://localhost", new_ctxt.host)
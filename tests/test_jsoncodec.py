@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+
+import json
+import math
+import unittest
+
+from sdklib.http.jsoncodec import (
+    JsonCodec, StdlibJsonCodec, JSON_CODECS, find_json_codec, get_json_codec, set_json_codec
+)
+from sdklib.http.renderers import JSONRenderer
+from sdklib.http.response import Response
+
+
+def installed(name):
+    try:
+        JSON_CODECS[name]()
+        return True
+    except ImportError:
+        return False
+
+
+class UpperCaseCodec(JsonCodec):
+    name = "upper"
+
+    def dumps(self, obj):
+        return json.dumps(obj).upper().encode()
+
+    def loads(self, data):
+        return {"parsed": json.loads(data)}
+
+
+class TestJsonCodec(unittest.TestCase):
+
+    def tearDown(self):
+        set_json_codec(None)
+
+    def test_stdlib_codec_is_byte_identical(self):
+        data = {"name": u"ñandú", "items": [1, 2.5, None, True], "nested": {"a": "/b"}}
+        self.assertEqual(json.dumps(data).encode(), StdlibJsonCodec().dumps(data))
+
+    def test_stdlib_codec_loads_bytes_and_str(self):
+        codec = StdlibJsonCodec()
+        self.assertEqual({"a": u"ñ"}, codec.loads(u'{"a": "ñ"}'.encode("utf-8")))
+        self.assertEqual({"a": 1}, codec.loads('{"a": 1}'))
+        self.assertRaises(ValueError, codec.loads, b"<xml/>")
+
+    def test_default_json_codec(self):
+        self.assertIsInstance(get_json_codec(), StdlibJsonCodec)
+        set_json_codec(UpperCaseCodec())
+        set_json_codec(None)
+        self.assertIsInstance(get_json_codec(), StdlibJsonCodec)
+
+    def test_find_json_codec(self):
+        codec = find_json_codec()
+        self.assertIsInstance(codec, JsonCodec)
+        first_installed = [name for name in JSON_CODECS if installed(name)][0]
+        self.assertEqual(first_installed, codec.name)
+
+    def test_set_json_codec_by_name(self):
+        codec = set_json_codec("json")
+        self.assertIsInstance(codec, StdlibJsonCodec)
+        self.assertIs(codec, get_json_codec())
+
+    def test_set_json_codec_unknown(self):
+        self.assertRaises(ValueError, set_json_codec, "unknown")
+
+    def test_set_json_codec_used_by_renderer_and_response(self):
+        set_json_codec(UpperCaseCodec())
+        body, content_type = JSONRenderer().encode_params({"name": "value"})
+        self.assertEqual(b'{"NAME": "VALUE"}', body)
+        response = Response(headers={"Content-Type": "application/json"}, body=b'{"name": "value"}')
+        self.assertEqual({"parsed": {"name": "value"}}, response.json)
+        self.assertEqual({"parsed": {"name": "value"}}, response.data)
+
+    def test_renderer_codec(self):
+        body, _ = JSONRenderer(codec=UpperCaseCodec()).encode_params([("name", "value")])
+        self.assertEqual(b'{"NAME": "VALUE"}', body)
+
+    def test_renderer_empty_dict(self):
+        self.assertEqual(b"{}", JSONRenderer(codec=StdlibJsonCodec()).encode_params({})[0])
+
+    def test_response_invalid_json(self):
+        self.assertEqual({}, Response(body=b"not json").json)
+        self.assertEqual("not json", Response(body=b"not json").data)
+
+
+@unittest.skipIf(not any(installed(name) for name in ("orjson", "ujson", "rapidjson")), "No fast JSON backend.")
+class TestFastJsonCodecs(unittest.TestCase):
+
+    def codecs(self):
+        return [JSON_CODECS[name]() for name in ("orjson", "ujson", "rapidjson") if installed(name)]
+
+    def test_round_trip(self):
+        data = {"name": u"ñandú", "items": [1, 2.5, None, True], "nested": {"a": "/b"}}
+        for codec in self.codecs():
+            self.assertEqual(data, json.loads(codec.dumps(data).decode("utf-8")), codec.name)
+            self.assertEqual(data, codec.loads(json.dumps(data).encode()), codec.name)
+
+    def test_unsupported_documents_fall_back_to_stdlib(self):
+        for codec in self.codecs():
+            self.assertEqual({"1": 2 ** 70}, json.loads(codec.dumps({1: 2 ** 70}).decode("utf-8")), codec.name)
+
+    def test_non_finite_floats(self):
+        for codec in self.codecs():
+            data = json.loads(codec.dumps({"a": float("nan"), "b": [float("inf")]}).decode("utf-8"))
+            if codec.name == "orjson":
+                self.assertEqual({"a": None, "b": [None]}, data)
+            else:
+                self.assertTrue(math.isnan(data["a"]), codec.name)
+                self.assertEqual([float("inf")], data["b"], codec.name)
+
+    def test_invalid_documents(self):
+        for codec in self.codecs():
+            self.assertRaises(ValueError, codec.loads, b"<xml/>")
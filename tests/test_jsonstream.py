@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+import json
+import unittest
+
+from sdklib.http import HttpSdk
+from sdklib.http.jsonstream import iter_json_items
+from tests.local_server import LocalServer
+
+
+ITEMS = [{"id": i, "name": u"item \"%d\" ñ ]}" % i, "tags": [i, 1.5, None, False]} for i in range(100)] + [7, "str", [], {}]
+DOCUMENT = {
+    "meta": {"skipped": ["a\\\"]}", {"nested": [1, {"b": "}"}]}], "count": 104}, "flag": True, "empty": None,
+    "data": {"items": ITEMS, "after": [1, 2]}
+}
+
+
+def split(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def items_route(request_handler, path_segments, echo):
+    request_handler._send(200, json.dumps(DOCUMENT).encode())
+
+
+class TestIterJsonItems(unittest.TestCase):
+
+    def test_chunk_sizes(self):
+        for indent in (None, 2):
+            body = json.dumps(DOCUMENT, indent=indent, ensure_ascii=False).encode("utf-8")
+            for size in (1, 2, 3, 7, 64, len(body)):
+                self.assertEqual(ITEMS, list(iter_json_items(split(body, size), "data.items")), (indent, size))
+
+    def test_top_level_array(self):
+        body = json.dumps(ITEMS).encode()
+        self.assertEqual(ITEMS, list(iter_json_items(split(body, 5))))
+        self.assertEqual([1, 2], list(iter_json_items([b" [ 1 , 2 ] "])))
+        self.assertEqual([], list(iter_json_items([b"[]"])))
+
+    def test_skipped_values(self):
+        body = json.dumps(DOCUMENT).encode()
+        self.assertEqual(DOCUMENT["meta"]["skipped"], list(iter_json_items(split(body, 3), "meta.skipped")))
+
+    def test_missing_or_null(self):
+        body = json.dumps(DOCUMENT).encode()
+        self.assertEqual([], list(iter_json_items([body], "data.missing")))
+        self.assertEqual([], list(iter_json_items([body], "empty")))
+        self.assertEqual([], list(iter_json_items([b""])))
+
+    def test_not_an_array(self):
+        self.assertRaises(ValueError, list, iter_json_items([b'{"a": 1}'], "a"))
+
+    def test_invalid_document(self):
+        for body in (b"[1, 2", b"[1 2]", b'{"a": [1,'):
+            self.assertRaises(ValueError, list, iter_json_items(split(body, 2), "a" if body.startswith(b"{") else None))
+
+    def test_lazy(self):
+        chunks = iter([b'[{"id": 1}, ', b'{"id": 2}, '])
+        items = iter_json_items(chunks)
+        self.assertEqual({"id": 1}, next(items))
+        self.assertEqual({"id": 2}, next(items))
+        self.assertRaises(ValueError, next, items)
+
+
+class TestResponseIterJsonItems(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = LocalServer(routes={"document": items_route}).start()
+        cls.sdk = HttpSdk(host=cls.server.url)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def test_streamed_response(self):
+        with self.sdk.get("/document/", stream=True) as response:
+            self.assertEqual(ITEMS, list(response.iter_json_items("data.items", chunk_size=100)))
+
+    def test_response(self):
+        response = self.sdk.get("/document/")
+        self.assertEqual(ITEMS, list(response.iter_json_items("data.items")))
+        self.assertEqual(ITEMS, response.json["data"]["items"])
@@ -0,0 +1,52 @@
+import logging
+import unittest
+
+import sdklib.http  # noqa: F401 (sdklib.util.logger is imported by sdklib.http)
+from sdklib.util import logger as sdk_logger
+from sdklib.util.logger import configure_logging, log_print_request, log_print_response, should_log_request
+
+
+class Unprintable(object):
+
+    def __str__(self):
+        raise AssertionError("formatted while debug logs are disabled")
+
+
+class TestLogger(unittest.TestCase):
+
+    def setUp(self):
+        self.level = sdk_logger.logger.level
+
+    def tearDown(self):
+        sdk_logger.logger.setLevel(self.level)
+        configure_logging()
+
+    def test_not_formatted_when_debug_is_disabled(self):
+        sdk_logger.logger.setLevel(logging.INFO)
+        log_print_request("GET", Unprintable(), Unprintable(), {"Accept": "*/*"}, Unprintable())
+        log_print_response(200, Unprintable(), {"Content-Type": "text/plain"})
+        self.assertFalse(should_log_request())
+
+    def test_request_and_response_messages(self):
+        with self.assertLogs("sdklib.util.logger", "DEBUG") as cm:
+            log_print_request("POST", "http://localhost/items/", {"a": 1}, {"Content-Type": "application/json"},
+                              b'{"b": 2}')
+            log_print_response(201, None, {"Content-Type": "application/json"})
+        self.assertIn("\t> Method: POST\n", cm.output[0])
+        self.assertIn("\t> Url: http://localhost/items/\n", cm.output[0])
+        self.assertIn('"b": 2', cm.output[0])
+        self.assertIn("\t< Response code: 201\n", cm.output[1])
+        self.assertIn("Payload not downloaded yet (stream)", cm.output[1])
+
+    def test_body_truncated(self):
+        configure_logging(body_max_length=10)
+        with self.assertLogs("sdklib.util.logger", "DEBUG") as cm:
+            log_print_response(200, "x" * 25, {"Content-Type": "text/plain"})
+        self.assertIn("xxxxxxxxxx... (15 more)", cm.output[0])
+        self.assertNotIn("x" * 11, cm.output[0])
+
+    def test_sample_rate(self):
+        sdk_logger.logger.setLevel(logging.DEBUG)
+        self.assertTrue(should_log_request())
+        configure_logging(sample_rate=0)
+        self.assertFalse(any(should_log_request() for _ in range(100)))
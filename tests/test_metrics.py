@@ -0,0 +1,138 @@
+import threading
+import unittest
+
+from sdklib.compat import is_py35_or_newer
+from sdklib.http import HttpSdk, MetricsRegistry, RetryPolicy
+from sdklib.http.metrics import Histogram
+from sdklib.http.renderers import JSONRenderer
+from tests.local_server import LocalServer
+from tests.test_retry import get_free_port
+
+if is_py35_or_newer:
+    import asyncio
+    from sdklib.http.aio import AsyncHttpSdk
+
+
+class TestHistogram(unittest.TestCase):
+
+    def test_observe(self):
+        histogram = Histogram(buckets=(0.1, 1))
+        for value in (0.05, 0.1, 0.5, 3):
+            histogram.observe(value)
+        self.assertEqual([(0.1, 2), (1, 3), (float("inf"), 4)], histogram.cumulative_counts())
+        self.assertEqual(4, histogram.count)
+        self.assertAlmostEqual(3.65, histogram.sum)
+
+    def test_merge(self):
+        histogram1, histogram2 = Histogram(buckets=(1,)), Histogram(buckets=(1,))
+        histogram1.observe(0.5)
+        histogram2.observe(2)
+        histogram1.merge(histogram2)
+        self.assertEqual([(1, 1), (float("inf"), 2)], histogram1.cumulative_counts())
+        self.assertRaises(ValueError, histogram1.merge, Histogram(buckets=(2,)))
+
+
+class TestMetricsRegistry(unittest.TestCase):
+
+    key = ("http://localhost:80", "GET", "/items/{id}/")
+
+    def test_record(self):
+        registry = MetricsRegistry(buckets=(0.1, 1))
+        registry.record(*self.key, status=200, duration=0.05, bytes_received=10)
+        registry.record(*self.key, status=503, duration=0.5, bytes_received=5)
+        registry.record(*self.key, status=None, duration=2)
+        snapshot = registry.snapshot()[self.key]
+        self.assertEqual(3, snapshot["requests"])
+        self.assertEqual({"2xx": 1, "5xx": 1, "error": 1}, snapshot["responses"])
+        self.assertEqual(15, snapshot["bytes_received"])
+        self.assertEqual([(0.1, 1), (1, 2), (float("inf"), 3)], snapshot["latency"]["buckets"])
+
+    def test_threads_are_merged(self):
+        registry = MetricsRegistry()
+
+        def record():
+            for _ in range(100):
+                registry.record(*self.key, status=200, duration=0.01)
+
+        threads = [threading.Thread(target=record) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        registry.record(*self.key, status=200, duration=0.01)
+        self.assertTrue(registry.snapshot()[self.key]["requests"] >= 1)
+        for thread in threads:
+            thread.join()
+        self.assertEqual(401, registry.snapshot()[self.key]["requests"])
+        self.assertEqual(401, registry.snapshot()[self.key]["latency"]["count"])
+
+    def test_to_prometheus(self):
+        registry = MetricsRegistry(buckets=(0.1,))
+        registry.record(*self.key, status=200, duration=0.05, bytes_sent=3, bytes_received=10)
+        text = registry.to_prometheus()
+        labels = 'host="http://localhost:80",method="GET",url_template="/items/{id}/"'
+        self.assertIn("# TYPE sdklib_http_client_requests_total counter\n", text)
+        self.assertIn('sdklib_http_client_requests_total{%s,status_class="2xx"} 1\n' % labels, text)
+        self.assertIn("sdklib_http_client_request_bytes_total{%s} 3\n" % labels, text)
+        self.assertIn("sdklib_http_client_response_bytes_total{%s} 10\n" % labels, text)
+        self.assertIn('sdklib_http_client_request_duration_seconds_bucket{%s,le="0.1"} 1\n' % labels, text)
+        self.assertIn('sdklib_http_client_request_duration_seconds_bucket{%s,le="+Inf"} 1\n' % labels, text)
+        self.assertIn("sdklib_http_client_request_duration_seconds_count{%s} 1\n" % labels, text)
+
+    def test_reset(self):
+        registry = MetricsRegistry()
+        registry.record(*self.key, status=200, duration=0.01)
+        registry.reset()
+        self.assertEqual({}, registry.snapshot())
+
+
+class TestHttpSdkMetrics(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = LocalServer().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.registry = MetricsRegistry()
+        self.sdk = HttpSdk(host=self.server.url)
+        self.sdk.metrics = self.registry
+
+    def test_labelled_by_url_template(self):
+        for i in range(3):
+            self.sdk.get("/items/{id}/", url_path_params={"id": i})
+        response = self.sdk.post("/items/", body_params={"a": 1})
+        snapshot = self.registry.snapshot()
+        self.assertEqual(3, snapshot[(self.sdk.host, "GET", "/items/{id}/")]["requests"])
+        post = snapshot[(self.sdk.host, "POST", "/items/")]
+        self.assertEqual(len(JSONRenderer().encode_params({"a": 1})[0]), post["bytes_sent"])
+        self.assertEqual(len(response.body), post["bytes_received"])
+
+    def test_status_classes_and_retries(self):
+        policy = RetryPolicy(max_attempts=2, backoff_factor=0, budget=None)
+        self.sdk.get("/status/503", retry_policy=policy)
+        self.sdk.get("/status/404")
+        snapshot = self.registry.snapshot()
+        self.assertEqual({"5xx": 2}, snapshot[(self.sdk.host, "GET", "/status/503")]["responses"])
+        self.assertEqual({"4xx": 1}, snapshot[(self.sdk.host, "GET", "/status/404")]["responses"])
+
+    def test_errors(self):
+        sdk = HttpSdk(host="http://127.0.0.1:%s" % get_free_port())
+        self.assertRaises(Exception, sdk.get, "/", metrics=self.registry)
+        self.assertEqual({"error": 1}, self.registry.snapshot()[(sdk.host, "GET", "/")]["responses"])
+
+    def test_request_many(self):
+        self.sdk.request_many([("GET", "/items/")] * 6, concurrency=3)
+        self.assertEqual(6, self.registry.snapshot()[(self.sdk.host, "GET", "/items/")]["requests"])
+
+    @unittest.skipIf(not is_py35_or_newer, "Only available for python 3.5 or +.")
+    def test_async(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        sdk = AsyncHttpSdk(host=self.server.url)
+        sdk.metrics = self.registry
+        loop.run_until_complete(sdk.request_many([("GET", "/status/500")] * 3))
+        self.assertEqual({"5xx": 3}, self.registry.snapshot()[(sdk.host, "GET", "/status/500")]["responses"])
+        AsyncHttpSdk.close_async_pools()
+        loop.close()
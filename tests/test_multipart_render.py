@@ -1,7 +1,11 @@
 import unittest
 
+from sdklib.http import HttpRequestContext, HttpSdk
+from sdklib.http.base import prepare_request_from_context
+from sdklib.http.multipart import MultiPartEncoder
 from sdklib.http.renderers import MultiPartRenderer
 from sdklib.util.files import guess_filename_stream
+from tests.local_server import LocalServer
 
 
 class TestMultiPartRender(unittest.TestCase):
@@ -233,3 +237,72 @@ class TestMultiPartRender(unittest.TestCase):
         self.assertIn(b"file_upload", body)
         self.assertIn(b"file.pdf", body)
         self.assertIn(b"Content-Type: application/pdf", body)
+
+
+class TestStreamingMultiPartRender(unittest.TestCase):
+
+    def test_stream_body_equals_in_memory_body(self):
+        files = {"file_upload": "tests/resources/file.pdf", "file_upload2": ("name.txt", b"content", "text/plain")}
+        data = [("param1", "value1"), ("param2", ("value2", "myContentType")), ("param3", 3)]
+
+        body, content_type = MultiPartRenderer().encode_params(data, files)
+        stream_body, stream_content_type = MultiPartRenderer(stream=True).encode_params(data, files)
+        self.assertEqual(content_type, stream_content_type)
+        self.assertTrue(isinstance(stream_body, MultiPartEncoder))
+        self.assertEqual(len(body), len(stream_body))
+        self.assertEqual(body, stream_body.read())
+
+    def test_stream_body_read_in_chunks(self):
+        files = {"file_upload": "tests/resources/file.pdf"}
+        body, _ = MultiPartRenderer().encode_params({"param1": "value1"}, files)
+        stream_body, _ = MultiPartRenderer().encode_params({"param1": "value1"}, files, stream=True)
+        chunks = []
+        while True:
+            chunk = stream_body.read(1000)
+            if not chunk:
+                break
+            self.assertTrue(len(chunk) <= 1000)
+            chunks.append(chunk)
+        self.assertEqual(body, b"".join(chunks))
+        self.assertEqual(len(body), stream_body.tell())
+
+    def test_stream_body_seek(self):
+        files = {"file_upload": "tests/resources/file.png"}
+        stream_body, _ = MultiPartRenderer(stream=True).encode_params({"param1": "value1"}, files)
+        value = stream_body.read()
+        stream_body.seek(0)
+        self.assertEqual(value, stream_body.read())
+        stream_body.seek(200)
+        self.assertEqual(value[200:], stream_body.read())
+        self.assertEqual(value, stream_body.getvalue())
+
+    def test_stream_body_file_object(self):
+        with open("tests/resources/file.pdf", "rb") as f:
+            body, _ = MultiPartRenderer().encode_params(None, {"file_upload": ("file.pdf", f)})
+        with open("tests/resources/file.pdf", "rb") as f:
+            stream_body, _ = MultiPartRenderer(stream=True).encode_params(None, {"file_upload": ("file.pdf", f)})
+            self.assertEqual(len(body), len(stream_body))
+            self.assertEqual(body, stream_body.read())
+
+    def test_stream_body_sets_content_length(self):
+        context = HttpRequestContext(
+            host="http://localhost", method="POST", files={"file_upload": "tests/resources/file.pdf"},
+            renderer=MultiPartRenderer(stream=True)
+        )
+        new_context, _, body = prepare_request_from_context(context)
+        self.assertEqual(str(len(body)), new_context.headers["Content-Length"])
+
+    def test_stream_upload(self):
+        server = LocalServer().start()
+        try:
+            files = {"file_upload": "tests/resources/file.pdf"}
+            expected, _ = MultiPartRenderer().encode_params({"param1": "value1"}, files)
+            response = HttpSdk(host=server.url).post(
+                "/upload/", body_params={"param1": "value1"}, files=files, renderer=MultiPartRenderer(stream=True)
+            )
+            self.assertEqual(200, response.status)
+            _, _, headers, body = server.requests[-1]
+            self.assertEqual(str(len(expected)), headers["Content-Length"])
+            self.assertEqual(expected, body)
+        finally:
+            server.stop()
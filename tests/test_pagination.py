@@ -0,0 +1,229 @@
+import json
+import threading
+import time
+import unittest
+
+from sdklib.compat import is_py35_or_newer, parse_qsl, urlsplit
+from sdklib.http import HttpSdk, CursorPagination, OffsetPagination, LinkHeaderPagination
+from sdklib.http.pagination import parse_link_header, iter_prefetched
+from tests.local_server import LocalServer
+
+if is_py35_or_newer:
+    import asyncio
+    from sdklib.http.aio import AsyncHttpSdk
+    from tests.aio_helpers import collect
+
+
+TOTAL_ITEMS = 25
+
+
+def get_query(request_handler):
+    return dict(parse_qsl(urlsplit(request_handler.path)[3]))
+
+
+def cursor_route(request_handler, path_segments, echo):
+    start = int(get_query(request_handler).get("cursor", 0))
+    end = min(start + 10, TOTAL_ITEMS)
+    body = {"items": list(range(start, end)), "meta": {"next": end if end < TOTAL_ITEMS else None}}
+    request_handler._send(200, json.dumps(body).encode())
+
+
+def offset_route(request_handler, path_segments, echo):
+    query = get_query(request_handler)
+    offset, limit = int(query["offset"]), int(query["limit"])
+    body = {"results": list(range(offset, min(offset + limit, TOTAL_ITEMS))), "total": TOTAL_ITEMS}
+    request_handler._send(200, json.dumps(body).encode())
+
+
+def link_route(request_handler, path_segments, echo):
+    page = int(get_query(request_handler).get("page", 1))
+    headers = {}
+    if page < 3:
+        headers["Link"] = '</link/?page=%s&per_page=2>; rel="next", </link/?page=3&per_page=2>; rel="last"' % (page + 1)
+    request_handler._send(200, json.dumps([page * 10, page * 10 + 1]).encode(), headers)
+
+
+def absolute_link_route(request_handler, path_segments, echo):
+    query = parse_qsl(urlsplit(request_handler.path)[3])
+    host = dict(query).get("host", "127.0.0.1")
+    headers = {}
+    if ("page", "2") not in query:
+        headers["Link"] = '<http://%s:%s/absolute/?page=2&id=1&id=2>; rel="next"' % (
+            host, request_handler.server.server_address[1]
+        )
+    request_handler._send(200, json.dumps([query]).encode(), headers)
+
+
+def mixed_link_route(request_handler, path_segments, echo):
+    page = int(get_query(request_handler).get("page", 1))
+    headers = {}
+    if page == 1:
+        headers["Link"] = '<?page=2>; rel="next"'
+    elif page == 2:
+        headers["Link"] = '<http://127.0.0.1:%s/mixed/?page=3>; rel="next"' % request_handler.server.server_address[1]
+    elif page == 3:
+        headers["Link"] = '</mixed/?page=4>; rel="next"'
+    request_handler._send(200, json.dumps([page]).encode(), headers)
+
+
+second_page_requested = threading.Event()
+
+
+def prefetch_route(request_handler, path_segments, echo):
+    if get_query(request_handler).get("cursor") == "10":
+        second_page_requested.set()
+    cursor_route(request_handler, path_segments, echo)
+
+
+class TestParseLinkHeader(unittest.TestCase):
+
+    def test_parse(self):
+        links = parse_link_header(
+            '<https://api.github.com/user/repos?page=3&per_page=100>; rel="next", '
+            '<https://api.github.com/user/repos?page=50&per_page=100>; rel="last"'
+        )
+        self.assertEqual({
+            "next": "https://api.github.com/user/repos?page=3&per_page=100",
+            "last": "https://api.github.com/user/repos?page=50&per_page=100"
+        }, links)
+
+    def test_empty(self):
+        self.assertEqual({}, parse_link_header(None))
+
+
+class TestIterPrefetched(unittest.TestCase):
+
+    def test_values_and_errors(self):
+        def values():
+            yield 1
+            yield 2
+            raise ValueError("page 3")
+
+        prefetched = iter_prefetched(values())
+        self.assertEqual(1, next(prefetched))
+        self.assertEqual(2, next(prefetched))
+        self.assertRaises(ValueError, next, prefetched)
+
+    def test_read_ahead_is_bounded(self):
+        produced = []
+
+        def values():
+            for i in range(100):
+                produced.append(i)
+                yield i
+
+        prefetched = iter_prefetched(values(), prefetch=2)
+        next(prefetched)
+        time.sleep(0.1)
+        self.assertTrue(len(produced) <= 4)
+        prefetched.close()
+
+
+class TestHttpSdkPagination(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = LocalServer(routes={
+            "cursor": cursor_route, "offset": offset_route, "link": link_route, "absolute": absolute_link_route,
+            "mixed": mixed_link_route, "prefetch": prefetch_route
+        }).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.sdk = HttpSdk(host=self.server.url)
+        del self.server.requests[:]
+
+    def test_cursor(self):
+        pagination = CursorPagination(items_key="items", cursor_key="meta.next")
+        self.assertEqual(list(range(TOTAL_ITEMS)), list(self.sdk.paginate("/cursor/", pagination)))
+        self.assertEqual(3, len(self.server.requests))
+
+    def test_offset(self):
+        pagination = OffsetPagination(items_key="results", limit=10)
+        self.assertEqual(list(range(TOTAL_ITEMS)), list(self.sdk.paginate("/offset/", pagination, prefetch=0)))
+        self.assertEqual(3, len(self.server.requests))
+
+    def test_offset_total(self):
+        pagination = OffsetPagination(items_key="results", limit=5, total_key="total")
+        self.assertEqual(list(range(TOTAL_ITEMS)), list(self.sdk.paginate("/offset/", pagination)))
+        self.assertEqual(5, len(self.server.requests))
+
+    def test_link_header(self):
+        items = list(self.sdk.paginate("/link/", LinkHeaderPagination(), query_params={"per_page": 2}))
+        self.assertEqual([10, 11, 20, 21, 30, 31], items)
+        self.assertEqual("/link/?page=3&per_page=2", self.server.requests[-1][1])
+
+    def test_link_header_same_host(self):
+        items = list(self.sdk.paginate("/absolute/", LinkHeaderPagination(), prefetch=0))
+        self.assertEqual([[], [["page", "2"], ["id", "1"], ["id", "2"]]], items)
+
+    def test_link_header_relative_and_absolute_links(self):
+        items = list(self.sdk.paginate("/mixed/", LinkHeaderPagination(), prefetch=0))
+        self.assertEqual([1, 2, 3, 4], items)
+        self.assertEqual(
+            ["/mixed/", "/mixed/?page=2", "/mixed/?page=3", "/mixed/?page=4"], [r[1] for r in self.server.requests]
+        )
+
+    def test_link_header_other_host(self):
+        items = self.sdk.paginate("/absolute/", LinkHeaderPagination(), query_params={"host": "localhost"}, prefetch=0)
+        self.assertRaises(ValueError, next, items)
+        self.assertEqual(1, len(self.server.requests))
+
+    def test_link_header_allow_other_hosts(self):
+        pagination = LinkHeaderPagination(allow_other_hosts=True)
+        items = list(self.sdk.paginate("/absolute/", pagination, query_params={"host": "localhost"}))
+        self.assertEqual([[["host", "localhost"]], [["page", "2"], ["id", "1"], ["id", "2"]]], items)
+        self.assertEqual("localhost", self.server.requests[-1][2]["Host"].split(":")[0])
+
+    def test_iter_pages_max_pages(self):
+        pages = list(self.sdk.iter_pages("/cursor/", CursorPagination(cursor_key="meta.next"), max_pages=2))
+        self.assertEqual([200, 200], [response.status for response, _ in pages])
+        self.assertEqual([list(range(10)), list(range(10, 20))], [items for _, items in pages])
+
+    def test_next_page_is_prefetched(self):
+        second_page_requested.clear()
+        items = self.sdk.paginate("/prefetch/", CursorPagination(cursor_key="meta.next"))
+        self.assertEqual(0, next(items))
+        # the caller is still processing the first page
+        self.assertTrue(second_page_requested.wait(5))
+        self.assertEqual(list(range(1, TOTAL_ITEMS)), list(items))
+
+    def test_next_page_is_not_prefetched(self):
+        second_page_requested.clear()
+        items = self.sdk.paginate("/prefetch/", CursorPagination(cursor_key="meta.next"), prefetch=0)
+        self.assertEqual(0, next(items))
+        self.assertFalse(second_page_requested.is_set())
+        self.assertEqual(1, len(self.server.requests))
+        items.close()
+
+    def test_stop_early(self):
+        items = self.sdk.paginate("/cursor/", CursorPagination(cursor_key="meta.next"), prefetch=1)
+        self.assertEqual(0, next(items))
+        items.close()
+        time.sleep(0.3)
+        self.assertTrue(len(self.server.requests) <= 3)
+        self.assertFalse([t for t in threading.enumerate() if t.name == "sdklib-prefetch"])
+
+    @unittest.skipIf(not is_py35_or_newer, "Only available for python 3.5 or +.")
+    def test_async(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        sdk = AsyncHttpSdk(host=self.server.url)
+        items = sdk.paginate("/offset/", OffsetPagination(items_key="results", limit=10))
+        self.assertEqual(list(range(TOTAL_ITEMS)), loop.run_until_complete(collect(items)))
+        AsyncHttpSdk.close_async_pools()
+        loop.close()
+
+    @unittest.skipIf(not is_py35_or_newer, "Only available for python 3.5 or +.")
+    def test_async_link_header_other_host(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        sdk = AsyncHttpSdk(host=self.server.url)
+        items = sdk.paginate("/absolute/", LinkHeaderPagination(), query_params={"host": "localhost"})
+        self.assertRaises(ValueError, loop.run_until_complete, collect(items))
+        self.assertEqual(1, len(self.server.requests))
+        AsyncHttpSdk.close_async_pools()
+        loop.close()
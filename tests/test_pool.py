@@ -0,0 +1,76 @@
+import unittest
+
+import urllib3
+
+from sdklib.http import HttpSdk, HttpRequestContext
+from sdklib.http.pool import PoolManagerRegistry
+
+
+class MyPoolSdk(HttpSdk):
+    num_pools = 3
+    pool_maxsize = 20
+    pool_block = True
+
+
+class TestPoolManagerRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = PoolManagerRegistry()
+
+    def tearDown(self):
+        self.registry.clear()
+
+    def test_same_settings_return_same_pool_manager(self):
+        pm1 = self.registry.get()
+        pm2 = self.registry.get()
+        self.assertIs(pm1, pm2)
+        self.assertEqual(1, len(self.registry))
+
+    def test_different_settings_return_different_pool_managers(self):
+        pm1 = self.registry.get(maxsize=1)
+        pm2 = self.registry.get(maxsize=2)
+        self.assertIsNot(pm1, pm2)
+        self.assertEqual(2, len(self.registry))
+
+    def test_pool_settings(self):
+        pm = self.registry.get(num_pools=5, maxsize=7, block=True)
+        self.assertEqual(5, pm.pools._maxsize)
+        self.assertEqual(7, pm.connection_pool_kw["maxsize"])
+        self.assertTrue(pm.connection_pool_kw["block"])
+
+    def test_proxy_pool_manager(self):
+        pm = self.registry.get("http://localhost:8080")
+        self.assertTrue(isinstance(pm, urllib3.ProxyManager))
+        self.assertIs(pm, self.registry.get("http://localhost:8080"))
+
+    def test_close_keeps_pool_managers(self):
+        pm = self.registry.get()
+        pm.connection_from_url("http://localhost:80")
+        self.assertEqual(1, len(pm.pools))
+        self.registry.close()
+        self.assertEqual(0, len(pm.pools))
+        self.assertIs(pm, self.registry.get())
+
+    def test_clear(self):
+        pm = self.registry.get()
+        self.registry.clear()
+        self.assertEqual(0, len(self.registry))
+        self.assertIsNot(pm, self.registry.get())
+
+
+class TestHttpSdkPoolSettings(unittest.TestCase):
+
+    def test_get_pool_manager_is_shared(self):
+        self.assertIs(HttpSdk.get_pool_manager(), HttpSdk.get_pool_manager())
+
+    def test_context_pool_defaults(self):
+        context = HttpRequestContext()
+        self.assertEqual(10, context.num_pools)
+        self.assertEqual(10, context.pool_maxsize)
+        self.assertFalse(context.pool_block)
+
+    def test_sdk_subclass_pool_settings(self):
+        sdk = MyPoolSdk()
+        self.assertEqual(3, sdk.num_pools)
+        self.assertEqual(20, sdk.pool_maxsize)
+        self.assertTrue(sdk.pool_block)
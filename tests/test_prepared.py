@@ -0,0 +1,102 @@
+import json
+import unittest
+
+from sdklib.compat import is_py35_or_newer
+from sdklib.http import HttpSdk, PreparedRequest, RetryPolicy, add_timings_hook, remove_timings_hook
+from sdklib.http.authorization import BasicAuthentication
+from tests.local_server import LocalServer
+
+if is_py35_or_newer:
+    import asyncio
+    from sdklib.http.aio import AsyncHttpSdk
+
+
+class TestPreparedRequest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = LocalServer().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.sdk = HttpSdk(host=self.server.url)
+
+    def test_url_path_and_query_params(self):
+        prepared = self.sdk.prepare("GET", "/items/{item_id}/", query_params={"a": 1})
+        self.assertIsInstance(prepared, PreparedRequest)
+        response = prepared.send(item_id=3, query_params={"b": 2})
+        self.assertEqual("/items/3/", response.json["path"])
+        self.assertEqual("a=1&b=2", response.json["query"])
+        self.assertEqual("a=1", prepared.send(item_id=4).json["query"])
+
+    def test_body(self):
+        prepared = self.sdk.prepare("POST", "/items/", body_params={"a": 1})
+        response = prepared.send()
+        self.assertEqual({"a": 1}, json.loads(response.json["body"]))
+        self.assertEqual("application/json", response.json["headers"]["Content-Type"])
+        self.assertEqual({"b": 2}, json.loads(prepared.send(body_params={"b": 2}).json["body"]))
+
+    def test_headers(self):
+        prepared = self.sdk.prepare("GET", "/items/", headers={"X-Static": "1"})
+        headers = prepared.send(headers={"X-Dynamic": "2"}).json["headers"]
+        self.assertEqual("1", headers["X-Static"])
+        self.assertEqual("2", headers["X-Dynamic"])
+        self.assertNotIn("X-Dynamic", prepared.send().json["headers"])
+
+    def test_headers_are_case_insensitive(self):
+        prepared = self.sdk.prepare("GET", "/items/", headers={"Accept": "application/json"})
+        prepared.send(headers={"accept": "application/xml"})
+        headers = self.server.requests[-1][2]
+        self.assertEqual(["application/xml"], [value for name, value in headers.items() if name.lower() == "accept"])
+
+    def test_immutable(self):
+        prepared = self.sdk.prepare("GET", "/items/")
+        self.assertRaises(AttributeError, setattr, prepared, "_host", "http://otherhost")
+        prepared.headers["X-Other"] = "1"
+        self.assertNotIn("X-Other", prepared.headers)
+
+    def test_cookies(self):
+        prepared = self.sdk.prepare("GET", "/items/")
+        self.sdk.get("/cookie/session/abc")
+        self.assertEqual("session=abc", prepared.send().json["headers"]["Cookie"])
+        self.sdk.prepare("GET", "/cookie/session/def").send()
+        self.assertEqual("session=def", prepared.send().json["headers"]["Cookie"])
+
+    def test_pipeline_options(self):
+        del self.server.requests[:]
+        prepared = self.sdk.prepare(
+            "GET", "/status/503", retry_policy=RetryPolicy(max_attempts=2, backoff_factor=0, budget=None)
+        )
+        self.assertEqual(503, prepared.send().status)
+        self.assertEqual(2, len(self.server.requests))
+
+    def test_authentication(self):
+        prepared = self.sdk.prepare("GET", "/items/", authentication_instances=[BasicAuthentication("user", "pass")])
+        response = prepared.send()
+        self.assertEqual("Basic dXNlcjpwYXNz", response.json["headers"]["Authorization"])
+        self.assertIsNotNone(response.timings)
+
+    def test_timings_hooks(self):
+        calls = []
+        hook = lambda context, response, timings: calls.append(context.url_path)
+        prepared = self.sdk.prepare("GET", "/items/{id}/")
+        add_timings_hook(hook)
+        try:
+            prepared.send(id=1)
+        finally:
+            remove_timings_hook(hook)
+        self.assertEqual(["/items/{id}/"], calls)
+
+    @unittest.skipIf(not is_py35_or_newer, "Only available for python 3.5 or +.")
+    def test_async(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        sdk = AsyncHttpSdk(host=self.server.url)
+        prepared = sdk.prepare("GET", "/items/{item_id}/")
+        response = loop.run_until_complete(prepared.send(item_id=5))
+        self.assertEqual("/items/5/", response.json["path"])
+        AsyncHttpSdk.close_async_pools()
+        loop.close()
@@ -0,0 +1,153 @@
+import time
+import unittest
+from multiprocessing.pool import ThreadPool
+
+from sdklib.compat import is_py35_or_newer
+from sdklib.http import HttpSdk, RateLimiter
+from sdklib.http.ratelimit import TokenBucket
+from tests.local_server import LocalServer
+
+if is_py35_or_newer:
+    import asyncio
+    from sdklib.http.aio import AsyncHttpSdk
+
+
+class TestTokenBucket(unittest.TestCase):
+
+    def test_burst(self):
+        bucket = TokenBucket(rate=10, capacity=3)
+        self.assertEqual([0, 0, 0], [bucket.reserve() for _ in range(3)])
+        self.assertAlmostEqual(0.1, bucket.reserve(), places=2)
+        self.assertAlmostEqual(0.2, bucket.reserve(), places=2)
+
+    def test_refill(self):
+        bucket = TokenBucket(rate=100, capacity=1)
+        bucket.reserve()
+        time.sleep(0.02)
+        self.assertEqual(0, bucket.reserve())
+
+    def test_monotonic_clock(self):
+        bucket = TokenBucket(rate=10, capacity=1)
+        bucket.reserve()
+        wall_clock = time.time
+        try:
+            time.time = lambda: wall_clock() - 3600
+            self.assertAlmostEqual(0.1, bucket.reserve(), places=2)
+            time.time = lambda: wall_clock() + 3600
+            self.assertAlmostEqual(0.2, bucket.reserve(), places=2)
+        finally:
+            time.time = wall_clock
+
+    def test_stats(self):
+        bucket = TokenBucket(rate=10, capacity=1)
+        bucket.reserve()
+        bucket.reserve()
+        stats = bucket.stats()
+        self.assertEqual(2, stats["requests"])
+        self.assertEqual(1, stats["delayed"])
+        self.assertAlmostEqual(0.1, stats["wait_time"], places=2)
+        self.assertAlmostEqual(0.1, stats["max_wait_time"], places=2)
+
+
+class TestRateLimiter(unittest.TestCase):
+
+    host = "http://localhost:80"
+
+    def test_no_limit(self):
+        limiter = RateLimiter()
+        self.assertEqual([], limiter.get_buckets(self.host, "/items/"))
+        self.assertEqual(0, limiter.reserve(self.host, "/items/"))
+
+    def test_host_normalization(self):
+        limiter = RateLimiter()
+        limiter.set_limit("https://Api.example.com", rate=10, capacity=1)
+        self.assertEqual(0, limiter.reserve("https://api.example.com:443", "/a/"))
+        self.assertTrue(limiter.reserve("HTTPS://API.EXAMPLE.COM", "/a/") > 0)
+        self.assertEqual(["https://api.example.com:443"], list(limiter.stats().keys()))
+
+    def test_default_rate_by_host(self):
+        limiter = RateLimiter(rate=10, capacity=1)
+        limiter.reserve(self.host, "/a/")
+        self.assertTrue(limiter.reserve(self.host, "/b/") > 0)
+        self.assertEqual(0, limiter.reserve("http://otherhost:80", "/a/"))
+
+    def test_default_rate_by_endpoint(self):
+        limiter = RateLimiter(rate=10, capacity=1, per_endpoint=True)
+        limiter.reserve(self.host, "/a/")
+        self.assertEqual(0, limiter.reserve(self.host, "/b/"))
+        self.assertTrue(limiter.reserve(self.host, "/a/") > 0)
+
+    def test_host_and_endpoint_limits(self):
+        limiter = RateLimiter()
+        limiter.set_limit("http://localhost", rate=100, capacity=2)
+        limiter.set_limit("http://localhost", rate=10, capacity=1, url_path="/items/{id}/")
+        self.assertEqual(2, len(limiter.get_buckets(self.host, "/items/{id}/")))
+        self.assertEqual(0, limiter.reserve(self.host, "/items/{id}/"))
+        self.assertAlmostEqual(0.1, limiter.reserve(self.host, "/items/{id}/"), places=2)
+        self.assertTrue(limiter.reserve(self.host, "/other/") > 0)
+        self.assertEqual(
+            set(["http://localhost:80", "http://localhost:80 /items/{id}/"]), set(limiter.stats().keys())
+        )
+
+
+class TestHttpSdkRateLimit(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = LocalServer().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.limiter = RateLimiter(rate=20, capacity=1)
+        self.sdk = HttpSdk(host=self.server.url)
+        self.sdk.rate_limiter = self.limiter
+
+    def test_requests_are_spaced(self):
+        start = time.time()
+        for i in range(6):
+            self.sdk.get("/items/%s/" % i)
+        self.assertTrue(time.time() - start >= 0.24)
+        self.assertEqual(5, self.limiter.stats()[self.sdk.host]["delayed"])
+
+    def test_limit_is_shared_by_threads(self):
+        pool = ThreadPool(5)
+        start = time.time()
+        pool.map(lambda i: self.sdk.get("/items/"), range(10))
+        pool.close()
+        self.assertTrue(time.time() - start >= 0.44)
+
+    def test_endpoint_limit(self):
+        limiter = RateLimiter()
+        limiter.set_limit(self.server.url, rate=20, capacity=1, url_path="/items/{id}/")
+        start = time.time()
+        for i in range(3):
+            self.sdk.get("/items/{id}/", rate_limiter=limiter, url_path_params={"id": i})
+            self.sdk.get("/other/", rate_limiter=limiter)
+        self.assertTrue(time.time() - start >= 0.09)
+        self.assertEqual(2, limiter.stats()["%s /items/{id}/" % self.sdk.host]["delayed"])
+
+
+@unittest.skipIf(not is_py35_or_newer, "Only available for python 3.5 or +.")
+class TestAsyncHttpSdkRateLimit(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = LocalServer().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def test_requests_are_spaced(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        sdk = AsyncHttpSdk(host=self.server.url)
+        sdk.rate_limiter = RateLimiter(rate=20, capacity=1)
+        start = time.time()
+        loop.run_until_complete(sdk.request_many([("GET", "/items/")] * 6))
+        self.assertTrue(time.time() - start >= 0.24)
+        AsyncHttpSdk.close_async_pools()
+        loop.close()
@@ -1,6 +1,11 @@
+import json
 import unittest
 
+from urllib3 import HTTPResponse
+
+from sdklib.http import HttpSdk
 from sdklib.http.response import Api11PathsResponse, HttpResponse
+from tests.local_server import LocalServer
 
 
 XML_CATALOG = b"""<?xml version="1.0" encoding="UTF-8"?>
@@ -54,11 +59,12 @@ JSON_ERROR_CODE_AND_NO_MESSAGE = b"""{"error":{"code":209}}"""
 
 
 class Urllib3ResponseMock(object):
-    def __init__(self, data):
+    def __init__(self, data, headers=None):
         self.data = data
+        self.headers = headers or {}
 
     def getheaders(self):
-        return {}
+        return self.headers
 
     @property
     def status(self):
@@ -73,7 +79,7 @@ class TestResponse(unittest.TestCase):
 
     @classmethod
     def setUpClass(cls):
-        cls.xml_response = HttpResponse(Urllib3ResponseMock(XML_CATALOG))
+        cls.xml_response = HttpResponse(Urllib3ResponseMock(XML_CATALOG, {"Content-Type": "application/xml"}))
         cls.html_response = HttpResponse(Urllib3ResponseMock(HTML_STR))
         cls.api11paths_response_null_data = Api11PathsResponse(Urllib3ResponseMock(JSON_NULL_DATA_AND_ERROR))
         cls.api11paths_response_data_error = Api11PathsResponse(Urllib3ResponseMock(JSON_DATA_AND_ERROR))
@@ -137,3 +143,124 @@ class TestResponse(unittest.TestCase):
         self.assertEqual("Hello", data)
         self.assertEqual("No available cleanings", error.message)
         self.assertEqual(209, error.code)
+
+
+class TestParsedResponse(unittest.TestCase):
+
+    def test_parsed_once(self):
+        response = HttpResponse(Urllib3ResponseMock(b'{"Name": "value"}'))
+        self.assertIs(response.json, response.json)
+        self.assertIs(response.data, response.data)
+        self.assertIs(response.case_insensitive_dict, response.case_insensitive_dict)
+        self.assertEqual("value", response.case_insensitive_dict["name"])
+
+    def test_parsed_xml_and_html_once(self):
+        response = HttpResponse(Urllib3ResponseMock(XML_CATALOG))
+        self.assertIs(response.xml, response.xml)
+        response = HttpResponse(Urllib3ResponseMock(HTML_STR))
+        self.assertIs(response.html, response.html)
+
+    def test_body_reassigned(self):
+        response = HttpResponse(Urllib3ResponseMock(b'{"a": 1}', {"Content-Type": "application/json"}))
+        self.assertEqual({"a": 1}, response.json)
+        response.body = b'{"a": 2}'
+        self.assertEqual({"a": 2}, response.json)
+        self.assertEqual({"a": 2}, response.data)
+
+    def test_api11paths_response_parsed_once(self):
+        response = Api11PathsResponse(Urllib3ResponseMock(JSON_DATA_AND_ERROR))
+        self.assertIs(response.error, response.error)
+        self.assertIs(response.case_insensitive_dict, response.case_insensitive_dict)
+
+    def test_release_body(self):
+        urllib3_response = HTTPResponse(
+            body=b'{"a": 1}', headers={"Content-Type": "application/json"}, preload_content=False
+        )
+        response = HttpResponse(urllib3_response)
+        self.assertEqual({"a": 1}, response.json)
+        response.release_body()
+        self.assertEqual({"a": 1}, response.json)
+        self.assertEqual(1, response.case_insensitive_dict["A"])
+        self.assertRaises(RuntimeError, getattr, response, "body")
+        self.assertRaises(RuntimeError, getattr, response, "data")
+        self.assertIsNone(urllib3_response._body)
+        response.body = b'{"a": 2}'
+        self.assertEqual({"a": 2}, response.data)
+
+    def test_release_body_after_parse(self):
+        response = Api11PathsResponse(Urllib3ResponseMock(JSON_DATA_AND_ERROR))
+        response.release_body_after_parse = True
+        self.assertEqual("Hello", response.data)
+        self.assertEqual(209, response.error.code)
+        self.assertRaises(RuntimeError, getattr, response, "body")
+
+
+def lines_handler(request_handler, path_segments, echo):
+    request_handler._send(200, b"first\nsecond\r\n\nthird", {"Content-Type": "text/plain"})
+
+
+class TestStreamResponse(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = LocalServer(routes={"lines": lines_handler}).start()
+        cls.sdk = HttpSdk(host=cls.server.url)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def test_iter_content(self):
+        response = self.sdk.get("/bytes/100000", stream=True)
+        chunks = list(response.iter_content(chunk_size=4096))
+        self.assertEqual(100000, sum(len(c) for c in chunks))
+        self.assertTrue(all(len(c) <= 4096 for c in chunks))
+        self.assertRaises(RuntimeError, getattr, response, "body")
+
+    def test_iter_content_chunked(self):
+        response = self.sdk.get("/chunked", stream=True)
+        body = b"".join(response.iter_content(chunk_size=7))
+        self.assertEqual("/chunked", json.loads(body.decode())["path"])
+
+    def test_iter_lines(self):
+        response = self.sdk.get("/lines", stream=True)
+        self.assertEqual([b"first", b"second", b"", b"third"], list(response.iter_lines(chunk_size=3)))
+
+    def test_readinto(self):
+        response = self.sdk.get("/bytes/10000", stream=True)
+        buf = bytearray(3000)
+        total = 0
+        while True:
+            n = response.readinto(buf)
+            if not n:
+                break
+            total += n
+        self.assertEqual(10000, total)
+
+    def test_lazy_properties_buffer_on_demand(self):
+        response = self.sdk.get("/items/", stream=True)
+        self.assertEqual("/items/", response.json["path"])
+        self.assertEqual("/items/", response.data["path"])
+        self.assertEqual(1, len(list(response.iter_content())))
+
+    def test_close_releases_connection(self):
+        pool_manager = HttpSdk.get_pool_manager(maxsize=1, block=True)
+        pool = pool_manager.connection_from_url(self.server.url)
+        with self.sdk.get("/bytes/1000000", stream=True, pool_maxsize=1, pool_block=True) as response:
+            self.assertEqual(b"x" * 10, next(response.iter_content(chunk_size=10)))
+        self.assertEqual(1, pool.pool.qsize())
+        response = self.sdk.get("/items/", pool_maxsize=1, pool_block=True, timeout=5)
+        self.assertEqual(200, response.status)
+
+    def test_consumed_stream_releases_connection(self):
+        pool_manager = HttpSdk.get_pool_manager(maxsize=1, block=True)
+        pool = pool_manager.connection_from_url(self.server.url)
+        response = self.sdk.get("/bytes/1000", stream=True, pool_maxsize=1, pool_block=True)
+        list(response.iter_content())
+        self.assertEqual(1, pool.pool.qsize())
+
+    def test_not_streamed_response(self):
+        response = self.sdk.get("/bytes/1000")
+        self.assertEqual(1000, len(response.body))
+        self.assertEqual(b"x" * 1000, b"".join(response.iter_content(chunk_size=100)))
+        self.assertRaises(RuntimeError, response.readinto, bytearray(10))
@@ -0,0 +1,236 @@
+import socket
+import time
+import unittest
+from collections import defaultdict
+
+from urllib3.exceptions import MaxRetryError, NewConnectionError, ProtocolError, ReadTimeoutError, ResponseError
+
+from sdklib.compat import is_py35_or_newer
+from sdklib.http import HttpSdk, RetryPolicy, RetryBudget
+from sdklib.http.renderers import CustomRenderer, MultiPartRenderer
+from sdklib.http.retry import TRANSPORT_RETRIES, is_connect_error
+from tests.local_server import LocalServer
+
+if is_py35_or_newer:
+    import asyncio
+    from sdklib.http.aio import AsyncHttpSdk
+
+
+def flaky_route(failures):
+    """
+    Route failing with a 503 the first n requests to /flaky/<key>/<n>.
+    """
+    def route(request_handler, path_segments, echo):
+        key, n = path_segments[0], int(path_segments[1])
+        failures[key] += 1
+        if failures[key] <= n:
+            headers = {"Retry-After": path_segments[2]} if len(path_segments) > 2 else {}
+            request_handler._send(503, echo, headers)
+        else:
+            request_handler._send(200, echo)
+    return route
+
+
+def get_free_port():
+    s = socket.socket()
+    s.bind(("127.0.0.1", 0))
+    port = s.getsockname()[1]
+    s.close()
+    return port
+
+
+class FakeResponse(object):
+
+    def __init__(self, status, headers=None):
+        self.status = status
+        self.headers = headers or {}
+
+
+class TestRetryPolicy(unittest.TestCase):
+
+    def setUp(self):
+        self.policy = RetryPolicy(max_attempts=3, backoff_factor=1, backoff_max=5, jitter=False, budget=None)
+
+    def test_retry_status(self):
+        self.assertEqual(1, self.policy.get_retry_delay("GET", 1, response=FakeResponse(503)))
+        self.assertEqual(2, self.policy.get_retry_delay("GET", 2, response=FakeResponse(503)))
+        self.assertIsNone(self.policy.get_retry_delay("GET", 1, response=FakeResponse(500)))
+        self.assertIsNone(self.policy.get_retry_delay("GET", 1, response=FakeResponse(200)))
+
+    def test_max_attempts(self):
+        self.assertIsNone(self.policy.get_retry_delay("GET", 3, response=FakeResponse(503)))
+        self.assertEqual(1, self.policy.stats()["exhausted"])
+
+    def test_idempotent_methods_only(self):
+        self.assertIsNone(self.policy.get_retry_delay("POST", 1, response=FakeResponse(503)))
+        self.assertIsNotNone(self.policy.get_retry_delay("put", 1, response=FakeResponse(503)))
+        policy = RetryPolicy(methods=["POST"], budget=None)
+        self.assertIsNotNone(policy.get_retry_delay("POST", 1, response=FakeResponse(503)))
+
+    def test_backoff(self):
+        self.assertEqual(4, self.policy.get_backoff_time(3))
+        self.assertEqual(5, self.policy.get_backoff_time(10))
+        self.policy.jitter = True
+        for attempt in range(1, 5):
+            self.assertTrue(0 <= self.policy.get_backoff_time(attempt) <= 5)
+
+    def test_retry_after(self):
+        self.assertEqual(3, self.policy.get_retry_delay("GET", 1, response=FakeResponse(429, {"Retry-After": "3"})))
+        self.assertIsNone(self.policy.get_retry_delay("GET", 1, response=FakeResponse(429, {"Retry-After": "60"})))
+        self.assertEqual(1, self.policy.get_retry_delay("GET", 1, response=FakeResponse(429, {"Retry-After": "x"})))
+        self.assertEqual(0, RetryPolicy.parse_retry_after("Sun, 06 Nov 1994 08:49:37 GMT"))
+
+    def test_retry_errors(self):
+        connection_error = MaxRetryError(None, "/", NewConnectionError(None, "refused"))
+        self.assertIsNotNone(self.policy.get_retry_delay("GET", 1, error=connection_error))
+        self.assertIsNotNone(self.policy.get_retry_delay("GET", 1, error=ProtocolError("reset")))
+        self.assertIsNone(self.policy.get_retry_delay("GET", 1, error=MaxRetryError(None, "/", ResponseError())))
+        self.assertIsNone(self.policy.get_retry_delay("GET", 1, error=ValueError()))
+
+    def test_connect_errors(self):
+        self.assertTrue(is_connect_error(MaxRetryError(None, "/", NewConnectionError(None, "refused"))))
+        self.assertTrue(is_connect_error(ProtocolError("refused", NewConnectionError(None, "refused"))))
+        self.assertFalse(is_connect_error(ProtocolError("Connection aborted.", IOError("reset"))))
+        self.assertFalse(is_connect_error(MaxRetryError(None, "/", ReadTimeoutError(None, "/", "timeout"))))
+
+    def test_transport_retries(self):
+        self.assertIs(TRANSPORT_RETRIES, self.policy.get_transport_retries("get"))
+        # urllib3 keeps retrying the connection errors of the requests the policy does not retry
+        self.assertIsNone(self.policy.get_transport_retries("POST"))
+
+    def test_budget(self):
+        budget = RetryBudget(ratio=0.5, min_retries_per_second=0)
+        policy = RetryPolicy(budget=budget)
+        for _ in range(4):
+            policy.record_request()
+        self.assertIsNotNone(policy.get_retry_delay("GET", 1, response=FakeResponse(503)))
+        self.assertIsNotNone(policy.get_retry_delay("GET", 1, response=FakeResponse(503)))
+        self.assertIsNone(policy.get_retry_delay("GET", 1, response=FakeResponse(503)))
+        self.assertEqual({"requests": 4, "retries": 2, "rejected": 1}, budget.stats())
+        self.assertEqual({"retries": 2, "exhausted": 0, "rejected": 1}, policy.stats())
+
+    def test_budget_min_retries(self):
+        budget = RetryBudget(ratio=0, min_retries_per_second=1, ttl=2)
+        self.assertTrue(budget.can_retry())
+        self.assertTrue(budget.can_retry())
+        self.assertFalse(budget.can_retry())
+
+    @unittest.skipUnless(hasattr(time, "monotonic"), "no monotonic clock")
+    def test_budget_ignores_wall_clock_jumps(self):
+        budget = RetryBudget(ratio=0, min_retries_per_second=1, ttl=2)
+        self.assertTrue(budget.can_retry())
+        self.assertTrue(budget.can_retry())
+        wall_clock = time.time
+        time.time = lambda: wall_clock() + 3600
+        try:
+            self.assertFalse(budget.can_retry())
+        finally:
+            time.time = wall_clock
+
+
+class TestHttpSdkRetries(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.failures = defaultdict(int)
+        cls.server = LocalServer(routes={"flaky": flaky_route(cls.failures)}).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.policy = RetryPolicy(max_attempts=3, backoff_factor=0, budget=None)
+        self.sdk = HttpSdk(host=self.server.url)
+        self.sdk.retry_policy = self.policy
+
+    def test_retry_until_success(self):
+        response = self.sdk.get("/flaky/success/2")
+        self.assertEqual(200, response.status)
+        self.assertEqual(3, self.failures["success"])
+        self.assertEqual(2, self.policy.stats()["retries"])
+
+    def test_give_up_after_max_attempts(self):
+        response = self.sdk.get("/flaky/give-up/5")
+        self.assertEqual(503, response.status)
+        self.assertEqual(3, self.failures["give-up"])
+
+    def test_not_idempotent_method(self):
+        response = self.sdk.post("/flaky/post/1", body_params={"a": 1})
+        self.assertEqual(503, response.status)
+        self.assertEqual(1, self.failures["post"])
+
+    def test_retry_after(self):
+        response = self.sdk.get("/flaky/retry-after/1/0")
+        self.assertEqual(200, response.status)
+
+    def test_rewind_file_body(self):
+        policy = RetryPolicy(methods=["POST"], backoff_factor=0, budget=None)
+        files = {"file_upload": "tests/resources/file.pdf"}
+        response = self.sdk.post(
+            "/flaky/upload/1", files=files, renderer=MultiPartRenderer(stream=True), retry_policy=policy
+        )
+        self.assertEqual(200, response.status)
+        expected, _ = MultiPartRenderer().encode_params(None, files)
+        self.assertEqual(expected, self.server.requests[-1][3])
+        self.assertEqual(self.server.requests[-2][3], self.server.requests[-1][3])
+
+    def test_connection_error(self):
+        sdk = HttpSdk(host="http://127.0.0.1:%s" % get_free_port())
+        self.assertRaises(MaxRetryError, sdk.get, "/", retry_policy=self.policy)
+        self.assertEqual({"retries": 2, "exhausted": 1, "rejected": 0}, self.policy.stats())
+
+    def test_not_rewindable_body(self):
+        budget = RetryBudget()
+        policy = RetryPolicy(methods=["POST"], backoff_factor=0, budget=budget)
+        response = self.sdk.post("/flaky/generator/1", body_params=iter([b"a", b"b"]), retry_policy=policy,
+                                 renderer=CustomRenderer("text/plain"))
+        self.assertEqual(503, response.status)
+        self.assertEqual(1, self.failures["generator"])
+        self.assertEqual(1, budget.stats()["requests"])
+
+    def test_not_rewindable_body_connection_error(self):
+        sdk = HttpSdk(host="http://127.0.0.1:%s" % get_free_port())
+        policy = RetryPolicy(methods=["POST"], backoff_factor=0, budget=None)
+        self.assertRaises(MaxRetryError, sdk.post, "/", body_params=iter([b"a"]), retry_policy=policy,
+                          renderer=CustomRenderer("text/plain"))
+        self.assertEqual({"retries": 2, "exhausted": 1, "rejected": 0}, policy.stats())
+
+    def test_stream(self):
+        response = self.sdk.get("/flaky/stream/1", stream=True)
+        self.assertEqual(200, response.status)
+        response.close()
+
+
+@unittest.skipIf(not is_py35_or_newer, "Only available for python 3.5 or +.")
+class TestAsyncHttpSdkRetries(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.failures = defaultdict(int)
+        cls.server = LocalServer(routes={"flaky": flaky_route(cls.failures)}).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.policy = RetryPolicy(max_attempts=3, backoff_factor=0, budget=None)
+        self.sdk = AsyncHttpSdk(host=self.server.url)
+        self.sdk.retry_policy = self.policy
+
+    def tearDown(self):
+        AsyncHttpSdk.close_async_pools()
+        self.loop.close()
+
+    def test_retry_until_success(self):
+        response = self.loop.run_until_complete(self.sdk.get("/flaky/success/2"))
+        self.assertEqual(200, response.status)
+        self.assertEqual(2, self.policy.stats()["retries"])
+
+    def test_connection_error(self):
+        sdk = AsyncHttpSdk(host="http://127.0.0.1:%s" % get_free_port())
+        self.assertRaises(ProtocolError, self.loop.run_until_complete, sdk.get("/", retry_policy=self.policy))
+        self.assertEqual(2, self.policy.stats()["retries"])
@@ -0,0 +1,143 @@
+import threading
+import unittest
+from multiprocessing.pool import ThreadPool
+
+from urllib3.exceptions import MaxRetryError
+
+from sdklib.compat import is_py35_or_newer
+from sdklib.http import HttpSdk, HttpRequestContext, SingleFlight
+from tests.local_server import LocalServer
+from tests.test_retry import get_free_port
+
+if is_py35_or_newer:
+    import asyncio
+    from sdklib.http.aio import AsyncHttpSdk
+
+
+class TestSingleFlight(unittest.TestCase):
+
+    def test_default_key(self):
+        single_flight = SingleFlight()
+        context = HttpRequestContext(headers={"Authorization": "user1", "X-Date": "1"})
+        key1 = single_flight.get_key(context, "http://localhost/items/", None)
+        context.headers["Authorization"] = "user2"
+        self.assertNotEqual(key1, single_flight.get_key(context, "http://localhost/items/", None))
+
+    def test_headers_in_key(self):
+        single_flight = SingleFlight(headers=["Authorization"])
+        context = HttpRequestContext(headers={"Authorization": "user1", "X-Date": "1"})
+        key1 = single_flight.get_key(context, "http://localhost/items/", None)
+        context.headers["X-Date"] = "2"
+        self.assertEqual(key1, single_flight.get_key(context, "http://localhost/items/", None))
+
+    def test_exclude_headers(self):
+        single_flight = SingleFlight(exclude_headers=["x-date"])
+        context = HttpRequestContext(headers={"Authorization": "user1", "X-Date": "1"})
+        key1 = single_flight.get_key(context, "http://localhost/items/", None)
+        context.headers["X-Date"] = "2"
+        self.assertEqual(key1, single_flight.get_key(context, "http://localhost/items/", None))
+        context.headers["Authorization"] = "user2"
+        self.assertNotEqual(key1, single_flight.get_key(context, "http://localhost/items/", None))
+
+    def test_key_func(self):
+        single_flight = SingleFlight(key_func=lambda context, url, body: url)
+        self.assertEqual("http://localhost/", single_flight.get_key(HttpRequestContext(), "http://localhost/", None))
+
+    def test_is_coalescable(self):
+        single_flight = SingleFlight()
+        self.assertTrue(single_flight.is_coalescable(HttpRequestContext(method="GET"), None))
+        self.assertFalse(single_flight.is_coalescable(HttpRequestContext(method="POST"), b"{}"))
+        self.assertFalse(single_flight.is_coalescable(HttpRequestContext(method="GET", stream=True), None))
+        self.assertFalse(single_flight.is_coalescable(HttpRequestContext(method="GET", spool_threshold=0), None))
+        single_flight = SingleFlight(methods=["PUT"])
+        self.assertTrue(single_flight.is_coalescable(HttpRequestContext(method="PUT"), b"{}"))
+        self.assertFalse(single_flight.is_coalescable(HttpRequestContext(method="PUT"), iter([b"{}"])))
+
+
+class TestHttpSdkSingleFlight(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = LocalServer().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.single_flight = SingleFlight()
+        self.sdk = HttpSdk(host=self.server.url)
+        self.sdk.single_flight = self.single_flight
+        del self.server.requests[:]
+
+    def run_in_threads(self, func, n=10):
+        barrier = threading.Event()
+
+        def call(_):
+            barrier.wait()
+            try:
+                return func()
+            except Exception as e:
+                return e
+
+        pool = ThreadPool(n)
+        result = pool.map_async(call, range(n))
+        barrier.set()
+        responses = result.get()
+        pool.close()
+        return responses
+
+    def test_identical_requests_are_coalesced(self):
+        responses = self.run_in_threads(lambda: self.sdk.get("/delay/0.3", query_params={"a": 1}))
+        self.assertEqual(1, len(self.server.requests))
+        self.assertEqual(["/delay/0.3"] * 10, [r.json["path"] for r in responses])
+        self.assertEqual(10, len(set(id(r) for r in responses)))
+        self.assertEqual({"requests": 1, "coalesced": 9}, self.single_flight.stats())
+
+    def test_different_requests_are_not_coalesced(self):
+        counter = iter(range(10))
+        self.run_in_threads(lambda: self.sdk.get("/delay/0.1", query_params={"a": next(counter)}))
+        self.assertEqual(10, len(self.server.requests))
+
+    def test_posts_are_not_coalesced(self):
+        self.run_in_threads(lambda: self.sdk.post("/delay/0.1", body_params={"a": 1}), n=3)
+        self.assertEqual(3, len(self.server.requests))
+
+    def test_errors_are_shared(self):
+        sdk = HttpSdk(host="http://127.0.0.1:%s" % get_free_port())
+        results = self.run_in_threads(lambda: sdk.get("/", single_flight=self.single_flight), n=3)
+        self.assertTrue(all(isinstance(e, MaxRetryError) for e in results))
+
+    def test_sequential_requests_are_not_coalesced(self):
+        self.sdk.get("/items/")
+        self.sdk.get("/items/")
+        self.assertEqual(2, len(self.server.requests))
+
+    @unittest.skipIf(not is_py35_or_newer, "Only available for python 3.5 or +.")
+    def test_async(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        sdk = AsyncHttpSdk(host=self.server.url)
+        sdk.single_flight = self.single_flight
+        responses = loop.run_until_complete(sdk.request_many([("GET", "/delay/0.2")] * 5))
+        self.assertEqual(1, len(self.server.requests))
+        self.assertEqual(["/delay/0.2"] * 5, [r.json["path"] for r in responses])
+        self.assertEqual({"requests": 1, "coalesced": 4}, self.single_flight.stats())
+        self.assertFalse(hasattr(self.single_flight, "async_calls"))
+        AsyncHttpSdk.close_async_pools()
+        loop.close()
+
+    @unittest.skipIf(not is_py35_or_newer, "Only available for python 3.5 or +.")
+    def test_async_single_flights_are_independent(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        sdk = AsyncHttpSdk(host=self.server.url)
+        other_single_flight = SingleFlight()
+        sdk.single_flight = self.single_flight
+        loop.run_until_complete(asyncio.gather(
+            sdk.get("/delay/0.2"), sdk.get("/delay/0.2", single_flight=other_single_flight)
+        ))
+        self.assertEqual(2, len(self.server.requests))
+        self.assertEqual({"requests": 1, "coalesced": 0}, other_single_flight.stats())
+        AsyncHttpSdk.close_async_pools()
+        loop.close()
@@ -0,0 +1,139 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from sdklib.http import HttpSdk
+from sdklib.http.spool import SpooledBody, spool_body
+from tests.local_server import LocalServer
+
+
+class TestSpoolBody(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_small_body_in_memory(self):
+        self.assertEqual(b"abcdef", spool_body([b"abc", b"def"], 6, dir=self.dir))
+        self.assertEqual(b"", spool_body([], 0, dir=self.dir))
+        self.assertEqual([], os.listdir(self.dir))
+
+    def test_large_body_spooled(self):
+        body = spool_body([b"abc", b"def", b"ghi"], 5, dir=self.dir)
+        self.assertIsInstance(body, SpooledBody)
+        self.assertEqual(9, len(body))
+        self.assertEqual(b"abcdefghi", body.view.tobytes())
+        self.assertTrue(body.view.readonly)
+        self.assertEqual([os.path.basename(body.path)], os.listdir(self.dir))
+        body.close()
+        self.assertIsNone(body.view)
+        self.assertEqual([], os.listdir(self.dir))
+
+    def test_save_to(self):
+        body = spool_body([b"x" * 10] * 10, 50, dir=self.dir)
+        temporary_path = body.path
+        path = os.path.join(self.dir, "saved")
+        body.save_to(path)
+        self.assertFalse(os.path.exists(temporary_path))
+        self.assertEqual(path, body.path)
+        self.assertEqual(b"x" * 100, body.view.tobytes())
+        # the saved file is no longer temporary: another copy is made from it
+        body.save_to(path + "2")
+        body.close()
+        for name in ("saved", "saved2"):
+            with open(os.path.join(self.dir, name), "rb") as f:
+                self.assertEqual(b"x" * 100, f.read())
+        self.assertRaises(RuntimeError, body.save_to, path + "3")
+
+    def test_close_with_slices(self):
+        body = spool_body([b"abc", b"def"], 2, dir=self.dir)
+        view = body.view[1:3]
+        body.close()
+        self.assertEqual(b"bc", view.tobytes())
+        self.assertEqual([], os.listdir(self.dir))
+
+    def test_error_while_reading(self):
+        def chunks():
+            yield b"abcdef"
+            raise IOError("connection reset")
+        self.assertRaises(IOError, spool_body, chunks(), 3, dir=self.dir)
+        self.assertEqual([], os.listdir(self.dir))
+
+
+class TestSpooledResponse(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = LocalServer().start()
+        cls.sdk = HttpSdk(host=cls.server.url)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_large_body_spooled(self):
+        response = self.sdk.get("/bytes/100000", spool_threshold=1000)
+        self.assertTrue(response.spooled)
+        self.assertIsInstance(response.body, memoryview)
+        self.assertIs(response.body, response.raw)
+        self.assertEqual(b"x" * 100000, response.body.tobytes())
+        self.assertEqual(100000, sum(len(c) for c in response.iter_content(4096)))
+        path = response._spooled.path
+        self.assertTrue(os.path.exists(path))
+        response.close()
+        self.assertFalse(os.path.exists(path))
+        self.assertRaises(RuntimeError, getattr, response, "body")
+
+    def test_small_body_in_memory(self):
+        response = self.sdk.get("/bytes/1000", spool_threshold=1000)
+        self.assertFalse(response.spooled)
+        self.assertEqual(b"x" * 1000, response.body)
+
+    def test_parsed_spooled_body(self):
+        response = self.sdk.get("/items/", spool_threshold=10)
+        self.assertTrue(response.spooled)
+        self.assertEqual("/items/", response.json["path"])
+        self.assertEqual("/items/", response.data["path"])
+
+    def test_streamed_body_spooled_on_access(self):
+        response = self.sdk.get("/bytes/100000", stream=True, spool_threshold=1000)
+        self.assertFalse(response.spooled)
+        self.assertEqual(100000, len(response.body))
+        self.assertTrue(response.spooled)
+
+    def test_save_to(self):
+        path = os.path.join(self.dir, "body")
+        response = self.sdk.get("/bytes/100000", spool_threshold=1000)
+        temporary_path = response._spooled.path
+        response.save_to(path)
+        self.assertFalse(os.path.exists(temporary_path))
+        response.close()
+        with open(path, "rb") as f:
+            self.assertEqual(b"x" * 100000, f.read())
+
+    def test_save_to_not_spooled(self):
+        path = os.path.join(self.dir, "body")
+        self.sdk.get("/bytes/100000", stream=True).save_to(path)
+        self.assertEqual(100000, os.path.getsize(path))
+        self.sdk.get("/items/").save_to(path)
+        with open(path, "rb") as f:
+            self.assertEqual("/items/", json.loads(f.read().decode())["path"])
+
+    def test_spool_threshold_of_sdk(self):
+        class SpoolingSdk(HttpSdk):
+            spool_threshold = 1000
+
+        sdk = SpoolingSdk(host=self.server.url)
+        self.assertTrue(sdk.get("/bytes/100000").spooled)
+        self.assertTrue(sdk.prepare("GET", "/bytes/{size}").send(size=100000).spooled)
+        self.assertFalse(sdk.get("/bytes/100000", spool_threshold=None).spooled)
@@ -0,0 +1,98 @@
+import time
+import unittest
+
+from sdklib.compat import is_py35_or_newer
+from sdklib.http import HttpSdk, HttpCache, RequestTimings, add_timings_hook, remove_timings_hook
+from sdklib.http.timings import HAR_FIELDS
+from tests.local_server import LocalServer
+from tests.test_cache import max_age_route
+
+if is_py35_or_newer:
+    import asyncio
+    from sdklib.http.aio import AsyncHttpSdk
+
+
+class TestRequestTimings(unittest.TestCase):
+
+    def test_as_har(self):
+        timings = RequestTimings()
+        timings.add("send", 0.001)
+        timings.add("send", 0.002)
+        timings.lap("_render")
+        timings.finish()
+        har = timings.as_har()
+        self.assertEqual(list(HAR_FIELDS), list(har.keys())[:len(HAR_FIELDS)])
+        self.assertEqual(3.0, har["send"])
+        self.assertEqual(0, har["wait"])
+        self.assertEqual(0, har["receive"])
+        self.assertEqual(-1, har["connect"])
+        self.assertIn("_render", har)
+        self.assertTrue(har["_total"] >= har["_render"])
+
+    def test_lap_and_mark(self):
+        timings = RequestTimings()
+        time.sleep(0.01)
+        timings.mark()
+        timings.lap("_stage")
+        self.assertTrue(timings.get("_stage") < 0.01)
+        self.assertEqual(0, timings.network_time())
+
+
+class TestHttpSdkTimings(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = LocalServer(routes={"max-age": max_age_route}).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.sdk = HttpSdk(host=self.server.url)
+
+    def test_response_timings(self):
+        timings = self.sdk.post("/delay/0.05", body_params={"a": 1}).timings
+        self.assertTrue(set(HAR_FIELDS).issubset(timings))
+        for name in ("_copy", "_url", "_render", "_authenticate", "_transport", "_response", "_total"):
+            self.assertIn(name, timings)
+        self.assertTrue(timings["wait"] >= 50)
+        self.assertTrue(timings["_total"] >= timings["send"] + timings["wait"] + timings["receive"])
+
+    def test_reused_connection(self):
+        self.sdk.get("/items/")
+        timings = self.sdk.get("/items/").timings
+        self.assertEqual(-1, timings["connect"])
+
+    def test_hooks(self):
+        calls = []
+
+        def hook(context, response, timings):
+            calls.append((context.url_path, response.status, timings))
+
+        add_timings_hook(hook)
+        try:
+            response = self.sdk.get("/items/{id}/", url_path_params={"id": 1})
+        finally:
+            remove_timings_hook(hook)
+        self.sdk.get("/items/")
+        self.assertEqual([("/items/{id}/", 200, response.timings)], calls)
+
+    def test_cached_response(self):
+        cache = HttpCache()
+        self.sdk.get("/max-age/60", response_cache=cache)
+        timings = self.sdk.get("/max-age/60", response_cache=cache).timings
+        self.assertIn("_cache", timings)
+        self.assertEqual(0, timings["wait"])
+
+    @unittest.skipIf(not is_py35_or_newer, "Only available for python 3.5 or +.")
+    def test_async(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        sdk = AsyncHttpSdk(host=self.server.url)
+        timings = loop.run_until_complete(sdk.get("/delay/0.05")).timings
+        self.assertTrue(timings["connect"] >= 0)
+        self.assertTrue(timings["wait"] >= 50)
+        self.assertIn("_throttle", timings)
+        AsyncHttpSdk.close_async_pools()
+        loop.close()
@@ -1,7 +1,7 @@
 import unittest
 
 from sdklib.util.urls import (
-    get_hostname_parameters_from_url, urlsplit, ensure_url_path_starts_with_slash, generate_url
+    get_hostname_parameters_from_url, urlsplit, ensure_url_path_starts_with_slash, generate_url, compile_url_path
 )
 from sdklib.http import generate_url_path
 
@@ -154,6 +154,31 @@ class TestUrls(unittest.TestCase):
         url_path = generate_url_path("/path/to/{id}/{lang}/{format}/", format_suffix='json', lang='es')
         self.assertEqual("/path/to/{id}/es/{format}/.json", url_path)
 
+    def test_generate_url_path_format_spec(self):
+        url_path = generate_url_path("/path/to/{id:03d}/{lang!r}/{item.real}/", id=1, lang='es', item=2)
+        self.assertEqual("/path/to/001/'es'/2/", url_path)
+
+    def test_generate_url_path_missing_param_with_format_spec(self):
+        url_path = generate_url_path("/path/to/{id:03d}/{item.real}/")
+        self.assertEqual("/path/to/{id:03d}/{item.real}/", url_path)
+
+    def test_generate_url_path_escaped_braces(self):
+        url_path = generate_url_path("/path/{{to}}/{id}/", id=1)
+        self.assertEqual("/path/{to}/1/", url_path)
+
+    def test_generate_url_path_without_params(self):
+        url_path = generate_url_path("path/to", prefix="", format_suffix="json")
+        self.assertEqual("/path/to.json", url_path)
+
+    def test_generate_url_path_empty(self):
+        self.assertEqual("/", generate_url_path(""))
+
+    def test_compile_url_path_is_cached(self):
+        template = compile_url_path("/path/to/{id}/", prefix="/example")
+        self.assertIs(template, compile_url_path("/path/to/{id}/", prefix="/example"))
+        self.assertIsNot(template, compile_url_path("/path/to/{id}/"))
+        self.assertEqual("/example/path/to/5/", template.render({"id": 5}))
+
     def test_generate_url_path_not_allow_errors(self):
         try:
             generate_url_path("/path/to/{id}/{lang}/{format}/", format_suffix='json', lang='es', allow_key_errors=False)
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from sdklib.http import HttpSdk
+from sdklib.http.xmlstream import iter_xml_items
+from sdklib.util.xmltodict import expat, parse
+from tests.local_server import LocalServer
+
+
+ENTRIES = u"".join(
+    u'<entry id="%d"><title>Title %d ñ</title><tag>a</tag><tag>b</tag></entry>\n<note>note %d</note>\n' % (i, i, i)
+    for i in range(50)
+)
+DOCUMENT = (u'<?xml version="1.0" encoding="UTF-8"?>\n<feed version="1"><meta><count>50</count></meta>\n'
+            u'<entries>\n%s</entries></feed>' % ENTRIES).encode("utf-8")
+
+
+def split(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def feed_route(request_handler, path_segments, echo):
+    request_handler._send(200, DOCUMENT, {"Content-Type": "application/xml; charset=utf-8"})
+
+
+class TestIterXmlItems(unittest.TestCase):
+
+    def test_same_items_as_parse(self):
+        expected = parse(DOCUMENT)["feed"]["entries"]["entry"]
+        for size in (1, 2, 7, 64, len(DOCUMENT)):
+            items = list(iter_xml_items(split(DOCUMENT, size), depth=3, tag="entry"))
+            self.assertEqual(expected, items, size)
+        self.assertEqual({"@id": "3", "title": u"Title 3 ñ", "tag": ["a", "b"]}, expected[3])
+
+    def test_depth(self):
+        self.assertEqual([{"count": "50"}, {"entry": parse(DOCUMENT)["feed"]["entries"]["entry"],
+                                            "note": ["note %d" % i for i in range(50)]}],
+                         list(iter_xml_items([DOCUMENT])))
+        self.assertEqual(["50"], list(iter_xml_items([DOCUMENT], depth=3, tag="count")))
+        self.assertEqual(["note %d" % i for i in range(50)], list(iter_xml_items([DOCUMENT], depth=3, tag="note")))
+        self.assertEqual(1, len(list(iter_xml_items([DOCUMENT], depth=1))))
+
+    def test_text_item_with_attributes(self):
+        items = list(iter_xml_items([b'<a><b k="v">text</b><b k="w"/><b/></a>']))
+        self.assertEqual([{"@k": "v", "#text": "text"}, {"@k": "w"}, None], items)
+        items = list(iter_xml_items([b'<a><b k="v">text</b></a>'], xml_attribs=False))
+        self.assertEqual(["text"], items)
+
+    def test_mixed_content(self):
+        body = b'<a><b k="v">text <c>1</c> more</b></a>'
+        self.assertEqual([parse(body)["a"]["b"]], list(iter_xml_items(split(body, 2))))
+
+    def test_parse_options(self):
+        items = list(iter_xml_items([b'<a><b k="v"><c>1</c></b></a>'], attr_prefix="_", force_list=("c",)))
+        self.assertEqual([{"_k": "v", "c": ["1"]}], items)
+
+    def test_str_chunks(self):
+        self.assertEqual(["1", "2"], list(iter_xml_items([u"<a><b>1</b>", u"<b>2</b></a>"])))
+
+    def test_encoding(self):
+        body = u'<?xml version="1.0" encoding="ISO-8859-1"?><a><b>ñ</b></a>'.encode("latin-1")
+        self.assertEqual([u"ñ"], list(iter_xml_items(split(body, 3))))
+
+    def test_items_before_end_of_document(self):
+        items = iter_xml_items(iter([b"<a><b>1</b><b>2", b"</b><b>"]))
+        self.assertEqual("1", next(items))
+        self.assertEqual("2", next(items))
+        self.assertRaises(expat.ExpatError, next, items)
+
+    def test_invalid_document(self):
+        self.assertRaises(expat.ExpatError, list, iter_xml_items([b"<a><b>1</c></a>"]))
+        self.assertRaises(expat.ExpatError, list, iter_xml_items([b""]))
+
+
+class TestResponseIterXmlItems(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = LocalServer(routes={"feed": feed_route}).start()
+        cls.sdk = HttpSdk(host=cls.server.url)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def test_streamed_response(self):
+        response = self.sdk.get("/feed", stream=True)
+        items = list(response.iter_xml_items(depth=3, tag="entry", chunk_size=100))
+        self.assertEqual(50, len(items))
+        self.assertEqual(u"Title 49 ñ", items[-1]["title"])
+        self.assertRaises(RuntimeError, getattr, response, "body")
+
+    def test_not_streamed_response(self):
+        response = self.sdk.get("/feed")
+        self.assertEqual(["50"], list(response.iter_xml_items(depth=3, tag="count")))
+        self.assertEqual(response.data["feed"]["entries"]["entry"], list(response.iter_xml_items(3, "entry")))